@@ -0,0 +1,231 @@
+"""Exportador de KPIs del dashboard en formato de texto de Prometheus.
+
+Genera archivos .prom para el textfile collector de node_exporter a partir de
+los mismos parsers que usa la aplicación: cumplimiento, jobs y fallidos por
+Cell Manager, y KPIs del Schedule por plataforma.
+
+Estructura esperada de entrada:
+    <csv-root>/<CELL_MANAGER>/*.csv      reportes semanales de cada Cell Manager (.csv, .gz o .zip)
+    <schedule-dir>/*.xlsx|*.xlsm         Schedules mensuales (se exporta el más reciente)
+
+Uso:
+    python -m exporters.prometheus --csv-root /data/reports --schedule-dir /data/schedule \\
+        --out /var/lib/node_exporter/textfile [--interval 300]
+
+Se escribe un archivo por Cell Manager y uno para el Schedule, y cada uno se
+reescribe solo si alguna de sus series cambió. El archivo de un Cell Manager
+cuya carpeta desaparece o queda sin reportes se borra en el mismo ciclo. Los
+parseos se reutilizan entre ciclos mientras los archivos de origen no cambien
+(tamaño y mtime).
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.compressed import REPORT_EXTENSIONS, is_bundle
+from parsers.csv_parser import parse_bundle, parse_csv_file, merge_sessions, build_cell_manager_report
+from parsers.parse_cache import LRUCache
+from parsers.schedule_parser import parse_schedule_file
+from utils.schedule_matrix import period_sort_key
+
+PREFIX = "backup_dashboard"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def format_family(name: str, help_text: str, samples: list[tuple[dict, float]], metric_type: str = "gauge") -> str:
+    """Formatea una familia de métricas (HELP, TYPE y una línea por muestra)."""
+    lines = [f"# HELP {PREFIX}_{name} {help_text}", f"# TYPE {PREFIX}_{name} {metric_type}"]
+    for labels, value in samples:
+        label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        lines.append(f"{PREFIX}_{name}{{{label_str}}} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def cell_manager_metrics(report, source_mtime: int = 0) -> str:
+    """Series de un CellManagerReport."""
+    labels = {"cell_manager": report.cell_manager}
+    failed = sum(1 for s in report.sessions if not s.success or s.success.strip() == "0%")
+    return "".join([
+        format_family("cm_compliance_percent", "Porcentaje de jobs exitosos (Success distinto de 0%).",
+                      [(labels, report.compliance_pct)]),
+        format_family("cm_jobs", "Jobs de backup en los reportes cargados.", [(labels, report.total_jobs)]),
+        format_family("cm_failed_jobs", "Jobs con Success 0%.", [(labels, failed)]),
+        format_family("cm_policies", "Especificaciones (políticas) únicas.", [(labels, report.total_policies)]),
+        format_family("cm_size_terabytes", "Datos escritos en TB.", [(labels, report.size_tb)]),
+        format_family("cm_source_mtime_seconds", "mtime más reciente de los reportes de origen.",
+                      [(labels, source_mtime)]),
+    ])
+
+
+def schedule_metrics(report) -> str:
+    """Series de un ScheduleReport (por plataforma y TOTAL)."""
+    per_platform = [({"platform": r.platform, "period": report.period_name}, r) for r in report.rows]
+    total = {"platform": "TOTAL", "period": report.period_name}
+
+    def family(name, help_text, row_attr, total_attr):
+        samples = [(labels, getattr(r, row_attr)) for labels, r in per_platform]
+        samples.append((total, getattr(report, total_attr)))
+        return format_family(name, help_text, samples)
+
+    return "".join([
+        family("schedule_kpi_operacion_percent", "(Programados - Fallidos) / Programados x 100.",
+               "kpi_operacion", "kpi_operacion_general"),
+        family("schedule_relanzamiento_percent", "Relanzados / (Programados - Fallidos) x 100.",
+               "pct_relanzamiento", "pct_relanzados_general"),
+        family("schedule_gestion_fallidos_percent", "Gestionados / (Fallidos + Relanzados) x 100.",
+               "gestion_fallidos", "kpi_gestion_fallidos_general"),
+        family("schedule_programados", "Jobs programados.", "programados", "total_programados"),
+        family("schedule_fallidos", "Jobs Failed/Aborted.", "fallidos", "total_fallidos"),
+        family("schedule_relanzados", "Jobs relanzados.", "relanzados", "total_relanzados"),
+        family("schedule_casos_itsm", "Tickets ITSM creados.", "q", "total_q"),
+    ])
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """Escribe path de forma atómica solo si el contenido cambió. Retorna True si escribió."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def _signature(path: str) -> tuple:
+    st = os.stat(path)
+    return (path, st.st_size, st.st_mtime_ns)
+
+
+class TextfileExporter:
+    """Genera y mantiene los archivos .prom; pensado para correr en bucle."""
+
+    def __init__(self, csv_root: str | None, schedule_dir: str | None, out_dir: str):
+        self.csv_root = csv_root
+        self.schedule_dir = schedule_dir
+        self.out_dir = out_dir
+        # (ruta, tamaño, mtime) -> sesiones parseadas de ese archivo
+        self._file_cache = LRUCache(max_entries=256)
+        # Cell Manager -> (firmas de sus archivos, texto .prom)
+        self._cm_cache = {}
+
+    def _cell_manager_text(self, cm_name: str, paths: list[str]) -> str:
+        signatures = tuple(_signature(p) for p in paths)
+        cached = self._cm_cache.get(cm_name)
+        if cached and cached[0] == signatures:
+            return cached[1]
+
+        per_file = []
+        for sig in signatures:
+            parts = self._file_cache.get(sig)
+            if parts is None:
+                if is_bundle(sig[0]):
+                    parts = [(name, sessions) for name, sessions, _ in parse_bundle(sig[0])]
+                else:
+                    parts = [(os.path.basename(sig[0]), parse_csv_file(sig[0]))]
+                self._file_cache.put(sig, parts)
+            per_file.extend(parts)
+
+        sessions, dropped = merge_sessions(per_file)
+        report = build_cell_manager_report(cm_name, sessions, dropped)
+        source_mtime = max((sig[2] for sig in signatures), default=0) // 1_000_000_000
+        text = cell_manager_metrics(report, source_mtime)
+        self._cm_cache[cm_name] = (signatures, text)
+        return text
+
+    def _remove_stale(self, exported: dict[str, str]) -> list[str]:
+        """Borra los .prom de Cell Managers sin carpeta o sin reportes, para que node_exporter deje de servirlos."""
+        removed = []
+        for path in glob.glob(os.path.join(self.out_dir, f"{PREFIX}_cm_*.prom")):
+            if path in exported.values():
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            removed.append(path)
+        # Sus parseos tampoco se vuelven a usar
+        for cm_name in set(self._cm_cache) - set(exported):
+            del self._cm_cache[cm_name]
+        return removed
+
+    def run_once(self) -> list[str]:
+        """Ejecuta un ciclo de exportación. Retorna los archivos reescritos o borrados."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        written = []
+
+        if self.csv_root:
+            exported = {}  # {Cell Manager: archivo .prom}
+            cm_names = sorted(os.listdir(self.csv_root)) if os.path.isdir(self.csv_root) else []
+            for cm_name in cm_names:
+                cm_dir = os.path.join(self.csv_root, cm_name)
+                if not os.path.isdir(cm_dir):
+                    continue
+                paths = sorted(p for ext in REPORT_EXTENSIONS for p in glob.glob(os.path.join(cm_dir, f"*.{ext}")))
+                if not paths:
+                    continue
+                out_path = os.path.join(self.out_dir, f"{PREFIX}_cm_{cm_name}.prom")
+                exported[cm_name] = out_path
+                if write_if_changed(out_path, self._cell_manager_text(cm_name, paths)):
+                    written.append(out_path)
+            written += self._remove_stale(exported)
+
+        if self.schedule_dir and os.path.isdir(self.schedule_dir):
+            paths = glob.glob(os.path.join(self.schedule_dir, "*.xlsx")) + glob.glob(os.path.join(self.schedule_dir, "*.xlsm"))
+            if paths:
+                period_of = {p: os.path.splitext(os.path.basename(p))[0] for p in paths}
+                latest = max(paths, key=lambda p: period_sort_key(period_of[p]))
+                # parse_schedule_file sirve desde la caché por hash si el libro no cambió
+                report = parse_schedule_file(latest, period_of[latest])
+                out_path = os.path.join(self.out_dir, f"{PREFIX}_schedule.prom")
+                if write_if_changed(out_path, schedule_metrics(report)):
+                    written.append(out_path)
+
+        return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta KPIs del Backup Dashboard para node_exporter (textfile collector).")
+    parser.add_argument("--csv-root", help="Directorio con un subdirectorio de CSVs por Cell Manager")
+    parser.add_argument("--schedule-dir", help="Directorio con los Schedules mensuales (.xlsx/.xlsm)")
+    parser.add_argument("--out", required=True, help="Directorio del textfile collector")
+    parser.add_argument("--interval", type=int, default=0, help="Segundos entre ciclos (0 = una sola ejecución)")
+    args = parser.parse_args(argv)
+
+    exporter = TextfileExporter(args.csv_root, args.schedule_dir, args.out)
+    while True:
+        started = time.perf_counter()
+        written = exporter.run_once()
+        print(f"{len(written)} archivos actualizados en {time.perf_counter() - started:.2f}s")
+        if args.interval <= 0:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
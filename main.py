@@ -5,28 +5,31 @@ de Data Protector Cell Managers. Interfaz web con Streamlit.
 """
 
 import streamlit as st
-import pandas as pd
 import os
 import sys
 import tempfile
 import time
 import shutil
 import uuid
+from dataclasses import replace
 from datetime import datetime, date, timedelta
 
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from parsers.csv_parser import parse_csv_file, parse_multiple_csvs
-from parsers.schedule_parser import parse_schedule_file
-from models.report_data import CellManagerReport, ScheduleReport
-from utils.calculations import format_pct, format_tb, get_compliance_color, get_kpi_color
+from utils.config import CONFIG
+from views.styles import app_css
 
 # ══════════════════════════════════════════════════════════════
 # CONFIGURACIÓN
 # ══════════════════════════════════════════════════════════════
 
-CELL_MANAGERS = ["COMHP81", "COMHP83", "LNXCELLMNGVEN", "LNXCELLMNGPTA", "LNXCELLMNGTRI"]
+# Cell Managers y plataformas: config/cell_managers.json (ver utils/config.py)
+CELL_MANAGERS = CONFIG.cell_managers
+# Con más Cell Managers que esto, el sidebar muestra un resumen en lugar de la lista
+SIDEBAR_LIST_LIMIT = 10
+# Filas por página del explorador de sesiones
+SESSION_PAGE_SIZE = 50
 
 # ── SESSION STATE INITIALIZATION ──
 if "session_id" not in st.session_state:
@@ -36,6 +39,8 @@ if "session_id" not in st.session_state:
 BASE_TEMP_DIR = os.path.join(tempfile.gettempdir(), "streamlit_backup_uploads")
 SESSION_TEMP_DIR = os.path.join(BASE_TEMP_DIR, st.session_state.session_id)
 os.makedirs(SESSION_TEMP_DIR, exist_ok=True)
+# Sesiones volcadas a disco al superar el presupuesto de memoria
+SPILL_DIR = os.path.join(SESSION_TEMP_DIR, "spill")
 
 # Colores
 ACCENT = "#58a6ff"
@@ -54,94 +59,8 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# CSS Custom (Dark Default)
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    html, body, [class*="css"] { font-family: 'Inter', sans-serif; color: #e6edf3; }
-
-    /* Header */
-    .main-header {
-        display: flex; align-items: center; gap: 16px;
-        padding: 8px 0 16px 0; border-bottom: 1px solid #30363d; margin-bottom: 24px;
-    }
-    .header-icon {
-        background: #1f6feb30; border-radius: 12px; padding: 12px;
-        display: flex; align-items: center; justify-content: center; font-size: 24px;
-    }
-    .header-title { font-size: 20px; font-weight: 700; color: #e6edf3; }
-    .header-sub { font-size: 12px; color: #8b949e; }
-
-    /* Cards */
-    .kpi-card, .upload-card, .totals-row, .progress-tracker {
-        background: #1c2128; border: 1px solid #30363d; border-radius: 6px; padding: 16px;
-    }
-    .upload-card-header { display: flex; align-items: center; gap: 12px; margin-bottom: 12px; }
-    .cm-icon { background: #1f6feb25; border-radius: 6px; padding: 8px; font-size: 18px; }
-    .cm-name { font-size: 14px; font-weight: 600; color: #e6edf3; }
-    .cm-sub { font-size: 11px; color: #8b949e; }
-
-    /* Totals */
-    .total-item { text-align: center; min-width: 100px; position: relative; cursor: help; }
-    .total-icon { font-size: 18px; margin-bottom: 2px; }
-    .total-label { font-size: 10px; font-weight: 600; color: #8b949e; text-transform: uppercase; letter-spacing: 0.5px; }
-    .total-value { font-size: 20px; font-weight: 700; color: #58a6ff; }
-
-    /* KPIs */
-    .kpi-label { font-size: 11px; font-weight: 600; color: #8b949e; text-transform: uppercase; letter-spacing: 0.5px; }
-    .kpi-value { font-size: 28px; font-weight: 700; margin: 4px 0; }
-    .kpi-bar { height: 6px; border-radius: 3px; background: #21262d; margin-top: 8px; overflow: hidden; }
-    .kpi-fill { height: 100%; border-radius: 3px; }
-
-    /* Tooltips */
-    .tip { position: relative; cursor: help; }
-    .tip .tip-text {
-        visibility: hidden; opacity: 0; position: absolute; bottom: 110%; left: 50%; transform: translateX(-50%);
-        background: #1c2128; color: #e6edf3; border: 1px solid #30363d; border-radius: 6px;
-        padding: 8px 12px; font-size: 11px; white-space: nowrap; z-index: 100;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.4); text-transform: none; letter-spacing: 0;
-    }
-    .tip:hover .tip-text { visibility: visible; opacity: 1; }
-
-    /* Metric overrides */
-    div[data-testid="stMetric"], [data-testid="stDataFrame"] {
-        background-color: #1c2128; border: 1px solid #30363d !important;
-        border-radius: 6px !important; box-shadow: none !important;
-    }
-    [data-testid="stSidebar"] { background-color: #161b22; border-right: 1px solid #30363d; }
-    
-    /* Progress Tracker Styles */
-    .progress-items { display: flex; flex-wrap: wrap; gap: 8px; margin-top: 12px; }
-    .progress-item { display: inline-flex; align-items: center; gap: 6px; padding: 4px 12px; border-radius: 20px; font-size: 12px; font-weight: 500; }
-    .item-done { background: #23863640; color: #3fb950; }
-    .item-pending { background: #30363d; color: #8b949e; }
-    
-    #MainMenu { visibility: hidden; }
-    footer { visibility: hidden; }
-
-    /* Login Style - Centered Card Approach */
-    [data-testid="stForm"] {
-        background-color: #1c2128;
-        border: 1px solid #30363d;
-        border-radius: 12px;
-        padding: 40px;
-        max-width: 400px;
-        margin: 10vh auto; /* Center vertically and horizontally */
-        box-shadow: 0 12px 40px rgba(0,0,0,0.5);
-    }
-    .login-icon {
-        width: 60px; height: 60px; margin: 0 auto 16px;
-        background: linear-gradient(135deg, #1f6feb 0%, #58a6ff 100%);
-        border-radius: 14px; display: flex; align-items: center; justify-content: center;
-        font-size: 28px;
-    }
-    .login-title { font-size: 20px; font-weight: 700; color: #e6edf3; margin-bottom: 6px; text-align: center; }
-    .login-sub { font-size: 13px; color: #8b949e; margin-bottom: 32px; text-align: center; }
-    
-    /* Input Styling to match dark theme explicitly */
-    div[data-baseweb="input"] { background-color: #0d1117 !important; border: 1px solid #30363d !important; color: white !important; }
-</style>
-""", unsafe_allow_html=True)
+# CSS Custom (Dark Default): se lee una vez por proceso, ver views/styles.py
+st.markdown(app_css(), unsafe_allow_html=True)
 
 
 # ══════════════════════════════════════════════════════════════
@@ -178,18 +97,56 @@ if not st.session_state.authenticated:
         if submit:
             if check_credentials(username, password):
                 st.session_state.authenticated = True
+                st.session_state.username = username
                 st.rerun()
             else:
                 st.error("Credenciales incorrectas")
     st.stop()
 
+# Los módulos de la aplicación se importan después del login: la pantalla de
+# acceso no carga numpy/parsers. openpyxl se importa al parsear el primer
+# Schedule y pandas al renderizar la primera tabla (vista de Métricas).
+from parsers.csv_parser import parse_csv_file, parse_multiple_csvs
+from parsers.compressed import REPORT_EXTENSIONS
+from parsers.schedule_parser import parse_schedule_file, parse_schedule_files
+from parsers.parse_cache import buffer_digest
+from models.report_data import CellManagerReport, ScheduleReport
+from utils.calculations import format_pct, format_tb, get_compliance_color, get_kpi_color
+from utils.schedule_matrix import ScheduleMatrix, period_sort_key
+from utils.anomaly import AnomalyDetector
+from utils.throughput import BACKUP_WINDOW_H, MIN_WEEKS, ThroughputTracker
+from utils.spec_index import top_specs
+from utils.aggregates import day_in_range, merge_all, select, week_label, weekly_partials
+from utils.session_store import ColumnarSessions, SessionMemoryBudget, SpilledSessions, release_spilled
+from utils.session_browser import SORT_FIELDS, SessionBrowser
+from utils.watch_folder import WATCH_DIR, WATCH_INTERVAL_S, FolderWatcher
+from utils.snapshot import SNAPSHOT_DIR, delete_snapshot, load_snapshot, save_snapshot
+from utils.janitor import TempJanitor, touch_session
+
 
 # ══════════════════════════════════════════════════════════════
 # DATA FILTERING HELPERS
 # ══════════════════════════════════════════════════════════════
 
 def filter_cm_report(report: CellManagerReport, start_date: date, end_date: date) -> CellManagerReport:
-    """Filtra las sesiones de un reporte por rango de fechas y recalcula métricas."""
+    """Filtra las sesiones de un reporte por rango de fechas y recalcula métricas.
+
+    Con índice por especificación las métricas salen de sus agregados por día
+    y las sesiones filtradas no se materializan (la vista solo usa métricas).
+    """
+    if report.spec_index is not None:
+        summary = report.spec_index.summary(start_date, end_date)
+        total_jobs = int(summary["jobs"])
+        successful_jobs = total_jobs - int(summary["failures"])
+        compliance = (successful_jobs / total_jobs * 100) if total_jobs > 0 else 0.0
+        return CellManagerReport(
+            cell_manager=report.cell_manager,
+            total_policies=summary["specs"],
+            total_jobs=total_jobs,
+            size_tb=round(summary["gb_written"] / 1024, 2),
+            compliance_pct=round(compliance, 2),
+        )
+
     filtered_sessions = []
     unique_specs = set()
     total_gb = 0.0
@@ -225,6 +182,19 @@ def get_date_range(data):
     min_d = None
     max_d = None
     for rep in data.values():
+        if rep.spec_index is not None:
+            lo, hi = rep.spec_index.day_range()
+            if lo is not None:
+                if min_d is None or lo < min_d: min_d = lo
+                if max_d is None or hi > max_d: max_d = hi
+            continue
+        if isinstance(rep.sessions, ColumnarSessions):
+            # Sesiones en disco: el rango sale de la columna, sin reconstruir registros
+            lo, hi = rep.sessions.datetime_range()
+            if lo is not None:
+                if min_d is None or lo.date() < min_d: min_d = lo.date()
+                if max_d is None or hi.date() > max_d: max_d = hi.date()
+            continue
         for s in rep.sessions:
             if s.start_datetime:
                 d = s.start_datetime.date()
@@ -243,14 +213,216 @@ if "cell_manager_files" not in st.session_state:
     st.session_state.cell_manager_files = {cm: [] for cm in CELL_MANAGERS}
 if "schedule_report" not in st.session_state:
     st.session_state.schedule_report = None
+if "schedule_reports" not in st.session_state:
+    st.session_state.schedule_reports = {}  # {periodo: ScheduleReport}
 if "schedule_file_name" not in st.session_state:
     st.session_state.schedule_file_name = ""
+if "schedule_digests" not in st.session_state:
+    st.session_state.schedule_digests = {}  # {periodo: digest del libro cargado}
+if "schedule_uploads" not in st.session_state:
+    st.session_state.schedule_uploads = {}  # {file_id del uploader: digest}, archivos ya revisados
+if "schedule_sources" not in st.session_state:
+    st.session_state.schedule_sources = {}  # {periodo: archivo del que se cargó}
+if "anomaly_detector" not in st.session_state:
+    st.session_state.anomaly_detector = AnomalyDetector()
+if "throughput_tracker" not in st.session_state:
+    st.session_state.throughput_tracker = ThroughputTracker()
+if "watch_reports" not in st.session_state:
+    st.session_state.watch_reports = {}  # {cm: último reporte del vigilante visto (adoptado o no)}
+if "cell_manager_sources" not in st.session_state:
+    st.session_state.cell_manager_sources = {}  # {cm: "upload" (carga manual) o "watch" (carpeta vigilada)}
+if "cell_manager_uploads" not in st.session_state:
+    st.session_state.cell_manager_uploads = {}  # {cm: file_ids del uploader ya cargados}
+if "session_browsers" not in st.session_state:
+    st.session_state.session_browsers = {}  # {cm: (sesiones indexadas, SessionBrowser)}
+
+
+def prune_session_browsers() -> None:
+    """Descarta los exploradores de Cell Managers quitados o cuyas sesiones cambiaron (carga nueva o volcado a disco)."""
+    data = st.session_state.cell_manager_data
+    st.session_state.session_browsers = {
+        cm: cached for cm, cached in st.session_state.session_browsers.items()
+        if cm in data and data[cm].sessions is cached[0]
+    }
+
+
+prune_session_browsers()
+
+
+def get_session_browser(cm: str) -> SessionBrowser:
+    """Explorador de sesiones del Cell Manager; se reconstruye si sus sesiones cambiaron (carga nueva o volcado a disco)."""
+    sessions = st.session_state.cell_manager_data[cm].sessions
+    cached = st.session_state.session_browsers.get(cm)
+    if cached is None or cached[0] is not sessions:
+        with st.spinner(f"Indexando sesiones de {cm}..."):
+            cached = st.session_state.session_browsers[cm] = (sessions, SessionBrowser(sessions))
+    return cached[1]
+
+
+def set_schedule_reports(reports: dict) -> None:
+    """Publica los Schedules cargados; el periodo más reciente es el activo."""
+    st.session_state.schedule_reports = reports
+    latest = max(reports, key=period_sort_key)
+    st.session_state.schedule_report = reports[latest]
+    st.session_state.schedule_file_name = ", ".join(sorted(reports, key=period_sort_key))
+
+
+def snapshot_owner() -> str:
+    """Dueño del snapshot: usuario + token del navegador.
+
+    La credencial de st.secrets es compartida por todos los analistas, así que
+    el usuario solo no distingue a nadie. El token viaja en la URL
+    (?snapshot=...): sobrevive a recargas, a cerrar sesión y a reinicios del
+    servidor, y una pestaña abierta sin él arranca con un snapshot propio.
+    """
+    token = st.query_params.get("snapshot", "")
+    if not token.isalnum():
+        token = uuid.uuid4().hex[:16]
+        st.query_params["snapshot"] = token
+    return f"{st.session_state.username}/{token}"
+
+
+def save_user_snapshot() -> None:
+    """Guarda el snapshot del usuario tras una ingesta (si los snapshots están activos)."""
+    if not SNAPSHOT_DIR or not st.session_state.get("username"):
+        return
+    try:
+        save_snapshot(
+            snapshot_owner(),
+            st.session_state.cell_manager_data,
+            st.session_state.cell_manager_files,
+            st.session_state.schedule_reports,
+            st.session_state.anomaly_detector,
+            st.session_state.throughput_tracker,
+            cell_manager_sources=st.session_state.cell_manager_sources,
+        )
+    except OSError as e:
+        print(f"Error guardando snapshot: {e}")
+
+
+# Al iniciar sesión se restaura lo que el usuario tenía cargado (una vez por sesión)
+if SNAPSHOT_DIR and "snapshot_checked" not in st.session_state:
+    st.session_state.snapshot_checked = True
+    if not st.session_state.cell_manager_data and st.session_state.get("username"):
+        snapshot = load_snapshot(snapshot_owner())
+        if snapshot:
+            st.session_state.cell_manager_data = snapshot["cell_manager_data"]
+            st.session_state.cell_manager_files.update(snapshot["cell_manager_files"])
+            st.session_state.cell_manager_sources = snapshot["cell_manager_sources"]
+            st.session_state.anomaly_detector = snapshot["anomaly_detector"]
+            st.session_state.throughput_tracker = snapshot["throughput_tracker"]
+            if snapshot["schedule_reports"]:
+                set_schedule_reports(snapshot["schedule_reports"])
+            # Las sesiones restauradas están en memoria: cuentan para el presupuesto
+            SessionMemoryBudget().enforce(st.session_state.cell_manager_data, SPILL_DIR)
+            st.toast(f"Datos restaurados ({time.strftime('%d/%m %H:%M', time.localtime(snapshot['saved_at']))})", icon="♻️")
+
+# ══════════════════════════════════════════════════════════════
+# LIMPIEZA DE TEMPORALES
+# ══════════════════════════════════════════════════════════════
+
+@st.cache_resource
+def get_temp_janitor():
+    """Un único janitor por proceso para todos los directorios de sesión."""
+    return TempJanitor(BASE_TEMP_DIR).start()
+
+
+temp_janitor = get_temp_janitor()
+# Cada rerun marca la sesión como activa (el janitor expira las inactivas)
+os.makedirs(SESSION_TEMP_DIR, exist_ok=True)
+touch_session(SESSION_TEMP_DIR)
+
+# Un volcado a disco expirado por el janitor ya no se puede releer: se descarta
+expired = [
+    cm for cm, rep in st.session_state.cell_manager_data.items()
+    if isinstance(rep.sessions, SpilledSessions) and not os.path.isdir(rep.sessions.directory)
+]
+for cm in expired:
+    del st.session_state.cell_manager_data[cm]
+    st.session_state.cell_manager_files[cm] = []
+    st.session_state.cell_manager_sources.pop(cm, None)
+    st.session_state.cell_manager_uploads.pop(cm, None)
+    st.session_state.watch_reports.pop(cm, None)
+if expired:
+    st.warning(f"Los datos de {', '.join(expired)} expiraron por inactividad; vuelve a cargarlos.", icon="⌛")
+
+# ══════════════════════════════════════════════════════════════
+# INGESTA AUTOMÁTICA (CARPETAS VIGILADAS)
+# ══════════════════════════════════════════════════════════════
+
+@st.cache_resource
+def get_folder_watcher():
+    """Un único vigilante por proceso, compartido por todas las sesiones."""
+    if not WATCH_DIR or not os.path.isdir(WATCH_DIR):
+        return None
+    return FolderWatcher(WATCH_DIR, CELL_MANAGERS).start()
+
+
+def sync_watched_reports(watcher: FolderWatcher) -> None:
+    """Adopta en la sesión los reportes del vigilante que cambiaron desde el último rerun.
+
+    Un Cell Manager cargado a mano no se reemplaza: el reporte del vigilante
+    queda visto y la tarjeta de carga muestra el conflicto (ver
+    watch_conflicts). Solo se retira lo que vino de la carpeta vigilada.
+    """
+    version, reports, files = watcher.snapshot()
+    if st.session_state.get("watch_version") == version:
+        return
+    seen = st.session_state.watch_reports
+    sources = st.session_state.cell_manager_sources
+    changed = []
+    for cm in list(seen):
+        if cm not in reports:
+            del seen[cm]
+            if sources.get(cm) == "watch":
+                # La carpeta quedó vacía: se retira lo que vino de ella
+                del sources[cm]
+                st.session_state.cell_manager_data.pop(cm, None)
+                st.session_state.cell_manager_files[cm] = []
+                changed.append(cm)
+    for cm, report in reports.items():
+        if seen.get(cm) is report:
+            continue
+        seen[cm] = report
+        if sources.get(cm) == "upload":
+            continue
+        sources[cm] = "watch"
+        # Copia superficial: el presupuesto de memoria reemplaza .sessions solo en esta sesión
+        st.session_state.cell_manager_data[cm] = replace(report)
+        st.session_state.cell_manager_files[cm] = files[cm]
+        st.session_state.anomaly_detector.ingest(cm, report.sessions)
+        st.session_state.throughput_tracker.ingest(cm, report.sessions)
+        changed.append(cm)
+    SessionMemoryBudget().enforce(st.session_state.cell_manager_data, SPILL_DIR)
+    prune_session_browsers()
+    st.session_state.watch_version = version
+    if changed:
+        save_user_snapshot()
+
+
+def watch_conflicts() -> set[str]:
+    """Cell Managers cargados a mano que también tienen reportes en la carpeta vigilada."""
+    sources = st.session_state.cell_manager_sources
+    return {cm for cm in st.session_state.watch_reports if sources.get(cm) == "upload"}
+
+
+def use_watched_reports(cm: str) -> None:
+    """Reemplaza la carga manual de cm por los reportes de la carpeta vigilada (en el próximo rerun)."""
+    st.session_state.cell_manager_sources[cm] = "watch"
+    st.session_state.watch_reports.pop(cm, None)
+    st.session_state.watch_version = None
+
+
+folder_watcher = get_folder_watcher()
+if folder_watcher is not None:
+    sync_watched_reports(folder_watcher)
 
 # ══════════════════════════════════════════════════════════════
 # SIDEBAR
 # ══════════════════════════════════════════════════════════════
 
 filtered_cm_data = st.session_state.cell_manager_data  # Default: sin filtrar
+filter_range = None  # (inicio, fin) del filtro de fechas activo
 
 with st.sidebar:
     _, col_title, _ = st.columns([1, 8, 1])
@@ -260,7 +432,7 @@ with st.sidebar:
 
 
 
-    page = st.radio("MENÚ", ["📂 Carga de Archivos", "📊 Métricas"], label_visibility="collapsed")
+    page = st.radio("MENÚ", ["📂 Carga de Archivos", "📊 Métricas", "🩺 Diagnóstico"], label_visibility="collapsed")
     st.markdown("---")
 
     # FILTRO DE FECHAS
@@ -287,6 +459,7 @@ with st.sidebar:
                     for cm_name, rep in st.session_state.cell_manager_data.items():
                         new_data[cm_name] = filter_cm_report(rep, start_d, end_d)
                     filtered_cm_data = new_data
+                    filter_range = (start_d, end_d)
                     st.caption(f"Mostrando: {start_d} a {end_d}")
             except Exception as e:
                 st.error(f"Error en filtro: {e}")
@@ -310,19 +483,37 @@ with st.sidebar:
 
     st.markdown("---")
     
-    # Lista Compacta de Items
-    for cm in CELL_MANAGERS:
-        loaded = cm in st.session_state.cell_manager_data
-        if loaded:
-            st.markdown(f"🟢 **{cm}**")
-        else:
-            st.markdown(f"⚪ {cm}")
+    # Lista Compacta de Items (con decenas de Cell Managers, solo a pedido)
+    if len(CELL_MANAGERS) <= SIDEBAR_LIST_LIMIT or st.toggle("Detalle por Cell Manager", key="sidebar_cm_detail"):
+        lines = []
+        for cm in CELL_MANAGERS:
+            if cm in st.session_state.cell_manager_data:
+                on_disk = isinstance(st.session_state.cell_manager_data[cm].sessions, SpilledSessions)
+                lines.append(f"🟢 **{cm}**" + (" 💾" if on_disk else ""))
+            else:
+                lines.append(f"⚪ {cm}")
+        st.markdown("  \n".join(lines))
+    else:
+        st.caption(f"🟢 {cm_loaded} cargados · ⚪ {len(CELL_MANAGERS) - cm_loaded} pendientes")
 
     if has_sched:
         st.markdown(f"🟢 **Schedule**")
     else:
         st.markdown(f"⚪ Schedule")
 
+    if folder_watcher is not None:
+        # Revisa el vigilante sin interacción del usuario y recarga la app si hay datos nuevos
+        @st.fragment(run_every=WATCH_INTERVAL_S)
+        def watch_status():
+            if folder_watcher.version != st.session_state.get("watch_version"):
+                st.rerun()
+            last = time.strftime("%H:%M:%S", time.localtime(folder_watcher.last_scan)) if folder_watcher.last_scan else "—"
+            st.caption(f"📡 Carpeta vigilada · última revisión {last}")
+            if folder_watcher.last_error:
+                st.caption(f"⚠️ {folder_watcher.last_error}")
+
+        watch_status()
+
     # ── ACCIONES (Parte inferior del sidebar) ──
     st.markdown("<br><br>", unsafe_allow_html=True)
     st.markdown("---")
@@ -336,13 +527,17 @@ with st.sidebar:
         col_yes, col_no = st.columns(2)
         if col_yes.button("Sí, borrar", type="primary", use_container_width=True):
             try:
+                release_spilled(st.session_state.cell_manager_data)
                 if os.path.exists(SESSION_TEMP_DIR):
                     shutil.rmtree(SESSION_TEMP_DIR)
                 os.makedirs(SESSION_TEMP_DIR, exist_ok=True)
+                # Sin snapshot: el próximo inicio de sesión arranca vacío
+                if SNAPSHOT_DIR and st.session_state.get("username"):
+                    delete_snapshot(snapshot_owner())
             except Exception as e:
                 print(f"Error limpiando temp: {e}")
             # 2. Resetear variables de datos (MANTENIENDO SESIÓN)
-            keys_to_reset = ["cell_manager_data", "cell_manager_files", "schedule_report", "schedule_file_name"]
+            keys_to_reset = ["cell_manager_data", "cell_manager_files", "schedule_report", "schedule_reports", "schedule_file_name", "schedule_digests", "schedule_uploads", "schedule_sources", "anomaly_detector", "throughput_tracker", "watch_reports", "watch_version", "cell_manager_sources", "cell_manager_uploads", "session_browsers"]
             for key in keys_to_reset:
                 if key in st.session_state:
                     del st.session_state[key]
@@ -361,6 +556,7 @@ with st.sidebar:
     if st.button("🚪 Cerrar Sesión", use_container_width=True):
         # Limpieza física al salir
         try:
+            release_spilled(st.session_state.cell_manager_data)
             if os.path.exists(SESSION_TEMP_DIR):
                 shutil.rmtree(SESSION_TEMP_DIR)
         except Exception:
@@ -389,27 +585,70 @@ def process_cm_files(cm_name: str, files) -> CellManagerReport:
     bar.progress(0.9, text=f"Parseando {len(paths)} archivos...")
     report = parse_multiple_csvs(paths, cm_name)
 
-    bar.progress(1.0, text=f"✅ {cm_name}: {report.total_jobs} jobs procesados")
+    dup_total = sum(report.duplicates_dropped.values())
+    dup_text = f" ({dup_total} duplicados descartados)" if dup_total else ""
+    bar.progress(1.0, text=f"✅ {cm_name}: {report.total_jobs} jobs procesados{dup_text}")
     time.sleep(0.3)
     bar.empty()
 
     return report, paths
 
 
-def process_schedule(file) -> ScheduleReport:
-    """Procesa el Schedule Excel con barra de progreso."""
-    bar = st.progress(0, text="Guardando archivo...")
-    path = save_temp_file(file)
-
-    bar.progress(0.5, text=f"Parseando {file.name}...")
-    period = file.name.replace(".xlsx", "").replace(".xlsm", "")
-    report = parse_schedule_file(path, period)
-
-    bar.progress(1.0, text=f"✅ Schedule cargado: {period}")
+def parse_stats_badge(stats_list: list) -> str:
+    """Insignia con tooltip de calidad de parseo, una línea por archivo."""
+    if not stats_list:
+        return ""
+    lines = []
+    issues = 0
+    for ps in stats_list:
+        skipped = sum(ps.skipped.values())
+        issues += skipped + ps.date_failures + ps.numeric_coercions
+        line = f"{ps.source}: {ps.rows_parsed}/{ps.rows_read} filas"
+        if skipped:
+            line += " · omitidas: " + ", ".join(f"{n} {reason}" for reason, n in ps.skipped.items())
+        if ps.date_failures:
+            line += f" · {ps.date_failures} fechas inválidas"
+        if ps.numeric_coercions:
+            line += f" · {ps.numeric_coercions} números inválidos (0)"
+        lines.append(line)
+    detail = "<br>".join(lines)
+    if issues:
+        return f' <span class="progress-item item-pending tip">⚠ {issues} incidencias de parseo<span class="tip-text">{detail}</span></span>'
+    return f' <span class="progress-item item-done tip">🔎 calidad OK<span class="tip-text">{detail}</span></span>'
+
+
+def schedule_period_name(file_name: str, sources: dict | None = None) -> str:
+    """Nombre de periodo a partir del nombre del archivo del Schedule.
+
+    Sin extensión, salvo que en sources ({periodo: archivo}) ese periodo ya
+    venga de otro archivo (X.xlsx y X.xlsm): entonces el nombre completo.
+    """
+    stem, ext = os.path.splitext(file_name)
+    period = stem if ext.lower() in (".xlsx", ".xlsm") else file_name
+    if (sources or {}).get(period, file_name) != file_name:
+        return file_name
+    return period
+
+
+def process_schedules(uploads) -> list[ScheduleReport]:
+    """Procesa uno o varios Schedules Excel (en paralelo) con barra de progreso.
+
+    uploads: [(UploadedFile, periodo)].
+    """
+    bar = st.progress(0, text="Guardando archivos...")
+    jobs = []
+    for i, (f, period) in enumerate(uploads):
+        bar.progress((i + 1) / (len(uploads) + 1), text=f"Guardando {f.name}...")
+        jobs.append((save_temp_file(f), period))
+
+    bar.progress(0.9, text=f"Parseando {len(jobs)} Schedules...")
+    reports = parse_schedule_files(jobs)
+
+    bar.progress(1.0, text=f"✅ {len(reports)} Schedules cargados")
     time.sleep(0.3)
     bar.empty()
 
-    return report
+    return reports
 
 
 # ══════════════════════════════════════════════════════════════
@@ -436,8 +675,12 @@ if page == "📂 Carga de Archivos":
     color = SUCCESS if pct == 100 else (WARNING if pct > 0 else "#484f58")
 
     items_html = ""
+    # Con muchos Cell Managers los pendientes se resumen en un solo ítem
+    many = len(CELL_MANAGERS) > CONFIG.upload_page_size
     for cm in CELL_MANAGERS:
         loaded = cm in st.session_state.cell_manager_data
+        if many and not loaded:
+            continue
         cls = "item-done" if loaded else "item-pending"
         icon = "✓" if loaded else "○"
         extra = ""
@@ -445,6 +688,9 @@ if page == "📂 Carga de Archivos":
             r = st.session_state.cell_manager_data[cm]
             extra = f" · {r.total_jobs} jobs"
         items_html += f'<span class="progress-item {cls}">{icon} {cm}{extra}</span>'
+    pending = sum(cm not in st.session_state.cell_manager_data for cm in CELL_MANAGERS)
+    if many and pending:
+        items_html += f'<span class="progress-item item-pending">○ {pending} Cell Managers pendientes</span>'
 
     sched_cls = "item-done" if has_sched else "item-pending"
     sched_icon = "✓" if has_sched else "○"
@@ -468,8 +714,33 @@ if page == "📂 Carga de Archivos":
     # ── CELL MANAGERS ──
     st.markdown('<p style="font-size:11px; color:#484f58; font-weight:600; letter-spacing:1px; margin-bottom:4px;">CELL MANAGERS</p>', unsafe_allow_html=True)
 
+    # Búsqueda y paginación: solo se renderizan las tarjetas de la página visible
+    visible_cms = CELL_MANAGERS
+    if len(CELL_MANAGERS) > CONFIG.upload_page_size:
+        g1, g2, g3 = st.columns([3, 1, 1])
+        search = g1.text_input("Buscar Cell Manager", key="cm_search", placeholder="🔎 Buscar Cell Manager",
+                               label_visibility="collapsed").strip().upper()
+        show = g2.selectbox("Mostrar", ["Todos", "Pendientes", "Cargados"], key="cm_show",
+                            label_visibility="collapsed")
+        visible_cms = [
+            cm for cm in CELL_MANAGERS
+            if search in cm.upper()
+            and (show == "Todos" or (cm in st.session_state.cell_manager_data) == (show == "Cargados"))
+        ]
+        total_pages = max(1, -(-len(visible_cms) // CONFIG.upload_page_size))
+        # Una búsqueda nueva puede dejar la página actual fuera de rango
+        if st.session_state.get("cm_page", 1) > total_pages:
+            st.session_state.cm_page = 1
+        grid_page = g3.number_input("Página", min_value=1, max_value=total_pages, step=1,
+                                    key="cm_page", label_visibility="collapsed")
+        offset = (int(grid_page) - 1) * CONFIG.upload_page_size
+        st.caption(f"{len(visible_cms)} Cell Managers · página {int(grid_page)} de {total_pages}")
+        visible_cms = visible_cms[offset:offset + CONFIG.upload_page_size]
+        if not visible_cms:
+            st.caption("Ningún Cell Manager coincide con la búsqueda.")
+
     cols = st.columns(2)
-    for i, cm in enumerate(CELL_MANAGERS):
+    for i, cm in enumerate(visible_cms):
         with cols[i % 2]:
             has_data = cm in st.session_state.cell_manager_data
 
@@ -477,6 +748,13 @@ if page == "📂 Carga de Archivos":
                 report = st.session_state.cell_manager_data[cm]
                 files_count = len(st.session_state.cell_manager_files[cm])
                 status_html = f'<span class="progress-item item-done">✓ {files_count} archivos · {report.total_jobs} jobs · {format_tb(report.size_tb)}</span>'
+                if st.session_state.cell_manager_sources.get(cm) == "watch":
+                    status_html += ' <span class="progress-item item-done">📡 Carpeta vigilada</span>'
+                dup_total = sum(report.duplicates_dropped.values())
+                if dup_total:
+                    dup_detail = ", ".join(f"{name}: {n}" for name, n in report.duplicates_dropped.items() if n)
+                    status_html += f' <span class="progress-item item-pending tip">⧉ {dup_total} duplicados descartados<span class="tip-text">{dup_detail}</span></span>'
+                status_html += parse_stats_badge(report.parse_stats)
             else:
                 status_html = '<span class="progress-item item-pending">○ Sin archivos cargados</span>'
 
@@ -496,16 +774,33 @@ if page == "📂 Carga de Archivos":
 
             csv_files = st.file_uploader(
                 f"CSVs de {cm}",
-                type=["csv"],
+                type=REPORT_EXTENSIONS,
                 accept_multiple_files=True,
                 key=f"csv_{cm}",
                 label_visibility="collapsed",
             )
 
-            if csv_files and (not has_data or len(csv_files) != len(st.session_state.cell_manager_files.get(cm, []))):
+            if cm in watch_conflicts():
+                st.caption("📡 La carpeta vigilada también tiene reportes de este Cell Manager; "
+                           "se muestran los cargados a mano.")
+                if st.button("Usar carpeta vigilada", key=f"use_watch_{cm}"):
+                    use_watched_reports(cm)
+                    st.rerun()
+
+            # Se compara contra lo que se subió por este uploader (no contra los
+            # archivos de la carpeta vigilada): solo una carga nueva se parsea
+            upload_ids = tuple(f.file_id for f in csv_files or [])
+            if csv_files and upload_ids != st.session_state.cell_manager_uploads.get(cm):
                 report, paths = process_cm_files(cm, csv_files)
                 st.session_state.cell_manager_data[cm] = report
                 st.session_state.cell_manager_files[cm] = paths
+                st.session_state.cell_manager_uploads[cm] = upload_ids
+                st.session_state.cell_manager_sources[cm] = "upload"
+                # Solo las sesiones no vistas actualizan las estadísticas
+                st.session_state.anomaly_detector.ingest(cm, report.sessions)
+                st.session_state.throughput_tracker.ingest(cm, report.sessions)
+                SessionMemoryBudget().enforce(st.session_state.cell_manager_data, SPILL_DIR)
+                save_user_snapshot()
                 st.rerun()
 
     # ── SCHEDULE ──
@@ -515,6 +810,11 @@ if page == "📂 Carga de Archivos":
 
     if has_schedule:
         sched_status = f'<span class="progress-item item-done">✓ Periodo: {st.session_state.schedule_report.period_name}</span>'
+        sched_status += parse_stats_badge([
+            st.session_state.schedule_reports[p].parse_stats
+            for p in sorted(st.session_state.schedule_reports, key=period_sort_key)
+            if st.session_state.schedule_reports[p].parse_stats
+        ])
         sched_sub = st.session_state.schedule_file_name
     else:
         sched_status = '<span class="progress-item item-pending">○ Sin archivo cargado</span>'
@@ -534,17 +834,42 @@ if page == "📂 Carga de Archivos":
     </div>
     """, unsafe_allow_html=True)
 
-    schedule_file = st.file_uploader(
+    schedule_files = st.file_uploader(
         "Schedule Excel",
         type=["xlsx", "xlsm"],
+        accept_multiple_files=True,
         key="schedule_upload",
         label_visibility="collapsed",
     )
 
-    if schedule_file and not has_schedule:
-        report = process_schedule(schedule_file)
-        st.session_state.schedule_report = report
-        st.session_state.schedule_file_name = schedule_file.name
+    # Cada archivo del uploader se revisa una sola vez (su digest queda en caché
+    # por file_id). Se parsea si su contenido no es el del libro cargado en su
+    # periodo: un libro corregido, o uno anterior subido de nuevo, reemplaza al actual
+    seen = st.session_state.schedule_uploads
+    loaded = st.session_state.schedule_digests
+    claimed = dict(st.session_state.schedule_sources)
+    new_schedules = []  # [(archivo, periodo, digest)]
+    for f in schedule_files or []:
+        if f.file_id in seen:
+            continue
+        digest = seen[f.file_id] = buffer_digest(f.getbuffer())
+        period = schedule_period_name(f.name, claimed)
+        if loaded.get(period) == digest or any(p == period and d == digest for _, p, d in new_schedules):
+            continue
+        claimed[period] = f.name
+        new_schedules.append((f, period, digest))
+    # El caché solo conserva los archivos que siguen en el uploader
+    st.session_state.schedule_uploads = {f.file_id: seen[f.file_id] for f in schedule_files or []}
+    if new_schedules:
+        reports = dict(st.session_state.schedule_reports)
+        uploads = [(f, period) for f, period, _ in new_schedules]
+        for (f, _, digest), report in zip(new_schedules, process_schedules(uploads)):
+            # El digest anterior del periodo se descarta junto con su libro
+            loaded[report.period_name] = digest
+            st.session_state.schedule_sources[report.period_name] = f.name
+            reports[report.period_name] = report
+        set_schedule_reports(reports)
+        save_user_snapshot()
         st.rerun()
 
 
@@ -553,6 +878,8 @@ if page == "📂 Carga de Archivos":
 # ══════════════════════════════════════════════════════════════
 
 elif page == "📊 Métricas":
+    import pandas as pd
+
     st.markdown("""
     <div class="main-header">
         <div class="header-icon">📊</div>
@@ -583,20 +910,21 @@ elif page == "📊 Métricas":
     if cell_manager_data:
         st.subheader("Resumen por Cell Manager")
 
-        total_jobs = sum(r.total_jobs for r in cell_manager_data.values())
-        total_policies = sum(r.total_policies for r in cell_manager_data.values())
-        total_tb = sum(r.size_tb for r in cell_manager_data.values())
-        avg_compliance = (
-            sum(r.compliance_pct * r.total_jobs for r in cell_manager_data.values()) / total_jobs
-            if total_jobs > 0 else 0
-        )
+        # Totales combinando los parciales por (Cell Manager, día) de los reportes completos
+        start_d, end_d = filter_range if filter_range else (None, None)
+        daily_by_cm = {cm: st.session_state.cell_manager_data[cm].partials for cm in cell_manager_data}
+        overall = merge_all(p for daily in daily_by_cm.values() for p in select(daily, start_d, end_d))
+        total_jobs = overall.jobs
+        total_policies = overall.policies
+        total_tb = overall.size_tb
+        avg_compliance = overall.compliance_pct
 
         # Tarjetas individuales de totales
         c1, c2, c3, c4 = st.columns(4)
         c1.metric("💼 Total Jobs", f"{total_jobs:,}", help="Suma de todos los jobs de backup ejecutados en todos los Cell Managers.")
         c2.metric("📋 Políticas Únicas", str(total_policies), help="Cantidad de políticas de backup únicas configuradas en todos los Cell Managers.")
         c3.metric("💾 Size Total", format_tb(total_tb), help="Tamaño total en Terabytes de datos respaldados.")
-        c4.metric("✅ Cumplimiento", format_pct(avg_compliance), help="Promedio ponderado: Σ(cumplimiento × jobs) / total_jobs")
+        c4.metric("✅ Cumplimiento", format_pct(avg_compliance), help="Jobs exitosos / total de jobs, sobre todos los Cell Managers.")
         
         st.markdown("<br>", unsafe_allow_html=True)
 
@@ -631,6 +959,238 @@ elif page == "📊 Métricas":
             },
         )
 
+        # Totales por semana (lunes a domingo) dentro del rango
+        all_daily = {}
+        for daily in daily_by_cm.values():
+            for day, part in daily.items():
+                all_daily.setdefault(day, []).append(part)
+        weeks = weekly_partials({
+            day: merge_all(parts) for day, parts in all_daily.items() if day_in_range(day, start_d, end_d)
+        })
+        if len(weeks) > 1:
+            st.markdown("##### 📆 Totales por Semana")
+            df_weeks = pd.DataFrame([{
+                "Semana": week_label(week),
+                "Jobs": part.jobs,
+                "Cant. Políticas": part.policies,
+                "Size TB": part.size_tb,
+                "% Cumplimiento": part.compliance_pct,
+            } for week, part in sorted(weeks.items())])
+            st.dataframe(
+                df_weeks,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Size TB": st.column_config.NumberColumn("Size TB", format="%.2f"),
+                    "% Cumplimiento": st.column_config.NumberColumn("% Cumplimiento", format="%.2f%%"),
+                },
+            )
+
+    # ══════════════════════════════════════════════════════
+    # TOP POLÍTICAS
+    # ══════════════════════════════════════════════════════
+
+    if cell_manager_data:
+        st.markdown("---")
+        st.subheader("Top Políticas")
+
+        top_metrics = {
+            "Sesiones fallidas": "failures",
+            "GB escritos": "gb_written",
+            "Errores": "errors",
+            "Failed DA": "failed_da",
+        }
+        t1, t2, t3 = st.columns([2, 2, 1])
+        top_cm = t1.selectbox("Cell Manager", ["Todos"] + list(cell_manager_data.keys()), key="top_cm")
+        top_label = t2.selectbox("Ordenar por", list(top_metrics.keys()), key="top_metric")
+        top_n = t3.number_input("Top N", min_value=1, max_value=500, value=10, step=5, key="top_n")
+
+        # El índice vive en el reporte completo; el filtro de fechas se aplica sobre él
+        indexes = {
+            cm: st.session_state.cell_manager_data[cm].spec_index
+            for cm in cell_manager_data
+            if top_cm in ("Todos", cm)
+        }
+        start_d, end_d = filter_range if filter_range else (None, None)
+        top_rows = top_specs(indexes, top_metrics[top_label], int(top_n), start_d, end_d)
+
+        if top_rows:
+            df_top = pd.DataFrame([{
+                "Cell Manager": r["cell_manager"],
+                "Especificación": r["specification"],
+                "Fallidos": int(r["failures"]),
+                "GB Escritos": r["gb_written"],
+                "Errores": int(r["errors"]),
+                "Failed DA": int(r["failed_da"]),
+                "Jobs": int(r["jobs"]),
+            } for r in top_rows])
+            st.dataframe(
+                df_top,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "GB Escritos": st.column_config.NumberColumn(format="%.2f"),
+                },
+            )
+        else:
+            st.caption("Sin especificaciones con valores para la métrica en el rango seleccionado.")
+
+    # ══════════════════════════════════════════════════════
+    # EXPLORADOR DE SESIONES
+    # ══════════════════════════════════════════════════════
+
+    if cell_manager_data:
+        st.markdown("---")
+        st.subheader("Explorador de Sesiones")
+
+        # Fragmento: paginar, ordenar o buscar solo re-ejecuta esta sección
+        @st.fragment
+        def session_explorer():
+            e1, e2, e3 = st.columns([2, 3, 2])
+            sx_cm = e1.selectbox("Cell Manager", list(cell_manager_data), key="sx_cm")
+            sx_spec = e2.text_input("Especificación", key="sx_spec", placeholder="Prefijo, p. ej. FS_")
+            sx_sid = e3.text_input("Session ID", key="sx_sid", placeholder="Contiene...")
+            browser = get_session_browser(sx_cm)
+
+            f1, f2, f3 = st.columns([3, 2, 1])
+            sx_statuses = f1.multiselect("Status", browser.statuses, key=f"sx_status_{sx_cm}", placeholder="Todos")
+            sx_sort = f2.selectbox("Ordenar por", list(SORT_FIELDS), format_func=SORT_FIELDS.get, key="sx_sort")
+            sx_desc = f3.toggle("Desc.", value=True, key="sx_desc")
+
+            start_d, end_d = filter_range if filter_range else (None, None)
+            rows = browser.query(sx_sort, sx_desc, sx_spec, sx_statuses, sx_sid, start_d, end_d)
+            total_pages = max(1, -(-len(rows) // SESSION_PAGE_SIZE))
+            if st.session_state.get("sx_page", 1) > total_pages:
+                st.session_state.sx_page = 1
+
+            # Solo la página visible se convierte en filas para el navegador
+            records = browser.page(rows, st.session_state.get("sx_page", 1), SESSION_PAGE_SIZE)
+            df_sessions = pd.DataFrame([{
+                "Inicio": s.start_datetime,
+                "Especificación": s.specification,
+                "Status": s.status,
+                "Modo": s.mode,
+                "Duración": s.duration,
+                "GB Escritos": s.gb_written,
+                "Errores": s.errors,
+                "Warnings": s.warnings,
+                "Failed DA": s.failed_da,
+                "Success": s.success,
+                "Session ID": s.session_id,
+            } for s in records])
+            st.dataframe(
+                df_sessions,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Inicio": st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm"),
+                    "GB Escritos": st.column_config.NumberColumn(format="%.2f"),
+                },
+            )
+
+            p1, p2 = st.columns([1, 4])
+            p1.number_input("Página", min_value=1, max_value=total_pages, step=1, key="sx_page")
+            p2.caption(f"{len(rows):,} de {len(browser):,} sesiones · {total_pages:,} pág. de {SESSION_PAGE_SIZE} filas")
+
+        session_explorer()
+
+    # ══════════════════════════════════════════════════════
+    # ANOMALÍAS POR ESPECIFICACIÓN
+    # ══════════════════════════════════════════════════════
+
+    if cell_manager_data:
+        flags = st.session_state.anomaly_detector.flags
+        # Mismo rango de fechas que el resto de la vista
+        if filter_range:
+            flags = [
+                f for f in flags
+                if f.start_datetime and filter_range[0] <= f.start_datetime.date() <= filter_range[1]
+            ]
+
+        st.markdown("---")
+        st.subheader("Anomalías por Especificación")
+        if flags:
+            metric_labels = {"gb_written": "GB escritos (bajo)", "duration_h": "Duración h (alta)"}
+            df_anom = pd.DataFrame([{
+                "Cell Manager": f.cell_manager,
+                "Especificación": f.specification,
+                "Session ID": f.session_id,
+                "Inicio": f.start_datetime,
+                "Métrica": metric_labels.get(f.metric, f.metric),
+                "Valor": f.value,
+                "Media": f.mean,
+                "Desv.": f.std,
+                "z": f.z,
+            } for f in sorted(flags, key=lambda f: -abs(f.z))])
+            st.dataframe(
+                df_anom,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Valor": st.column_config.NumberColumn(format="%.2f"),
+                    "Media": st.column_config.NumberColumn(format="%.2f"),
+                    "Desv.": st.column_config.NumberColumn(format="%.2f"),
+                    "z": st.column_config.NumberColumn(format="%+.2f"),
+                },
+            )
+        else:
+            st.caption("Sin sesiones atípicas en el rango seleccionado.")
+
+    # ══════════════════════════════════════════════════════
+    # THROUGHPUT Y VENTANA DE BACKUP
+    # ══════════════════════════════════════════════════════
+
+    if cell_manager_data:
+        st.markdown("---")
+        st.subheader("Throughput y Ventana de Backup")
+        st.caption("Sesiones exitosas de toda la historia cargada (el filtro de fechas no aplica).")
+        tracker = st.session_state.throughput_tracker
+
+        weekly = tracker.cell_manager_weekly(set(cell_manager_data))
+        if any(len(by_week) > 1 for by_week in weekly.values()):
+            st.markdown("##### ⚡ GB/h por Cell Manager (semanal)")
+            df_tp = pd.DataFrame({
+                cm: {date.fromordinal(week): gb_h for week, gb_h in by_week.items()}
+                for cm, by_week in weekly.items()
+            }).sort_index()
+            st.line_chart(df_tp)
+
+        w1, w2, w3 = st.columns(3)
+        window_h = w1.number_input("Ventana de backup (h)", min_value=0.5, max_value=48.0, value=BACKUP_WINDOW_H,
+                                   step=0.5, key="tp_window")
+        horizon = w2.slider("Horizonte (semanas)", min_value=1, max_value=12, value=4, key="tp_horizon")
+        min_pct = w3.slider("Uso proyectado mínimo (%)", min_value=0, max_value=150, value=80, step=5, key="tp_min_pct")
+
+        forecasts = tracker.forecast(horizon, window_h, set(cell_manager_data))
+        at_risk = sorted((f for f in forecasts if f.window_pct >= min_pct), key=lambda f: -f.window_pct)
+        if at_risk:
+            df_fc = pd.DataFrame([{
+                "Cell Manager": f.cell_manager,
+                "Especificación": f.specification,
+                "Semanas": f.weeks,
+                "Duración actual (h)": f.last_hours,
+                "Tendencia (h/sem)": f.slope_h_week,
+                "Proyección (h)": f.forecast_hours,
+                "% Ventana": f.window_pct,
+                "Semanas a la ventana": f.weeks_to_window,
+                "GB/h": f.last_gb_h,
+            } for f in at_risk[:200]])
+            st.dataframe(
+                df_fc,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Tendencia (h/sem)": st.column_config.NumberColumn(format="%+.3f"),
+                    "% Ventana": st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=150),
+                    "Semanas a la ventana": st.column_config.NumberColumn(format="%.1f"),
+                },
+            )
+            st.caption(f"{len(at_risk):,} de {len(forecasts):,} especificaciones con tendencia (mostrando hasta 200).")
+        elif forecasts:
+            st.caption(f"Ninguna especificación proyecta usar {min_pct}% o más de la ventana en {horizon} semanas.")
+        else:
+            st.caption(f"Se necesitan al menos {MIN_WEEKS} semanas con datos por especificación para proyectar.")
+
     # ══════════════════════════════════════════════════════
     # SCHEDULE
     # ══════════════════════════════════════════════════════
@@ -638,6 +1198,15 @@ elif page == "📊 Métricas":
     if schedule_report:
         st.markdown("---")
         st.subheader("Schedule Mensual")
+        schedule_reports = st.session_state.schedule_reports
+        if len(schedule_reports) > 1:
+            periods = sorted(schedule_reports, key=period_sort_key)
+            selected_period = st.selectbox(
+                "Periodo",
+                periods,
+                index=periods.index(schedule_report.period_name) if schedule_report.period_name in periods else len(periods) - 1,
+            )
+            schedule_report = schedule_reports[selected_period]
         st.caption(f"Periodo: {schedule_report.period_name}")
         sr = schedule_report
 
@@ -735,4 +1304,133 @@ elif page == "📊 Métricas":
             },
         )
 
+        # ── Jobs fallidos, relanzados o con caso (sin reabrir el libro) ──
+        if sr.detail is not None and len(sr.detail):
+            st.markdown("##### 🔍 Jobs Fallidos y Relanzados")
+            f1, f2 = st.columns(2)
+            sel_platforms = f1.multiselect("Plataforma", sr.detail.values("platform"), key="detail_platforms",
+                                           placeholder="Todas")
+            sel_statuses = f2.multiselect("Status", sorted(sr.detail.values("status")), key="detail_statuses",
+                                          placeholder="Todos")
+            detail_rows = sr.detail.select(sel_platforms or None, sel_statuses or None)
+            df_detail = pd.DataFrame(detail_rows, columns=["platform", "job", "status", "relaunch_id", "ticket"])
+            df_detail.columns = ["Plataforma", "Job", "Status", "Job ID Relanzado", "Caso ITSM"]
+            st.dataframe(df_detail, use_container_width=True, hide_index=True)
+            st.caption(f"{len(detail_rows):,} de {len(sr.detail):,} jobs")
+
+        # ── Tendencia mes a mes (varios Schedules cargados) ──
+        if len(schedule_reports) > 1:
+            matrix = ScheduleMatrix.from_reports(list(schedule_reports.values()))
+
+            st.markdown("##### 📈 Tendencia Mensual")
+            st.caption("Variaciones (Δ) en puntos porcentuales respecto al periodo anterior.")
+            df_trend = pd.DataFrame(matrix.trend_rows())
+            pct_cols = ["Ind. Efect. Op.", "Relanzamiento", "Gest. Fallidos"]
+            delta_cols = ["Δ Efect. Op.", "Δ Relanzamiento", "Δ Gest. Fallidos"]
+            st.dataframe(
+                df_trend,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    **{c: st.column_config.NumberColumn(format="%.2f%%") for c in pct_cols},
+                    **{c: st.column_config.NumberColumn(format="%+.2f") for c in delta_cols},
+                },
+            )
+
+            st.markdown("##### 🧭 Ind. Efect. Op. por Plataforma")
+            df_platform = pd.DataFrame(
+                matrix.platform_kpis()["kpi_operacion"],
+                index=matrix.platforms,
+                columns=matrix.periods,
+            )
+            st.dataframe(
+                df_platform,
+                use_container_width=True,
+                column_config={c: st.column_config.NumberColumn(format="%.2f%%") for c in matrix.periods},
+            )
+
+
+# ══════════════════════════════════════════════════════════════
+# VISTA: DIAGNÓSTICO
+# ══════════════════════════════════════════════════════════════
+
+elif page == "🩺 Diagnóstico":
+    import pandas as pd
 
+    st.markdown("""
+    <div class="main-header">
+        <div class="header-icon">🩺</div>
+        <div>
+            <div class="header-title">Diagnóstico</div>
+            <div class="header-sub">Uso de disco temporal y limpieza automática</div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    mb = 1024 * 1024
+    usage = temp_janitor.usage()
+    total_bytes = sum(u.total_bytes for u in usage)
+    own = next((u for u in usage if u.session_id == st.session_state.session_id), None)
+    own_bytes = own.total_bytes if own else 0
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Temporales (todas las sesiones)", f"{total_bytes / mb:,.1f} MB",
+              f"cuota {temp_janitor.global_quota / mb:,.0f} MB", delta_color="off")
+    c2.metric("Esta sesión", f"{own_bytes / mb:,.1f} MB",
+              f"cuota {temp_janitor.session_quota / mb:,.0f} MB", delta_color="off")
+    c3.metric("Sesiones con directorio", f"{len(usage)}",
+              f"expiran tras {temp_janitor.idle_seconds / 3600:g} h sin uso", delta_color="off")
+    st.progress(min(total_bytes / temp_janitor.global_quota, 1.0) if temp_janitor.global_quota else 0.0)
+
+    run = temp_janitor.last_run
+    if run is not None:
+        st.caption(
+            f"Última limpieza: {time.strftime('%d/%m %H:%M:%S', time.localtime(run.finished_at))} · "
+            f"{run.expired_sessions} sesiones expiradas · {run.evicted_sessions} desalojadas por cuota · "
+            f"{run.removed_files} archivos borrados · {run.freed_bytes / mb:,.1f} MB liberados"
+        )
+    if temp_janitor.last_error:
+        st.caption(f"⚠️ {temp_janitor.last_error}")
+    if st.button("🧹 Ejecutar limpieza ahora"):
+        temp_janitor.run_once()
+        st.rerun()
+
+    if usage:
+        now = time.time()
+        df_usage = pd.DataFrame([{
+            "Sesión": u.session_id[:8] + (" (esta)" if u is own else ""),
+            "Subidos (MB)": u.upload_bytes / mb,
+            "Volcado (MB)": u.spill_bytes / mb,
+            "Archivos": u.files,
+            "Inactiva (min)": max(now - u.last_access, 0) / 60,
+        } for u in sorted(usage, key=lambda u: u.total_bytes, reverse=True)])
+        st.dataframe(
+            df_usage,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Subidos (MB)": st.column_config.NumberColumn(format="%.1f"),
+                "Volcado (MB)": st.column_config.NumberColumn(format="%.1f"),
+                "Inactiva (min)": st.column_config.NumberColumn(format="%.0f"),
+            },
+        )
+
+    if st.session_state.cell_manager_data:
+        st.markdown("##### 🧠 Memoria de la sesión")
+        resident = SessionMemoryBudget().usage(st.session_state.cell_manager_data)
+        browsers = st.session_state.session_browsers
+        st.dataframe(
+            pd.DataFrame([{
+                "Cell Manager": cm,
+                "Sesiones": len(rep.sessions),
+                "En disco": isinstance(rep.sessions, SpilledSessions),
+                "Memoria estimada (MB)": resident[cm] / mb,
+                "Índices explorador (MB)": browsers[cm][1].nbytes / mb if cm in browsers else 0.0,
+            } for cm, rep in st.session_state.cell_manager_data.items()]),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Memoria estimada (MB)": st.column_config.NumberColumn(format="%.1f"),
+                "Índices explorador (MB)": st.column_config.NumberColumn(format="%.1f"),
+            },
+        )
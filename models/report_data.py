@@ -26,6 +26,17 @@ class SessionRecord:
     start_datetime: Optional[object] = None  # datetime object for filtering
 
 
+@dataclass
+class ParseStats:
+    """Contadores de calidad de datos de un archivo parseado."""
+    source: str = ""  # Nombre del archivo
+    rows_read: int = 0  # Filas de datos leídas (sin contar líneas vacías)
+    rows_parsed: int = 0
+    skipped: dict = field(default_factory=dict)  # {motivo: filas omitidas}
+    date_failures: int = 0  # Fechas presentes que no se pudieron interpretar
+    numeric_coercions: int = 0  # Valores numéricos inválidos, reemplazados por 0
+
+
 @dataclass
 class CellManagerReport:
     """Resumen procesado de un Cell Manager desde los CSVs."""
@@ -35,6 +46,10 @@ class CellManagerReport:
     size_tb: float = 0.0
     compliance_pct: float = 0.0
     sessions: list = field(default_factory=list)
+    duplicates_dropped: dict = field(default_factory=dict)  # {archivo: sesiones duplicadas descartadas}
+    spec_index: Optional[object] = None  # SpecIndex: agregados por (día, especificación)
+    parse_stats: list = field(default_factory=list)  # List[ParseStats], uno por archivo
+    partials: dict = field(default_factory=dict)  # {ordinal del día: PartialAggregate}
 
 
 @dataclass
@@ -65,3 +80,5 @@ class ScheduleReport:
     kpi_operacion_general: float = 0.0
     kpi_gestion_fallidos_general: float = 0.0
     pct_relanzados_general: float = 0.0
+    parse_stats: Optional[ParseStats] = None  # Calidad de datos del archivo
+    detail: Optional[object] = None  # ScheduleDetail: jobs fallidos, relanzados o con caso
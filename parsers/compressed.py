@@ -0,0 +1,163 @@
+"""Lectura en streaming de reportes comprimidos (.gz y paquetes .zip).
+
+Los exports mensuales llegan comprimidos: un reporte suelto como .csv.gz o
+varios reportes semanales dentro de un .zip. Cada miembro se descomprime como
+flujo directo hacia el parser, por bloques de líneas, sin inflarlo completo
+en disco ni en memoria.
+"""
+
+import gzip
+import io
+import os
+import posixpath
+import random
+import zipfile
+
+from parsers.mapped_csv import MappedReport, header_columns, is_header_line, split_text_lines
+
+# Extensiones aceptadas en la carga de reportes de sesiones
+REPORT_EXTENSIONS = ["csv", "gz", "zip"]
+
+
+def is_bundle(path: str) -> bool:
+    return path.lower().endswith(".zip")
+
+
+def bundle_members(path: str) -> list[str]:
+    """Reportes dentro de un .zip (sin directorios ni metadatos de macOS), en orden de nombre."""
+    with zipfile.ZipFile(path) as zf:
+        return sorted(
+            info.filename for info in zf.infolist()
+            if not info.is_dir()
+            and not posixpath.basename(info.filename).startswith(".")
+            and not info.filename.startswith("__MACOSX/")
+            and info.filename.lower().endswith((".csv", ".txt", ".tsv"))
+        )
+
+
+class StreamReport:
+    """Reporte de sesiones leído como flujo de texto, con la interfaz de MappedReport.
+
+    Solo se recorre una vez: el header se busca consumiendo líneas y luego
+    iter_blocks (o iter_chunks) entrega el resto por bloques. El header se
+    reconoce con is_header_line, igual que en MappedReport, así que cualquier
+    contenedor da el mismo resultado.
+    """
+
+    def __init__(self, binary_stream, encoding: str = "utf-8"):
+        # utf-8-sig descarta el BOM inicial si lo hay
+        if encoding.lower().replace("_", "-") == "utf-8":
+            encoding = "utf-8-sig"
+        self._raw = binary_stream
+        self._text = io.TextIOWrapper(binary_stream, encoding=encoding, errors="replace", newline=None)
+        self.header_offset = None  # Número de línea del header, o None si no hay
+        self.headers = []
+        self._head = None  # primer bloque, leído por adelantado por sample
+        for lineno, line in enumerate(self._text):
+            if is_header_line(line):
+                self.header_offset = lineno
+                self.headers = header_columns(line)
+                break
+
+    def close(self) -> None:
+        self._text.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_block(self, chunk_bytes: int) -> str:
+        block = self._text.read(chunk_bytes)
+        if block and not block.endswith("\n"):
+            block += self._text.readline()
+        return block
+
+    def iter_blocks(self, chunk_bytes: int = 4 * 1024 * 1024):
+        """Genera el texto restante en bloques de ~chunk_bytes que terminan en salto de línea.
+
+        Se descomprime a medida que se consumen; los saltos de línea ya llegan
+        normalizados a "\n".
+        """
+        if self.header_offset is None:
+            return
+        if self._head is not None:
+            head, self._head = self._head, None
+            if head:
+                yield head
+        while block := self._read_block(chunk_bytes):
+            yield block
+
+    def sample(self, k: int = 50, seed: int = 0) -> list[str]:
+        """Muestra aleatoria de filas no vacías del primer bloque (un flujo no admite acceso aleatorio)."""
+        if self.header_offset is None:
+            return []
+        if self._head is None:
+            self._head = self._read_block(4 * 1024 * 1024)
+        lines = [line for line in self.split_lines(self._head) if line.strip()]
+        if not lines:
+            return []
+        indices = sorted(random.Random(seed).sample(range(len(lines)), min(k, len(lines))))
+        return [lines[i] for i in indices]
+
+    @staticmethod
+    def split_lines(block: str) -> list[str]:
+        """Líneas de un bloque de iter_blocks."""
+        return split_text_lines(block)
+
+    def iter_chunks(self, chunk_bytes: int = 4 * 1024 * 1024):
+        """Genera listas de líneas de ~chunk_bytes, descomprimiendo a medida que se consumen."""
+        for block in self.iter_blocks(chunk_bytes):
+            yield self.split_lines(block)
+
+
+def open_report(file_path: str, member: str | None = None):
+    """Abre un reporte de sesiones según su tipo.
+
+    - .csv (u otro texto): MappedReport, mapeado en memoria.
+    - .gz: StreamReport sobre gzip.
+    - .zip: StreamReport sobre el miembro indicado.
+    """
+    lower = file_path.lower()
+    if member is not None:
+        zf = zipfile.ZipFile(file_path)
+        try:
+            stream = zf.open(member)
+        except Exception:
+            zf.close()
+            raise
+        # El ZipFile se cierra junto con el miembro
+        return StreamReport(io.BufferedReader(_ClosingStream(stream, zf)))
+    if lower.endswith(".gz"):
+        return StreamReport(gzip.open(file_path, "rb"))
+    return MappedReport(file_path)
+
+
+def source_name(file_path: str, member: str | None = None) -> str:
+    """Nombre visible de un reporte: archivo, o paquete/miembro."""
+    base = os.path.basename(file_path)
+    return f"{base}/{member}" if member is not None else base
+
+
+class _ClosingStream(io.RawIOBase):
+    """Envuelve el miembro de un zip y cierra también el ZipFile al cerrarse."""
+
+    def __init__(self, stream, owner):
+        self._stream = stream
+        self._owner = owner
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stream.close()
+            self._owner.close()
+        super().close()
@@ -2,119 +2,182 @@
 
 import csv
 import io
-from models.report_data import SessionRecord, CellManagerReport
+import os
+from models.report_data import SessionRecord, CellManagerReport, ParseStats
+from parsers import fast_engine
+from parsers.compressed import bundle_members, is_bundle, open_report, source_name
+from parsers.row_decoder import DateParser, RowDecoder
+from utils.aggregates import daily_partials
+from utils.parallel import parallel_map
+from utils.spec_index import SpecIndex
 
 
-def parse_csv_file(file_path: str) -> list[SessionRecord]:
+# Para fechas sueltas (End Time al deduplicar); cada archivo usa el suyo en RowDecoder
+_parse_datetime = DateParser()
+
+# Motores de parseo: "python" (fila por fila) y "fast" (por columnas, ver parsers.fast_engine)
+ENGINES = ("python", "fast")
+DEFAULT_ENGINE = os.environ.get("BACKUP_DASHBOARD_CSV_ENGINE") or ("fast" if fast_engine.available() else "python")
+
+
+def resolve_engine(engine: str | None = None) -> str:
+    """Motor efectivo: el pedido (o DEFAULT_ENGINE); "fast" sin pandas cae a "python"."""
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de parseo desconocido: {engine!r} (opciones: {', '.join(ENGINES)})")
+    if engine == "fast" and not fast_engine.available():
+        return "python"
+    return engine
+
+
+def parse_csv_file(file_path: str, stats: ParseStats | None = None,
+                   member: str | None = None, engine: str | None = None) -> list[SessionRecord]:
     """Parsea un archivo CSV de reporte semanal de sesiones.
 
     El formato de Data Protector usa TSV con headers en la línea 8:
     Session Type, Specification, Status, Mode, Start Time, ...
+
+    Acepta también .gz y, con member, un reporte dentro de un .zip; ambos se
+    descomprimen en streaming (ver parsers.compressed).
+
+    engine elige el motor ("python" o "fast", por defecto DEFAULT_ENGINE). El
+    motor "fast" produce exactamente las mismas sesiones; los archivos que no
+    puede leer con garantía de igualdad se parsean con el motor "python".
+
+    Si se pasa stats, se completa con los contadores de calidad del archivo.
     """
+    engine = resolve_engine(engine)
     sessions = []
+    short_rows = 0
+    source = source_name(file_path, member)
+
+    with open_report(file_path, member) as report:
+        # El header (línea que empieza con "# Session Type") se ubica con una
+        # búsqueda de bytes sobre el archivo mapeado, o leyendo el flujo
+        if report.header_offset is None:
+            if stats is not None:
+                stats.source = source
+                stats.skipped["sin header de sesiones"] = 1
+            return sessions
+
+        # Las columnas se resuelven por nombre una vez por archivo
+        decoder = RowDecoder(report.headers)
+        decode = decoder.decode
+        # Formato de fechas elegido sobre filas repartidas por el archivo, no solo las primeras
+        decoder.detect_date_format(report.sample())
+
+        # Parsear datos por bloques (texto después del header). El motor "fast"
+        # retorna None para un bloque irregular, que sigue el bucle fila a fila
+        fast = engine == "fast"
+        for block in report.iter_blocks():
+            rows = fast_engine.parse_rows(block, decoder) if fast else None
+            if rows is not None:
+                sessions.extend(rows)
+                continue
+
+            for line in report.split_lines(block):
+                line = line.strip()
+                if not line:
+                    continue
+
+                fields = line.split("\t")
+                if len(fields) < 10:
+                    short_rows += 1
+                    continue
+
+                sessions.append(decode(fields))
+
+    if stats is not None:
+        # Filas leídas = parseadas + omitidas: el bucle no lleva más contadores
+        stats.source = source
+        stats.rows_parsed = len(sessions)
+        stats.rows_read = len(sessions) + short_rows
+        if short_rows:
+            stats.skipped["menos de 10 columnas"] = short_rows
+        stats.date_failures = decoder.date_failures
+        stats.numeric_coercions = decoder.numeric_coercions
+    return sessions
 
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        lines = f.readlines()
-
-    # Encontrar la línea de headers (empieza con "# Session Type")
-    header_line_idx = None
-    for i, line in enumerate(lines):
-        if line.strip().startswith("# Session Type"):
-            header_line_idx = i
-            break
-
-    if header_line_idx is None:
-        return sessions
-
-    # Parsear headers
-    header_raw = lines[header_line_idx].lstrip("# ").strip()
-    headers = header_raw.split("\t")
-
-    # Parsear datos (líneas después del header)
-    for line in lines[header_line_idx + 1:]:
-        line = line.strip()
-        if not line:
-            continue
-
-        fields = line.split("\t")
-        if len(fields) < 10:
-            continue
-
-        try:
-            gb_written = float(fields[10]) if len(fields) > 10 and fields[10] else 0.0
-        except (ValueError, IndexError):
-            gb_written = 0.0
-
-        try:
-            errors = int(fields[12]) if len(fields) > 12 and fields[12] else 0
-        except (ValueError, IndexError):
-            errors = 0
-
-        try:
-            failed_da = int(fields[16]) if len(fields) > 16 and fields[16] else 0
-        except (ValueError, IndexError):
-            failed_da = 0
-
-        try:
-            completed_da = int(fields[17]) if len(fields) > 17 and fields[17] else 0
-        except (ValueError, IndexError):
-            completed_da = 0
-
-        success_val = fields[20].strip() if len(fields) > 20 else "0%"
-
-        # Intentar parsear fecha
-        dt_obj = None
-        start_time_str = fields[4].strip() if len(fields) > 4 else ""
-        if start_time_str:
-            try:
-                # Formato esperado Data Protector: "MM/DD/YYYY HH:MM:SS AM/PM"
-                # Pero puede variar según locale. Usamos dateutil si estuviera o try formats.
-                # Asumimos formato MDY primero, luego DMY
-                from dateutil import parser
-                dt_obj = parser.parse(start_time_str)
-            except ImportError:
-                 # Fallback básico si no hay dateutil (pandas lo suele instalar pero por si acaso)
-                 from datetime import datetime
-                 try:
-                     dt_obj = datetime.strptime(start_time_str, "%m/%d/%Y %I:%M:%S %p")
-                 except ValueError:
-                     try:
-                         dt_obj = datetime.strptime(start_time_str, "%d/%m/%Y %H:%M:%S")
-                     except ValueError:
-                         pass
-            except Exception:
-                pass
-
-        session = SessionRecord(
-            session_type=fields[0].strip() if len(fields) > 0 else "",
-            specification=fields[1].strip() if len(fields) > 1 else "",
-            status=fields[2].strip() if len(fields) > 2 else "",
-            mode=fields[3].strip() if len(fields) > 3 else "",
-            start_time=start_time_str,
-            end_time=fields[6].strip() if len(fields) > 6 else "",
-            duration=fields[9].strip() if len(fields) > 9 else "",
-            gb_written=gb_written,
-            errors=errors,
-            failed_da=failed_da,
-            completed_da=completed_da,
-            success=success_val,
-            session_id=fields[22].strip() if len(fields) > 22 else "",
-            start_datetime=dt_obj,
-        )
-        sessions.append(session)
 
-    return sessions
+def _parse_bundle_member(job: tuple[str, str, str]) -> tuple[list[SessionRecord], ParseStats]:
+    """Tarea de parse_bundle, ejecutada en un proceso hijo."""
+    bundle_path, member, engine = job
+    stats = ParseStats()
+    return parse_csv_file(bundle_path, stats, member, engine), stats
 
 
-def parse_multiple_csvs(file_paths: list[str], cell_manager_name: str) -> CellManagerReport:
-    """Procesa múltiples CSVs de un mismo Cell Manager y genera el resumen."""
-    all_sessions = []
+def parse_bundle(bundle_path: str, max_workers: int | None = None,
+                 engine: str | None = None) -> list[tuple[str, list[SessionRecord], ParseStats]]:
+    """Parsea en paralelo los reportes de un .zip.
 
-    for fp in file_paths:
-        sessions = parse_csv_file(fp)
-        all_sessions.extend(sessions)
+    Cada proceso abre el paquete y descomprime solo su miembro en streaming.
+    Retorna [(nombre, sesiones, stats)] en el orden de los miembros.
+    """
+    members = bundle_members(bundle_path)
+    # Se resuelve una vez aquí y viaja en cada tarea
+    engine = resolve_engine(engine)
+    results = parallel_map(_parse_bundle_member, [(bundle_path, m, engine) for m in members], max_workers)
+    return [(source_name(bundle_path, m), sessions, stats) for m, (sessions, stats) in zip(members, results)]
+
+
+def _is_newer_record(candidate: SessionRecord, current: SessionRecord) -> bool:
+    """Decide si un registro duplicado reemplaza al que ya está en el índice.
 
-    # Calcular métricas
+    Regla: gana el registro con End Time más reciente. Un registro sin End Time
+    (sesión aún en curso al exportar) nunca reemplaza a uno terminado. En empate,
+    o si ninguno tiene End Time, gana el del archivo procesado después.
+    """
+    current_end = _parse_datetime(current.end_time)
+    if current_end is None:
+        return True
+    candidate_end = _parse_datetime(candidate.end_time)
+    if candidate_end is None:
+        return False
+    try:
+        return candidate_end >= current_end
+    except TypeError:
+        # Mezcla de fechas con y sin zona horaria
+        return True
+
+
+def merge_sessions(per_file: list[tuple[str, list[SessionRecord]]]) -> tuple[list[SessionRecord], dict[str, int]]:
+    """Une las sesiones de varios archivos deduplicando por Session ID.
+
+    Mantiene un índice hash session_id -> posición, de modo que cada sesión se
+    resuelve en O(1) y el duplicado descartado no llega a ocupar memoria en la
+    lista final. Las sesiones sin Session ID se conservan siempre.
+
+    Retorna (sesiones, {archivo: duplicados descartados}); el duplicado se
+    contabiliza en el archivo donde apareció por segunda vez.
+    """
+    merged = []
+    index = {}
+    dropped = {}
+
+    for name, sessions in per_file:
+        count = 0
+        for s in sessions:
+            sid = s.session_id
+            if not sid:
+                merged.append(s)
+                continue
+            pos = index.get(sid)
+            if pos is None:
+                index[sid] = len(merged)
+                merged.append(s)
+            else:
+                if _is_newer_record(s, merged[pos]):
+                    merged[pos] = s
+                count += 1
+        dropped[name] = dropped.get(name, 0) + count
+
+    return merged, dropped
+
+
+def build_cell_manager_report(cell_manager_name: str, all_sessions: list[SessionRecord],
+                              duplicates_dropped: dict | None = None,
+                              parse_stats: list[ParseStats] | None = None) -> CellManagerReport:
+    """Calcula las métricas de un Cell Manager a partir de sus sesiones."""
     unique_specs = set()
     total_gb = 0.0
     successful_jobs = 0
@@ -128,6 +191,7 @@ def parse_multiple_csvs(file_paths: list[str], cell_manager_name: str) -> CellMa
 
     total_jobs = len(all_sessions)
     compliance = (successful_jobs / total_jobs * 100) if total_jobs > 0 else 0.0
+    spec_index = SpecIndex.build(all_sessions)
 
     return CellManagerReport(
         cell_manager=cell_manager_name,
@@ -136,4 +200,32 @@ def parse_multiple_csvs(file_paths: list[str], cell_manager_name: str) -> CellMa
         size_tb=round(total_gb / 1024, 2),
         compliance_pct=round(compliance, 2),
         sessions=all_sessions,
+        duplicates_dropped=duplicates_dropped or {},
+        spec_index=spec_index,
+        parse_stats=parse_stats or [],
+        partials=daily_partials(cell_manager_name, spec_index),
     )
+
+
+def parse_multiple_csvs(file_paths: list[str], cell_manager_name: str,
+                        engine: str | None = None) -> CellManagerReport:
+    """Procesa múltiples CSVs de un mismo Cell Manager y genera el resumen.
+
+    Acepta .csv, .gz y paquetes .zip; cada miembro de un paquete cuenta como
+    un archivo más. Los exports semanales suelen solaparse; las sesiones
+    repetidas (mismo Session ID) se cuentan una sola vez, ver merge_sessions.
+    engine elige el motor de parseo, ver parse_csv_file.
+    """
+    per_file = []
+    stats = []
+    for fp in file_paths:
+        if is_bundle(fp):
+            for name, sessions, member_stats in parse_bundle(fp, engine=engine):
+                per_file.append((name, sessions))
+                stats.append(member_stats)
+        else:
+            file_stats = ParseStats()
+            per_file.append((os.path.basename(fp), parse_csv_file(fp, file_stats, engine=engine)))
+            stats.append(file_stats)
+    all_sessions, dropped = merge_sessions(per_file)
+    return build_cell_manager_report(cell_manager_name, all_sessions, dropped, stats)
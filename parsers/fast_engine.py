@@ -0,0 +1,148 @@
+"""Motor de parseo por columnas sobre el lector CSV en C de pandas.
+
+El motor "python" (parsers.csv_parser) decodifica fila por fila; este lee
+cada bloque de filas del reporte (iter_blocks, ~4 MB de texto) con
+pandas.read_csv(engine="c") y convierte columna por columna:
+
+- texto: str.strip sobre cada valor distinto de la columna (pd.factorize),
+  como el motor python; los valores repetidos comparten el mismo objeto;
+- números: conversión de la columna completa con int()/float() por elemento
+  (astype sobre un arreglo de objetos); si algún valor no es numérico la
+  columna se rehace con RowDecoder.coerce, que aplica y cuenta las mismas
+  correcciones que el camino lento fila a fila;
+- fechas de inicio: cada texto distinto se parsea una sola vez, con
+  pandas.to_datetime en el formato que DateParser detectó sobre una muestra
+  del archivo; los textos que no lo cumplen pasan por DateParser, igual que
+  en el motor python.
+
+El resultado debe ser idéntico al del motor python. Como el tokenizador de
+pandas no replica la limpieza de cada línea (strip antes de separar por
+tabs), el motor solo acepta bloques regulares: todas las filas con la misma
+cantidad de campos (al menos 10 y todas las columnas conocidas) y sin tabs al
+borde de una línea. Para cualquier otro bloque retorna None y ese bloque se
+parsea con el motor python; el resto del archivo sigue por columnas.
+
+En memoria queda solo un bloque a la vez (su texto y su DataFrame), además
+de los SessionRecord resultantes.
+"""
+
+import csv
+import importlib.util
+import io
+import re
+from dataclasses import fields
+
+import numpy as np
+
+from models.report_data import SessionRecord
+
+# Tab al inicio o al final de una línea (el motor python los descarta con strip).
+# Se buscan junto al salto de línea (\n, \r\n o \r; una expresión por borde,
+# para que re salte directo a cada candidato); la primera y la última línea
+# se revisan aparte
+_LEADING_TAB = re.compile(r"[\r\n][^\S\r\n]*\t")
+_TRAILING_TAB = re.compile(r"\t[^\S\r\n]*[\r\n]")
+_FIRST_LINE_TAB = re.compile(r"[^\S\r\n]*\t")
+_LAST_LINE_TAB = re.compile(r"\t[^\S\r\n]*$")
+
+_RECORD_FIELDS = [f.name for f in fields(SessionRecord)]
+_RECORD_DEFAULTS = {f.name: f.default for f in fields(SessionRecord)}
+
+
+def available() -> bool:
+    """Si pandas está instalado (se importa recién al parsear)."""
+    return importlib.util.find_spec("pandas") is not None
+
+
+def _numbers(values: np.ndarray, kind, decoder) -> list:
+    """Columna numérica: vacío -> 0; lo no convertible pasa por RowDecoder.coerce."""
+    converted = values.copy()
+    converted[values == ""] = 0
+    try:
+        return converted.astype(np.int64 if kind is int else np.float64).tolist()
+    except (ValueError, TypeError, OverflowError):
+        return [decoder.coerce(v, kind) if v else kind(0) for v in values.tolist()]
+
+
+def _irregular(text: str) -> bool:
+    """Si el texto tiene algo que el lector de pandas separaría distinto que el motor python."""
+    if _LEADING_TAB.search(text) or _TRAILING_TAB.search(text) or _FIRST_LINE_TAB.match(text):
+        return True
+    return _LAST_LINE_TAB.search(text, max(text.rfind("\n"), text.rfind("\r")) + 1) is not None
+
+
+def _strings(values: np.ndarray) -> tuple[list, np.ndarray, np.ndarray]:
+    """(valores con strip, códigos, valores distintos con strip) de una columna de texto."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values, sort=False)
+    stripped = np.array([v.strip() for v in uniques.tolist()], dtype=object)
+    return stripped[codes].tolist(), codes, stripped
+
+
+def _start_datetimes(codes: np.ndarray, texts: np.ndarray, decoder) -> list:
+    """Fechas de inicio de una columna factorizada: cada texto distinto se parsea una vez."""
+    import pandas as pd
+
+    texts = texts.tolist()
+    parse = decoder.parse_date
+    first = next((text for text in texts if text), None)
+    if parse.format is None and first is not None:
+        # Sin formato detectado por muestreo: el del primer texto, como el motor python
+        parse(first)
+    parsed = np.full(len(texts), None, dtype=object)
+    if first is not None and parse.format:
+        converted = pd.to_datetime(pd.Series(texts, dtype=object), format=parse.format, errors="coerce")
+        parsed[:] = converted.to_numpy(dtype="datetime64[us]").astype(object)
+    # Vacíos, formatos distintos al detectado o dateutil: como en el motor python
+    for i, (text, value) in enumerate(zip(texts, parsed.tolist())):
+        if value is None and text:
+            parsed[i] = parse(text)
+    failed = np.array([value is None and bool(text) for text, value in zip(texts, parsed.tolist())], dtype=bool)
+    decoder.date_failures += int(np.count_nonzero(failed[codes]))
+    return parsed[codes].tolist()
+
+
+def parse_rows(text: str, decoder) -> list[SessionRecord] | None:
+    """SessionRecord de las filas de un bloque de texto, o None si el bloque no es regular.
+
+    text es un bloque de iter_blocks de un MappedReport o StreamReport: filas
+    de datos completas, sin el header.
+    """
+    import pandas as pd
+
+    if not text.strip():
+        return []
+    if _irregular(text):
+        return None
+
+    try:
+        frame = pd.read_csv(
+            io.StringIO(text), sep="\t", header=None, dtype=object, na_filter=False,
+            quoting=csv.QUOTE_NONE, engine="c", skip_blank_lines=True,
+        )
+    except (pd.errors.ParserError, ValueError):
+        # Filas con más campos que la primera del bloque
+        return None
+    rows, width = frame.shape
+    # Las filas con menos campos se completan con "": se descartan comparando el total de tabs
+    if width < max(10, decoder.width) or text.count("\t") != rows * (width - 1):
+        return None
+
+    columns = {"start_datetime": [None] * rows}
+    for name, pos in decoder.columns.items():
+        values = frame[pos].to_numpy(dtype=object)
+        kind = decoder.kinds[name]
+        if kind is not str:
+            columns[name] = _numbers(values, kind, decoder)
+            continue
+        columns[name], codes, uniques = _strings(values)
+        if name == "start_time":
+            columns["start_datetime"] = _start_datetimes(codes, uniques, decoder)
+    del frame, text
+
+    ordered = []
+    for name in _RECORD_FIELDS:
+        column = columns.get(name)
+        ordered.append(column if column is not None else [_RECORD_DEFAULTS[name]] * rows)
+    return [SessionRecord(*values) for values in zip(*ordered)]
@@ -0,0 +1,175 @@
+"""Lectura de exports de Data Protector mapeados en memoria (mmap).
+
+El archivo no se copia entero a memoria: el header se localiza con una
+búsqueda de bytes sobre el buffer mapeado y las filas se decodifican por
+bloques a medida que se consumen, apoyándose en el page cache del sistema.
+Un índice de offsets de línea (construido al primer uso) permite leer filas
+sueltas y tomar muestras repartidas por todo el archivo para detectar el
+formato de las fechas.
+
+Los saltos de línea son los de la lectura en modo texto del parser original
+(\\n, \\r\\n y \\r solo), igual que en los reportes comprimidos.
+"""
+
+import mmap
+import os
+import random
+import re
+from array import array
+
+HEADER_MARKER = "# Session Type"
+_HEADER_BYTES = HEADER_MARKER.encode("ascii")
+_LINE_BREAK = re.compile(rb"\r\n?|\n")
+_BOM = b"\xef\xbb\xbf"
+
+
+def is_header_line(line: str) -> bool:
+    """Si la línea es el header de sesiones (se toleran espacios antes del '#', como en el parser original)."""
+    return line.strip().startswith(HEADER_MARKER)
+
+
+def header_columns(line: str) -> list[str]:
+    """Nombres de columna de la línea de header, sin el prefijo '# '."""
+    return line.strip().lstrip("# ").strip().split("\t")
+
+
+def split_text_lines(text: str) -> list[str]:
+    """Separa por \\n, \\r\\n o \\r (no por los demás separadores de str.splitlines)."""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text.split("\n")
+
+
+class MappedReport:
+    """Vista de solo lectura sobre un CSV/TSV de sesiones mapeado en memoria.
+
+    Uso:
+        with MappedReport(path) as report:
+            for chunk in report.iter_chunks():
+                for line in chunk: ...
+    """
+
+    def __init__(self, file_path: str, encoding: str = "utf-8"):
+        self.file_path = file_path
+        self.encoding = encoding
+        self._file = open(file_path, "rb")
+        self._mm = None
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = None
+
+        self.header_offset = self._find_header()
+        self.data_offset = None
+        if self.header_offset is not None:
+            end = _LINE_BREAK.search(self._mm, self.header_offset)
+            self.data_offset = len(self._mm) if end is None else end.end()
+
+    # ── Ciclo de vida ──
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Header ──
+
+    def _line_start(self, pos: int) -> int:
+        """Offset del inicio de la línea que contiene pos."""
+        return max(self._mm.rfind(b"\n", 0, pos), self._mm.rfind(b"\r", 0, pos)) + 1
+
+    def _find_header(self):
+        """Offset del marcador '# Session Type' de la línea de header, o None.
+
+        El marcador se busca como bytes; solo cuenta si su línea es un header
+        según is_header_line (antes de él solo espacios, o el BOM al inicio
+        del archivo).
+        """
+        if self._mm is None:
+            return None
+        pos = self._mm.find(_HEADER_BYTES)
+        while pos != -1:
+            start = self._line_start(pos)
+            end = _LINE_BREAK.search(self._mm, pos)
+            line = self._mm[start:len(self._mm) if end is None else end.start()]
+            if start == 0 and line.startswith(_BOM):
+                line = line[len(_BOM):]
+            if is_header_line(line.decode(self.encoding, errors="replace")):
+                return pos
+            pos = self._mm.find(_HEADER_BYTES, pos + 1)
+        return None
+
+    @property
+    def headers(self) -> list[str]:
+        """Nombres de columna del header, sin el prefijo '# '."""
+        if self.header_offset is None:
+            return []
+        return header_columns(self._mm[self.header_offset:self.data_offset].decode(self.encoding, errors="replace"))
+
+    # ── Filas ──
+
+    def iter_blocks(self, chunk_bytes: int = 4 * 1024 * 1024):
+        """Genera el texto de las filas en bloques de ~chunk_bytes.
+
+        Cada bloque termina en un salto de línea, así que ninguna fila queda
+        partida entre dos bloques.
+        """
+        if self.data_offset is None:
+            return
+        mm = self._mm
+        size = len(mm)
+        start = self.data_offset
+        while start < size:
+            end = _LINE_BREAK.search(mm, min(start + chunk_bytes, size - 1))
+            end = size if end is None else end.end()
+            yield mm[start:end].decode(self.encoding, errors="replace")
+            start = end
+
+    @staticmethod
+    def split_lines(block: str) -> list[str]:
+        """Líneas de un bloque de iter_blocks."""
+        return split_text_lines(block)
+
+    def iter_chunks(self, chunk_bytes: int = 4 * 1024 * 1024):
+        """Genera listas de líneas decodificadas, de ~chunk_bytes cada una."""
+        for block in self.iter_blocks(chunk_bytes):
+            yield self.split_lines(block)
+
+    # ── Acceso aleatorio ──
+
+    @property
+    def line_offsets(self) -> array:
+        """Índice de offsets de inicio de cada fila de datos (se construye una vez)."""
+        if self._offsets is None:
+            offsets = array("q")
+            if self.data_offset is not None and self.data_offset < len(self._mm):
+                offsets.append(self.data_offset)
+                offsets.extend(m.end() for m in _LINE_BREAK.finditer(self._mm, self.data_offset))
+                if offsets[-1] >= len(self._mm):
+                    offsets.pop()
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.line_offsets)
+
+    def line(self, i: int) -> str:
+        """Decodifica solo la fila de datos i (acceso aleatorio)."""
+        offsets = self.line_offsets
+        start = offsets[i]
+        end = offsets[i + 1] if i + 1 < len(offsets) else len(self._mm)
+        return self._mm[start:end].decode(self.encoding, errors="replace").rstrip("\r\n")
+
+    def sample(self, k: int = 50, seed: int = 0) -> list[str]:
+        """Muestra aleatoria de filas de datos no vacías, repartida por todo el archivo."""
+        n = len(self)
+        if n == 0:
+            return []
+        indices = sorted(random.Random(seed).sample(range(n), min(k, n)))
+        return [line for line in (self.line(i) for i in indices) if line.strip()]
@@ -0,0 +1,141 @@
+"""Caché en memoria de resultados de parseo indexada por hash de contenido.
+
+Los resultados se guardan por hash del archivo completo y, para los libros
+Excel, por hash de cada hoja (su parte XML dentro del .xlsx/.xlsm). Así, un
+libro re-subido sin cambios no se vuelve a parsear, y uno donde solo cambió
+una plataforma re-parsea únicamente esa hoja.
+"""
+
+import hashlib
+import posixpath
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+_CHUNK_SIZE = 1024 * 1024
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Celda de tipo shared string: <c r="A1" t="s"><v>12</v></c>
+_SHARED_STRING_CELL = re.compile(rb'(<(?:\w+:)?c\b[^>]*\bt="s"[^>]*>\s*<(?:\w+:)?v>)(\d+)(</(?:\w+:)?v>)')
+
+
+class LRUCache:
+    """Diccionario acotado con expulsión LRU, seguro entre hilos.
+
+    Streamlit ejecuta cada sesión en su propio hilo, por lo que la caché es
+    compartida por todos los usuarios del proceso.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data.keys())
+
+    def items(self) -> list:
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def file_digest(file_path: str) -> str:
+    """Retorna el SHA-256 del contenido de un archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def buffer_digest(data) -> str:
+    """SHA-256 de un contenido ya en memoria (igual a file_digest del mismo archivo)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _resolve_target(base_dir: str, target: str) -> str:
+    """Normaliza el destino de una relación OPC a un nombre dentro del zip."""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _read_shared_strings(zf: zipfile.ZipFile, part: str) -> list[str]:
+    """Lee la tabla de shared strings (texto plano de cada <si>)."""
+    if part not in zf.namelist():
+        return []
+    root = ET.fromstring(zf.read(part))
+    return ["".join(t.text or "" for t in si.iter(f"{_NS_MAIN}t")) for si in root.iter(f"{_NS_MAIN}si")]
+
+
+def workbook_sheet_digests(file_path: str) -> dict[str, str]:
+    """Calcula un hash por hoja de un libro .xlsx/.xlsm.
+
+    Las celdas de texto de Excel guardan solo un índice a la tabla global de
+    shared strings, que Excel reordena al guardar. Para que el hash de una hoja
+    no cambie cuando se edita otra, los índices se sustituyen por su texto antes
+    de hashear.
+
+    Retorna {nombre_hoja: sha256}. Lanza zipfile.BadZipFile / KeyError si el
+    archivo no es un libro OOXML válido.
+    """
+    digests = {}
+    with zipfile.ZipFile(file_path) as zf:
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+
+        targets = {}
+        shared_strings_part = "xl/sharedStrings.xml"
+        for rel in rels.iter(f"{_NS_PKG_REL}Relationship"):
+            target = _resolve_target("xl", rel.get("Target", ""))
+            targets[rel.get("Id")] = target
+            if rel.get("Type", "").endswith("/sharedStrings"):
+                shared_strings_part = target
+
+        shared_strings = _read_shared_strings(zf, shared_strings_part)
+
+        def _inline(match) -> bytes:
+            idx = int(match.group(2))
+            text = shared_strings[idx] if idx < len(shared_strings) else ""
+            return match.group(1) + text.encode("utf-8") + match.group(3)
+
+        for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+            part = targets.get(sheet.get(f"{_NS_REL}id"))
+            if part is None:
+                continue
+            data = _SHARED_STRING_CELL.sub(_inline, zf.read(part))
+            digests[sheet.get("name")] = hashlib.sha256(data).hexdigest()
+
+    return digests
+
+
+# Cachés del Schedule: ScheduleReport por hash del libro y dict por hash de hoja.
+SCHEDULE_REPORT_CACHE = LRUCache(max_entries=32)
+SCHEDULE_SHEET_CACHE = LRUCache(max_entries=512)
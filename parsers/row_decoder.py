@@ -0,0 +1,219 @@
+"""Decodificador de filas de reportes de sesiones guiado por el header.
+
+El header del reporte se resuelve una sola vez por archivo: cada columna
+conocida se asocia a su campo de SessionRecord y a su tipo, y las filas se
+decodifican con extractores precompilados (itemgetter) en un único camino
+rápido. Las columnas pueden venir en cualquier orden, como ocurre entre
+versiones de Data Protector; solo las filas con valores no numéricos pasan
+por el camino lento, campo a campo.
+"""
+
+from datetime import datetime
+from operator import itemgetter
+
+from models.report_data import SessionRecord
+
+# Header de Data Protector (en minúsculas) -> (campo de SessionRecord, tipo)
+COLUMNS = {
+    "session type": ("session_type", str),
+    "specification": ("specification", str),
+    "status": ("status", str),
+    "mode": ("mode", str),
+    "start time": ("start_time", str),
+    "end time": ("end_time", str),
+    "duration": ("duration", str),
+    "gb written": ("gb_written", float),
+    "errors": ("errors", int),
+    "warnings": ("warnings", int),
+    "failed da": ("failed_da", int),
+    "completed da": ("completed_da", int),
+    "object": ("objects", int),
+    "objects": ("objects", int),
+    "success": ("success", str),
+    "session id": ("session_id", str),
+}
+
+# Orden clásico del reporte "List of Sessions", para headers no reconocibles
+LEGACY_HEADERS = [
+    "Session Type", "Specification", "Status", "Mode", "Start Time", "Start Time_t",
+    "End Time", "End Time_t", "Queuing", "Duration", "GB Written", "Media", "Errors",
+    "Warnings", "Pending DA", "Running DA", "Failed DA", "Completed DA", "Object",
+    "Files", "Success", "Session Owner", "Session ID",
+]
+
+# Formatos probados antes de recurrir a dateutil (mes primero, como dateutil)
+_DATE_FORMATS = (
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%y %I:%M:%S %p",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+)
+
+
+class DateParser:
+    """Convierte fechas de Data Protector a datetime, o None si no se puede.
+
+    Prueba primero el formato detectado sobre una muestra del reporte (detect)
+    o, sin muestra, el último que funcionó, así que en un mismo reporte cada
+    fecha cuesta un solo strptime; los formatos desconocidos usan dateutil.
+    """
+
+    def __init__(self):
+        self._format = None
+        self._detected = False
+
+    @property
+    def format(self) -> str | None:
+        """Formato detectado, o el último de _DATE_FORMATS que funcionó (None si aún ninguno)."""
+        return self._format
+
+    def detect(self, texts: list[str]) -> None:
+        """Fija el formato que convierte más fechas de la muestra (a igualdad, el primero de _DATE_FORMATS).
+
+        Las fechas con otro formato se siguen convirtiendo, pero ya no lo reemplazan.
+        """
+        best, best_hits = None, 0
+        for fmt in _DATE_FORMATS:
+            hits = 0
+            for text in texts:
+                try:
+                    datetime.strptime(text, fmt)
+                except ValueError:
+                    continue
+                hits += 1
+            if hits > best_hits:
+                best, best_hits = fmt, hits
+        if best is not None:
+            self._format = best
+            self._detected = True
+
+    def _fallback(self, text: str):
+        try:
+            from dateutil import parser
+        except ImportError:
+            return None
+        try:
+            return parser.parse(text)
+        except (ValueError, OverflowError):
+            return None
+
+    def __call__(self, text: str):
+        if not text:
+            return None
+        if self._format is not None:
+            try:
+                return datetime.strptime(text, self._format)
+            except ValueError:
+                pass
+        for fmt in _DATE_FORMATS:
+            try:
+                value = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            if not self._detected:
+                self._format = fmt
+            return value
+        return self._fallback(text)
+
+
+def _getter(positions: list[int]):
+    """itemgetter que retorna siempre una tupla (también con 0 o 1 posiciones)."""
+    if not positions:
+        return lambda fields: ()
+    if len(positions) == 1:
+        pos = positions[0]
+        return lambda fields: (fields[pos],)
+    return itemgetter(*positions)
+
+
+class RowDecoder:
+    """Decodificador de filas (lista de campos) a SessionRecord para un header dado."""
+
+    def __init__(self, headers: list[str]):
+        self.kinds = {}
+        index = {}
+        for pos, header in enumerate(headers):
+            index.setdefault(header.strip().lower(), pos)
+        if sum(1 for h in COLUMNS if h in index) < len(set(COLUMNS.values())) // 2:
+            # Header traducido o irreconocible: se asume el orden clásico
+            index = {h.lower(): pos for pos, h in enumerate(LEGACY_HEADERS)}
+
+        str_cols, num_cols = [], []
+        for header, (name, kind) in COLUMNS.items():
+            pos = index.get(header)
+            if pos is None or name in self.kinds:
+                continue
+            self.kinds[name] = kind
+            (str_cols if kind is str else num_cols).append((name, kind, pos))
+
+        self.columns = {name: pos for name, _, pos in str_cols + num_cols}
+        self.width = max(self.columns.values(), default=-1) + 1
+        self._str_names = [name for name, _, _ in str_cols]
+        self._num_names = [name for name, _, _ in num_cols]
+        self._num_kinds = [kind for _, kind, _ in num_cols]
+        self._get_str = _getter([pos for _, _, pos in str_cols])
+        self._get_num = _getter([pos for _, _, pos in num_cols])
+        self.parse_date = DateParser()
+        # Contadores de calidad: solo se incrementan en los caminos de error
+        self.date_failures = 0
+        self.numeric_coercions = 0
+
+    def detect_date_format(self, lines: list[str]) -> None:
+        """Detecta el formato de Start Time sobre filas de muestra (ver DateParser.detect)."""
+        pos = self.columns.get("start_time")
+        if pos is None:
+            return
+        texts = []
+        for line in lines:
+            fields = line.strip().split("\t")
+            if len(fields) >= 10 and pos < len(fields) and fields[pos].strip():
+                texts.append(fields[pos].strip())
+        self.parse_date.detect(texts)
+
+    def _numbers(self, raw: tuple) -> list:
+        try:
+            # Camino rápido: una sola excepción posible para toda la fila
+            return [kind(v) if v else kind() for kind, v in zip(self._num_kinds, raw)]
+        except ValueError:
+            return [self.coerce(v, kind) for kind, v in zip(self._num_kinds, raw)]
+
+    def coerce(self, text: str, kind):
+        """Camino lento de un campo numérico.
+
+        Un valor no numérico ('1,5', '3.0' en un entero, 'n/a') vale 0, como en
+        el parser original, y se cuenta en numeric_coercions.
+        """
+        if not text.strip():
+            return kind(0)
+        try:
+            return kind(text)
+        except ValueError:
+            self.numeric_coercions += 1
+            return kind(0)
+
+    def _start_datetime(self, text: str):
+        value = self.parse_date(text)
+        if value is None and text:
+            self.date_failures += 1
+        return value
+
+    def decode(self, fields: list[str]) -> SessionRecord:
+        """Construye el SessionRecord de una fila; las columnas ausentes quedan con su default."""
+        if len(fields) < self.width:
+            return self._decode_short(fields)
+        values = dict(zip(self._str_names, [v.strip() for v in self._get_str(fields)]))
+        values.update(zip(self._num_names, self._numbers(self._get_num(fields))))
+        values["start_datetime"] = self._start_datetime(values.get("start_time", ""))
+        return SessionRecord(**values)
+
+    def _decode_short(self, fields: list[str]) -> SessionRecord:
+        """Fila truncada: solo se asignan los campos presentes."""
+        values = {}
+        for name, pos in self.columns.items():
+            if pos >= len(fields):
+                continue
+            kind, text = self.kinds[name], fields[pos]
+            values[name] = text.strip() if kind is str else self.coerce(text, kind)
+        values["start_datetime"] = self._start_datetime(values.get("start_time", ""))
+        return SessionRecord(**values)
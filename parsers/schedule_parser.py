@@ -1,22 +1,28 @@
 """Parser del archivo Excel de Schedule mensual."""
 
+import os
 import re
-import openpyxl
-from models.report_data import ScheduleRow, ScheduleReport
-
-
-# Mapeo de hojas del Schedule a nombres de Cell Manager
-SHEET_MAPPING = {
-    "COMHP81": "COMHP81",
-    "COMHP83": "COMHP83",
-    "LNXCELLMNGVEN": "LNXCELLMNGVEN",
-    "LNXCELLMNGTRI": "LNXCELLMNGTRI",
-    "LNXCELLMNGPTA": "LNXCELLMNGPTA",
-    "NETBACKUP": "NETBACKUP",
-    "COMMVAULT_NBUIT": "COMMVAULT_NBUIT",
-    "COMMVAULT_OCI": "COMMVAULT_OCI",
-    # "ACRONIS": "ACRONIS",  # Excluido explícitamente
-}
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import replace
+
+import numpy as np
+from models.report_data import ParseStats, ScheduleRow, ScheduleReport
+from parsers.parse_cache import (
+    SCHEDULE_REPORT_CACHE,
+    SCHEDULE_SHEET_CACHE,
+    file_digest,
+    workbook_sheet_digests,
+)
+from utils.config import CONFIG
+from utils.parallel import parallel_map
+from utils.schedule_detail import ScheduleDetail
+from utils.schedule_matrix import COUNT_FIELDS, compute_kpis
+
+
+# Mapeo de hojas del Schedule a plataformas (config/cell_managers.json).
+# Las hojas que no figuran (p. ej. ACRONIS) se excluyen.
+SHEET_MAPPING = CONFIG.schedule_sheets
 
 # Patrones de tickets ITSM
 ITSM_PATTERN = re.compile(r"^(WO|RF|CHG|REQ|INC)", re.IGNORECASE)
@@ -35,7 +41,10 @@ def _is_itsm_ticket(value) -> bool:
 def parse_schedule_sheet(ws, sheet_name: str) -> dict:
     """Parsea una hoja del Schedule y cuenta estados.
 
-    Retorna dict con conteos: ejecutados, programados, relanzados, fallidos, q (casos ITSM).
+    Retorna dict con conteos: ejecutados, programados, relanzados, fallidos, q (casos ITSM),
+    y de calidad: filas_leidas (filas no vacías) y filas_sin_job (columna A vacía, omitidas).
+    En "detalle" van las filas fallidas, relanzadas o con caso como
+    (job, status, job_id_relanzado, caso).
     """
     total_programados = 0
     total_ejecutados = 0
@@ -43,6 +52,8 @@ def parse_schedule_sheet(ws, sheet_name: str) -> dict:
     total_relanzados = 0
     total_gestionados = 0
     total_q = 0  # Casos ITSM creados
+    sin_job = 0  # Filas con datos pero sin valor en la columna A
+    detalle = []
 
     # Leer headers
     headers = []
@@ -68,6 +79,9 @@ def parse_schedule_sheet(ws, sheet_name: str) -> dict:
 
     for row in ws.iter_rows(min_row=2, values_only=True):
         if row[0] is None:
+            # Las filas totalmente vacías (relleno de Excel) no cuentan como omitidas
+            if any(v is not None for v in row):
+                sin_job += 1
             continue
 
         total_programados += 1
@@ -83,10 +97,12 @@ def parse_schedule_sheet(ws, sheet_name: str) -> dict:
         # 2. Determinar si es Relanzado (Status 'relaunched' O columna Relanzado con valor)
         # Verificar ID de relanzamiento
         has_relaunch_id = False
+        relaunch_id = ""
         if job_id_relanzado_col is not None and len(row) > job_id_relanzado_col:
              relanzado_val = row[job_id_relanzado_col]
              if relanzado_val is not None and str(relanzado_val).strip() not in ("", "None", "nan"):
                  has_relaunch_id = True
+                 relaunch_id = str(relanzado_val).strip()
 
         is_relaunched = False
         if "relaunched" in status_val:
@@ -105,16 +121,19 @@ def parse_schedule_sheet(ws, sheet_name: str) -> dict:
 
         # 4. Contar caso ITSM (Q) - Independiente del status
         has_case = False
+        ticket = ""
         if caso_col is not None and len(row) > caso_col:
             if _is_itsm_ticket(row[caso_col]):
                 total_q += 1
                 has_case = True
+                ticket = str(row[caso_col]).strip()
         elif caso_col is None:
             # Si no hay columna CASO explícita, buscar en todas las celdas
             for cell_val in row:
                 if _is_itsm_ticket(cell_val):
                     total_q += 1
                     has_case = True
+                    ticket = str(cell_val).strip()
                     break  # Un caso por fila máximo
 
         # 5. Determinar Fallidos Gestionados
@@ -131,6 +150,10 @@ def parse_schedule_sheet(ws, sheet_name: str) -> dict:
         if is_managed:
             total_gestionados += 1
 
+        if is_failed or is_relaunched or has_case:
+            status_text = str(row[status_col]).strip() if len(row) > status_col and row[status_col] else ""
+            detalle.append((str(row[0]).strip(), status_text, relaunch_id, ticket))
+
     return {
         "programados": total_programados,
         "ejecutados": total_ejecutados,
@@ -138,73 +161,179 @@ def parse_schedule_sheet(ws, sheet_name: str) -> dict:
         "relanzados": total_relanzados,
         "gestionados": total_gestionados,
         "q": total_q,
+        "filas_leidas": total_programados + sin_job,
+        "filas_sin_job": sin_job,
+        "detalle": detalle,
     }
 
 
-def parse_schedule_file(file_path: str, period_name: str = "") -> ScheduleReport:
-    """Parsea el archivo Excel del Schedule mensual completo.
+def _sheet_stats(sheet_data: dict, source: str) -> ParseStats:
+    """Contadores de calidad del libro: suma de las hojas, omitidas por hoja."""
+    stats = ParseStats(source=source)
+    for name, data in sheet_data.items():
+        stats.rows_read += data.get("filas_leidas", data["programados"])
+        stats.rows_parsed += data["programados"]
+        if data.get("filas_sin_job"):
+            stats.skipped[f"{name}: columna A vacía"] = data["filas_sin_job"]
+    return stats
 
-    Lee cada hoja mapeada y genera el ScheduleReport con KPIs.
+
+def _from_cache(cached: ScheduleReport, file_path: str, period_name: str) -> ScheduleReport:
+    """Reporte cacheado con el periodo y el nombre de archivo de esta carga."""
+    stats = replace(cached.parse_stats, source=os.path.basename(file_path)) if cached.parse_stats else None
+    return replace(cached, period_name=period_name, parse_stats=stats)
+
+
+def _build_schedule_report(sheet_data: dict, period_name: str, source: str = "") -> ScheduleReport:
+    """Construye el ScheduleReport con KPIs a partir de los conteos por hoja.
+
+    sheet_data: {nombre_hoja: dict de parse_schedule_sheet}, en cualquier orden.
+    Los KPIs por plataforma y generales se calculan sobre la matriz de conteos
+    con compute_kpis (vectorizado).
     """
-    wb = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
-    rows = []
+    sheets = [name for name in SHEET_MAPPING if name in sheet_data]
+    counts = np.array(
+        [[sheet_data[name][f] for f in COUNT_FIELDS] for name in sheets],
+        dtype=np.int64,
+    ).reshape(len(sheets), len(COUNT_FIELDS))
+    kpis = compute_kpis(counts)
 
-    for sheet_name, platform_name in SHEET_MAPPING.items():
-        if sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            data = parse_schedule_sheet(ws, sheet_name)
-
-            programados = data["programados"]
-            ejecutados = data["ejecutados"]
-            fallidos = data["fallidos"]
-            relanzados = data["relanzados"]
-            q = data["q"]
-            gestionados = data["gestionados"]
-
-            # KPIs
-            kpi_op = ((programados - fallidos) / programados * 100) if programados > 0 else 0
-            pct_rel = (relanzados / (programados - fallidos) * 100) if (programados - fallidos) > 0 else 0
-            # Denominador incluye fallidos y relanzados
-            gestion_f = (gestionados / (fallidos + relanzados) * 100) if (fallidos + relanzados) > 0 else 0
-
-            row = ScheduleRow(
-                platform=platform_name,
-                ejecutados=ejecutados,
-                programados=programados,
-                relanzados=relanzados,
-                fallidos=fallidos,
-                q=q,
-                gestionados=gestionados,
-                kpi_operacion=round(kpi_op, 2),
-                pct_relanzamiento=round(pct_rel, 2),
-                gestion_fallidos=round(gestion_f, 2),
-            )
-            rows.append(row)
+    rows = []
+    for i, sheet_name in enumerate(sheets):
+        data = sheet_data[sheet_name]
+        rows.append(ScheduleRow(
+            platform=SHEET_MAPPING[sheet_name],
+            ejecutados=data["ejecutados"],
+            programados=data["programados"],
+            relanzados=data["relanzados"],
+            fallidos=data["fallidos"],
+            q=data["q"],
+            gestionados=data["gestionados"],
+            kpi_operacion=float(kpis["kpi_operacion"][i]),
+            pct_relanzamiento=float(kpis["pct_relanzamiento"][i]),
+            gestion_fallidos=float(kpis["gestion_fallidos"][i]),
+        ))
 
     # Totales
-    total_ej = sum(r.ejecutados for r in rows)
-    total_prog = sum(r.programados for r in rows)
-    total_rel = sum(r.relanzados for r in rows)
-    total_fal = sum(r.fallidos for r in rows)
-    total_q = sum(r.q for r in rows)
-    total_gest = sum(r.gestionados for r in rows)
-
-    kpi_op_gen = ((total_prog - total_fal) / total_prog * 100) if total_prog > 0 else 0
-    kpi_gest_gen = (total_gest / (total_fal + total_rel) * 100) if (total_fal + total_rel) > 0 else 0
-    pct_rel_gen = (total_rel / (total_prog - total_fal) * 100) if (total_prog - total_fal) > 0 else 0
-
-    report = ScheduleReport(
+    totals = dict(zip(COUNT_FIELDS, counts.sum(axis=0).tolist()))
+    general = compute_kpis(counts.sum(axis=0))
+
+    return ScheduleReport(
         period_name=period_name,
         rows=rows,
-        total_ejecutados=total_ej,
-        total_programados=total_prog,
-        total_relanzados=total_rel,
-        total_fallidos=total_fal,
-        total_q=total_q,
-        kpi_operacion_general=round(kpi_op_gen, 2),
-        kpi_gestion_fallidos_general=round(kpi_gest_gen, 2),
-        pct_relanzados_general=round(pct_rel_gen, 2),
+        total_ejecutados=totals["ejecutados"],
+        total_programados=totals["programados"],
+        total_relanzados=totals["relanzados"],
+        total_fallidos=totals["fallidos"],
+        total_q=totals["q"],
+        kpi_operacion_general=float(general["kpi_operacion"]),
+        kpi_gestion_fallidos_general=float(general["gestion_fallidos"]),
+        pct_relanzados_general=float(general["pct_relanzamiento"]),
+        parse_stats=_sheet_stats(sheet_data, source),
+        detail=ScheduleDetail.from_sheets({
+            SHEET_MAPPING[name]: sheet_data[name].get("detalle", []) for name in sheets
+        }),
     )
 
-    wb.close()
+
+def parse_schedule_file(file_path: str, period_name: str = "", use_cache: bool = True) -> ScheduleReport:
+    """Parsea el archivo Excel del Schedule mensual completo.
+
+    Lee cada hoja mapeada y genera el ScheduleReport con KPIs.
+
+    Con use_cache, un libro idéntico a uno ya parseado (mismo SHA-256) se sirve
+    directo desde caché, y de un libro modificado solo se re-parsean las hojas
+    cuyo contenido cambió; el resto sale de la caché por hoja.
+    """
+    import openpyxl  # Diferido: solo se carga al parsear el primer Schedule
+
+    if not use_cache:
+        wb = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
+        try:
+            sheet_data = {
+                name: parse_schedule_sheet(wb[name], name)
+                for name in SHEET_MAPPING if name in wb.sheetnames
+            }
+        finally:
+            wb.close()
+        return _build_schedule_report(sheet_data, period_name, os.path.basename(file_path))
+
+    wb_digest = file_digest(file_path)
+    cached = SCHEDULE_REPORT_CACHE.get(wb_digest)
+    if cached is not None:
+        return _from_cache(cached, file_path, period_name)
+
+    try:
+        sheet_digests = workbook_sheet_digests(file_path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        # Libro no estándar: se parsea completo sin caché por hoja
+        sheet_digests = {}
+
+    sheet_data = {}
+    pending = []
+    for sheet_name in SHEET_MAPPING:
+        digest = sheet_digests.get(sheet_name)
+        data = SCHEDULE_SHEET_CACHE.get(digest) if digest else None
+        if data is not None:
+            sheet_data[sheet_name] = data
+        else:
+            pending.append(sheet_name)
+
+    if pending:
+        wb = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
+        try:
+            for sheet_name in pending:
+                if sheet_name in wb.sheetnames:
+                    data = parse_schedule_sheet(wb[sheet_name], sheet_name)
+                    sheet_data[sheet_name] = data
+                    if sheet_name in sheet_digests:
+                        SCHEDULE_SHEET_CACHE.put(sheet_digests[sheet_name], data)
+        finally:
+            wb.close()
+
+    report = _build_schedule_report(sheet_data, period_name, os.path.basename(file_path))
+    SCHEDULE_REPORT_CACHE.put(wb_digest, report)
     return report
+
+
+def _parse_schedule_job(job: tuple[str, str]) -> tuple[ScheduleReport, str, dict]:
+    """Tarea de parse_schedule_files, ejecutada en un proceso hijo.
+
+    Retorna además el hash del libro y las entradas de caché por hoja creadas,
+    para que el proceso principal las incorpore a su propia caché.
+    """
+    file_path, period_name = job
+    before = set(SCHEDULE_SHEET_CACHE.keys())
+    report = parse_schedule_file(file_path, period_name)
+    new_sheets = {k: v for k, v in SCHEDULE_SHEET_CACHE.items() if k not in before}
+    return report, file_digest(file_path), new_sheets
+
+
+def parse_schedule_files(jobs: list[tuple[str, str]], max_workers: int | None = None) -> list[ScheduleReport]:
+    """Parsea varios Schedules mensuales en paralelo.
+
+    jobs: lista de (ruta, nombre_periodo). Los libros ya presentes en la caché
+    se resuelven sin parsear; el resto se reparte en un pool de procesos.
+    Retorna los ScheduleReport en el mismo orden que jobs.
+    """
+    reports = [None] * len(jobs)
+    pending = []
+    for i, (file_path, period_name) in enumerate(jobs):
+        cached = SCHEDULE_REPORT_CACHE.get(file_digest(file_path))
+        if cached is not None:
+            reports[i] = _from_cache(cached, file_path, period_name)
+        else:
+            pending.append(i)
+
+    if len(pending) == 1:
+        i = pending[0]
+        reports[i] = parse_schedule_file(*jobs[i])
+    elif pending:
+        results = parallel_map(_parse_schedule_job, [jobs[i] for i in pending], max_workers)
+        for i, (report, wb_digest, new_sheets) in zip(pending, results):
+            for digest, data in new_sheets.items():
+                SCHEDULE_SHEET_CACHE.put(digest, data)
+            SCHEDULE_REPORT_CACHE.put(wb_digest, report)
+            reports[i] = report
+
+    return reports
@@ -0,0 +1,247 @@
+"""Verificación de conformidad entre los motores de parseo "python" y "fast".
+
+Parsea cada archivo con ambos motores y compara sesiones (también el tipo
+de cada campo: 0 y 0.0 son iguales para ==), contadores de calidad (ParseStats) y los totales del CellManagerReport resultante (Cant.
+Políticas, Jobs, Tamaño, Cumplimiento, índice por especificación y parciales
+diarios). Informa los tiempos de cada motor y cuántos bloques del archivo
+leyó el motor "fast" y cuántos delegó al motor "python" por ser irregulares.
+
+Sin archivos genera un conjunto sintético: un reporte regular, su copia .gz,
+un .zip con dos semanas, uno con valores a corregir (comas decimales, fechas
+inválidas, GB Written vacío), uno irregular (filas cortas, líneas en blanco, tabs al borde),
+uno con el header precedido de espacios y uno con saltos de línea \r solos
+(ambos también como .gz). Estos dos últimos deben dar, además, las mismas sesiones
+que el reporte regular en cualquier contenedor.
+
+Uso:
+    python -m tools.check_engines [archivos ...] [--repeat 3]
+
+Retorna 1 si algún resultado difiere.
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.report_data import ParseStats
+from parsers import fast_engine
+from parsers.compressed import bundle_members, is_bundle, open_report
+from parsers.csv_parser import parse_csv_file, parse_multiple_csvs
+from parsers.mapped_csv import is_header_line
+from parsers.row_decoder import RowDecoder
+from tools.synthetic_data import write_session_report
+
+
+def _rewrite(path: str, out: str, edit) -> str:
+    """Copia path aplicando edit(índice de fila de datos, línea) -> línea."""
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    header = next(i for i, line in enumerate(lines) if is_header_line(line))
+    data = [edit(i, line) if line else line for i, line in enumerate(lines[header + 1:])]
+    with open(out, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines[:header + 1] + data))
+    return out
+
+
+def _rewrite_text(path: str, out: str, edit) -> str:
+    """Copia path aplicando edit(texto completo) -> texto, sin traducir saltos de línea."""
+    with open(path, encoding="utf-8", newline="") as f:
+        text = edit(f.read())
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return out
+
+
+def _gzip(path: str) -> str:
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return path + ".gz"
+
+
+def synthetic_files(out_dir: str, specs: int = 300) -> tuple[list[str], dict[str, str]]:
+    """Genera los archivos de prueba.
+
+    Retorna (rutas, {ruta: ruta del reporte del que debe dar las mismas sesiones}).
+    """
+    regular = os.path.join(out_dir, "regular.csv")
+    write_session_report(regular, "CHECK", datetime(2024, 3, 4), specs=specs, seed=1)
+
+    _gzip(regular)
+
+    weeks = []
+    for week in range(2):
+        path = os.path.join(out_dir, f"week{week}.csv")
+        write_session_report(path, "CHECK", datetime(2024, 3, 11 + 7 * week), specs=specs, seed=10 + week)
+        weeks.append(path)
+    bundle = os.path.join(out_dir, "weeks.zip")
+    with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path in weeks:
+            zf.write(path, os.path.basename(path))
+
+    def coerced(i, line):
+        fields = line.split("\t")
+        if i % 7 == 0:
+            fields[10] = fields[10].replace(".", ",")  # GB Written con coma decimal
+        if i % 11 == 0:
+            fields[12] = "n/a"                         # Errors no numérico
+        if i % 13 == 0:
+            fields[4] = "sin fecha"                    # Start Time inválido
+        if i % 17 == 0:
+            fields[16] = ""                            # Failed DA vacío
+        if i % 19 == 0:
+            fields[10] = ""                            # GB Written vacío
+        return "\t".join(fields)
+
+    def irregular(i, line):
+        if i % 50 == 0:
+            return "\t".join(line.split("\t")[:8])     # menos de 10 columnas
+        if i % 60 == 0:
+            return line + "\n   "                      # línea solo con espacios
+        if i % 70 == 0:
+            return line.rsplit("\t", 1)[0] + "\t"      # Session ID vacío al final
+        return line
+
+    indented = _rewrite_text(regular, os.path.join(out_dir, "indented.csv"),
+                             lambda text: text.replace("\n# Session Type", "\n \t # Session Type"))
+    cr_only = _rewrite_text(regular, os.path.join(out_dir, "cr_only.csv"), lambda text: text.replace("\n", "\r"))
+    same_as = {indented: regular, _gzip(indented): regular, cr_only: regular, _gzip(cr_only): regular}
+    return [
+        regular, regular + ".gz", bundle,
+        _rewrite(regular, os.path.join(out_dir, "coerced.csv"), coerced),
+        _rewrite(regular, os.path.join(out_dir, "irregular.csv"), irregular),
+        *same_as,
+    ], same_as
+
+
+def _sources(paths: list[str]) -> list[tuple[str, str, str | None]]:
+    """[(nombre, ruta, miembro)] expandiendo los .zip."""
+    sources = []
+    for path in paths:
+        if is_bundle(path):
+            sources += [(f"{os.path.basename(path)}/{m}", path, m) for m in bundle_members(path)]
+        else:
+            sources.append((os.path.basename(path), path, None))
+    return sources
+
+
+def _fast_blocks(path: str, member: str | None) -> tuple[int, int]:
+    """(bloques que el motor "fast" lee él mismo, bloques totales) de un archivo."""
+    with open_report(path, member) as report:
+        if report.header_offset is None:
+            return 0, 0
+        decoder = RowDecoder(report.headers)
+        decoder.detect_date_format(report.sample())
+        read = [fast_engine.parse_rows(block, decoder) is not None for block in report.iter_blocks()]
+    return sum(read), len(read)
+
+
+def _reader(path: str, member: str | None) -> str:
+    """Quién leyó el archivo: "fast", "python" o "fast k/n" si solo k de n bloques fueron regulares."""
+    fast, total = _fast_blocks(path, member)
+    if fast == total:
+        return "fast"
+    return "python" if fast == 0 else f"fast {fast}/{total}"
+
+
+def _parse(path: str, member: str | None, engine: str):
+    stats = ParseStats()
+    return parse_csv_file(path, stats, member, engine), stats
+
+
+def _field_types(sessions) -> set[tuple[str, str]]:
+    """Pares (campo, tipo) presentes en las sesiones."""
+    return {(name, type(value).__name__) for s in sessions for name, value in vars(s).items()}
+
+
+def _timed(fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def report_differences(a, b) -> list[str]:
+    """Diferencias entre dos CellManagerReport (vacío si son iguales)."""
+    diffs = []
+    for name in ("total_policies", "total_jobs", "size_tb", "compliance_pct", "duplicates_dropped", "parse_stats"):
+        if getattr(a, name) != getattr(b, name):
+            diffs.append(f"{name}: {getattr(a, name)!r} != {getattr(b, name)!r}")
+    if a.sessions != b.sessions:
+        diffs.append("sessions")
+    arrays_a, arrays_b = a.spec_index.to_arrays(), b.spec_index.to_arrays()
+    if a.spec_index.specs != b.spec_index.specs or any(
+            not np.array_equal(arrays_a[k], arrays_b[k]) for k in arrays_a):
+        diffs.append("spec_index")
+    if sorted(a.partials) != sorted(b.partials) or any(
+            (p.jobs, p.successes, p.gb_written) != (q.jobs, q.successes, q.gb_written)
+            or not np.array_equal(p.specs, q.specs)
+            for p, q in ((a.partials[d], b.partials[d]) for d in a.partials)):
+        diffs.append("partials")
+    return diffs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara los motores de parseo python y fast.")
+    parser.add_argument("files", nargs="*", help="Reportes .csv/.gz/.zip (por defecto, sintéticos)")
+    parser.add_argument("--cell-manager", default="CHECK")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición (se toma la mejor)")
+    args = parser.parse_args(argv)
+
+    if not fast_engine.available():
+        print("pandas no está instalado: el motor fast no está disponible")
+        return 1
+
+    tmp = None
+    files, same_as = args.files, {}
+    if not files:
+        tmp = tempfile.mkdtemp(prefix="check_engines_")
+        files, same_as = synthetic_files(tmp)
+
+    failures = 0
+    try:
+        print(f"{'Archivo':<32}{'filas':>9}{'python s':>10}{'fast s':>9}{'x':>7}  {'lectura':<14}resultado")
+        for name, path, member in _sources(files):
+            results = {}
+            for engine in ("python", "fast"):
+                elapsed, (sessions, stats) = _timed(lambda: _parse(path, member, engine), args.repeat)
+                results[engine] = (elapsed, sessions, stats)
+            (t_py, s_py, st_py), (t_fast, s_fast, st_fast) = results["python"], results["fast"]
+            diffs = [label for label, same in (("sesiones", s_py == s_fast),
+                                               ("tipos", _field_types(s_py) == _field_types(s_fast)),
+                                               ("stats", st_py == st_fast)) if not same]
+            if path in same_as and s_py != _parse(same_as[path], None, "python")[0]:
+                diffs.append(f"sesiones vs {os.path.basename(same_as[path])}")
+            failures += bool(diffs)
+            reader = _reader(path, member)
+            speedup = t_py / t_fast if t_fast else 0.0
+            print(f"{name[:31]:<32}{len(s_py):>9}{t_py:>10.3f}{t_fast:>9.3f}{speedup:>7.2f}  {reader:<14}"
+                  f"{'OK' if not diffs else 'DIFIERE: ' + ', '.join(diffs)}")
+
+        reports = {engine: parse_multiple_csvs(files, args.cell_manager, engine=engine) for engine in ("python", "fast")}
+        diffs = report_differences(reports["python"], reports["fast"])
+        failures += bool(diffs)
+        total = reports["python"]
+        print(f"\nCellManagerReport ({len(files)} archivos): {total.total_policies} políticas, "
+              f"{total.total_jobs} jobs, {total.size_tb} TB, {total.compliance_pct}% -> "
+              f"{'OK' if not diffs else 'DIFIERE: ' + '; '.join(diffs)}")
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
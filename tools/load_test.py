@@ -0,0 +1,259 @@
+"""Prueba de carga multi-sesión de la aplicación Streamlit (main.py).
+
+Simula N usuarios concurrentes con streamlit.testing.v1.AppTest. Cada usuario:
+inicia sesión por el formulario de login, sube los CSVs sintéticos de cada
+Cell Manager y los Schedules por los mismos st.file_uploader de la vista de
+carga, abre la vista de Métricas y cambia varias veces el filtro de fechas.
+Se reporta la latencia de cada rerun (p50/p90/p99 por fase) y, por usuario,
+la memoria de sus sesiones parseadas (residente y volcada a disco, por el
+tamaño de sus columnas) y el pico de RSS de su proceso.
+
+La carga recorre la rama de carga real de main.py (parseo, detectores,
+presupuesto de memoria, Schedules y snapshot si está activo), así que la
+prueba mide lo mismo que ve un analista.
+
+AppTest reemplaza globales del proceso (Runtime, st.secrets) durante cada
+rerun, así que cada usuario corre en su propio proceso: los reruns de
+distintos usuarios se superponen de verdad y compiten por CPU y disco como
+en el servidor. Los procesos arrancan juntos (barrera) una vez importada la
+aplicación.
+
+Uso:
+    python -m tools.load_test --users 8 --weeks 4 --specs 200 --filter-changes 5
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.synthetic_data import generate
+from utils.config import CONFIG
+from utils.session_store import SpilledSessions, estimate_sessions_bytes
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+APP_PATH = os.path.join(ROOT, "main.py")
+CELL_MANAGERS = CONFIG.cell_managers
+USERNAME, PASSWORD = "loadtest", "loadtest"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def _session_bytes(state) -> tuple[int, int]:
+    """(bytes residentes, bytes volcados a disco) de las sesiones parseadas de un usuario."""
+    resident = spilled = 0
+    for rep in state["cell_manager_data"].values():
+        if isinstance(rep.sessions, SpilledSessions):
+            spilled += sum(int(array.nbytes) for array in rep.sessions._columns.values())
+        else:
+            resident += estimate_sessions_bytes(rep.sessions)
+    return resident, spilled
+
+
+def _peak_rss_bytes() -> int:
+    """Pico de RSS del proceso actual (ru_maxrss está en KiB en Linux); 0 si no está disponible."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _files(paths: list[str], mime: str) -> list[tuple[str, bytes, str]]:
+    """Archivos para FileUploader.set_value: (nombre, contenido, tipo MIME)."""
+    files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            files.append((os.path.basename(path), f.read(), mime))
+    return files
+
+
+class VirtualUser:
+    """Un usuario simulado con su propia instancia de AppTest."""
+
+    def __init__(self, user_id: int, dataset: dict, filter_changes: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        if not hasattr(AppTest, "file_uploader"):
+            raise RuntimeError("La prueba de carga requiere una versión de Streamlit con AppTest.file_uploader")
+        self.user_id = user_id
+        self.dataset = dataset
+        self.filter_changes = filter_changes
+        self.timings = defaultdict(list)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.at.secrets["auth"] = {"username": USERNAME, "password": PASSWORD}
+
+    def _timed(self, phase: str, fn):
+        start = time.perf_counter()
+        fn()
+        self.timings[phase].append(time.perf_counter() - start)
+        if self.at.exception:
+            raise RuntimeError(f"Usuario {self.user_id}, fase {phase}: {self.at.exception[0].value}")
+
+    @property
+    def session_temp_dir(self) -> str:
+        """SESSION_TEMP_DIR que main.py asignó a este usuario."""
+        return os.path.join(tempfile.gettempdir(), "streamlit_backup_uploads", self.at.session_state["session_id"])
+
+    def _upload_cm(self, cm: str, files: list) -> None:
+        at = self.at
+        if len(CELL_MANAGERS) > CONFIG.upload_page_size:
+            # Con paginación, la tarjeta del Cell Manager se encuentra buscándolo
+            at.text_input(key="cm_search").set_value(cm).run()
+        at.file_uploader(key=f"csv_{cm}").set_value(files).run()
+
+    def run(self) -> None:
+        at = self.at
+        self._timed("login_screen", at.run)
+
+        def login():
+            at.text_input[0].input(USERNAME)
+            at.text_input[1].input(PASSWORD)
+            at.button[0].click()
+            at.run()
+        self._timed("login", login)
+
+        for cm, paths in self.dataset["csv"].items():
+            files = _files(paths, "text/csv")
+            self._timed("upload_cm", lambda: self._upload_cm(cm, files))
+        schedules = _files(self.dataset["schedules"], "application/octet-stream")
+        self._timed("upload_schedule", lambda: at.file_uploader(key="schedule_upload").set_value(schedules).run())
+        self._timed("metrics_page", lambda: at.sidebar.radio[0].set_value("📊 Métricas").run())
+
+        date_input = at.sidebar.date_input[0]
+        start, end = date_input.value
+        for i in range(self.filter_changes):
+            # Alterna entre acotar y ampliar el rango para forzar recálculo
+            new_start = start + timedelta(days=(i % 3) * 3)
+            self._timed("filter_change", lambda: at.sidebar.date_input[0].set_value((new_start, end)).run())
+
+
+def _run_user(user_id: int, dataset: dict, filter_changes: int, timeout: float, barrier, results) -> None:
+    """Proceso de un usuario: espera a los demás, ejecuta el recorrido y envía sus métricas."""
+    result = {"user": user_id, "timings": {}, "resident": 0, "spilled": 0, "rss": 0, "error": None}
+    user = None
+    try:
+        user = VirtualUser(user_id, dataset, filter_changes, timeout)
+        barrier.wait()
+        user.run()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        barrier.abort()  # que ningún otro proceso quede esperando
+    if user is not None:
+        result["timings"] = dict(user.timings)
+        if "cell_manager_data" in user.at.session_state:
+            result["resident"], result["spilled"] = _session_bytes(user.at.session_state)
+        if "session_id" in user.at.session_state:
+            shutil.rmtree(user.session_temp_dir, ignore_errors=True)
+    result["rss"] = _peak_rss_bytes()
+    results.put(result)
+
+
+def run_load_test(users: int, weeks: int, specs: int, schedules: int, filter_changes: int,
+                  timeout: float = 120.0) -> dict:
+    """Ejecuta la prueba y retorna métricas agregadas por fase."""
+    workdir = tempfile.mkdtemp(prefix="backup_loadtest_")
+    try:
+        dataset = generate(workdir, CELL_MANAGERS, weeks=weeks, specs=specs, schedules=schedules)
+        # spawn: cada proceso importa la aplicación desde cero, sin heredar estado de Streamlit
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(users)
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=_run_user, args=(i, dataset, filter_changes, timeout, barrier, results))
+            for i in range(users)
+        ]
+        started = time.perf_counter()
+        for p in procs:
+            p.start()
+        collected = []
+        while len(collected) < users:
+            try:
+                collected.append(results.get(timeout=1))
+            except queue.Empty:
+                # Un proceso que murió sin reportar (p. ej. por falta de memoria) no bloquea la prueba
+                if not any(p.is_alive() for p in procs):
+                    break
+        for p in procs:
+            p.join()
+        reported = {r["user"] for r in collected}
+        errors = [f"Usuario {i}: el proceso terminó sin reportar (código {procs[i].exitcode})"
+                  for i in range(users) if i not in reported]
+        collected.sort(key=lambda r: r["user"])
+
+        phases = defaultdict(list)
+        for r in collected:
+            for phase, values in r["timings"].items():
+                phases[phase].extend(values)
+
+        return {
+            "users": users,
+            "wall_seconds": time.perf_counter() - started,
+            "phases": {
+                phase: {
+                    "n": len(v),
+                    "p50_ms": _percentile(v, 50) * 1000,
+                    "p90_ms": _percentile(v, 90) * 1000,
+                    "p99_ms": _percentile(v, 99) * 1000,
+                    "max_ms": max(v) * 1000,
+                }
+                for phase, v in phases.items()
+            },
+            "session_memory_mb": [r["resident"] / 1024 / 1024 for r in collected],
+            "spilled_mb": [r["spilled"] / 1024 / 1024 for r in collected],
+            "peak_rss_mb": [r["rss"] / 1024 / 1024 for r in collected],
+            "errors": [f"Usuario {r['user']}: {r['error']}" for r in collected if r["error"]] + errors,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_report(result: dict) -> None:
+    print(f"\nUsuarios concurrentes: {result['users']}  ·  Tiempo total: {result['wall_seconds']:.1f}s")
+    print(f"\n{'Fase':<16}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for phase, m in result["phases"].items():
+        print(f"{phase:<16}{m['n']:>6}{m['p50_ms']:>10.1f}{m['p90_ms']:>10.1f}{m['p99_ms']:>10.1f}{m['max_ms']:>10.1f}")
+    print()
+    for label, key in (("Memoria residente de sesiones", "session_memory_mb"),
+                       ("Sesiones volcadas a disco", "spilled_mb"),
+                       ("Pico de RSS por proceso", "peak_rss_mb")):
+        values = result[key]
+        if values:
+            print(f"{label} (MB): media {statistics.mean(values):.1f} · máx {max(values):.1f}")
+    for e in result["errors"]:
+        print(f"ERROR {e}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga multi-sesión de la aplicación Streamlit.")
+    parser.add_argument("--users", type=int, default=4, help="Sesiones concurrentes")
+    parser.add_argument("--weeks", type=int, default=4, help="CSVs semanales por Cell Manager")
+    parser.add_argument("--specs", type=int, default=100, help="Especificaciones por Cell Manager")
+    parser.add_argument("--schedules", type=int, default=1, help="Schedules mensuales por usuario")
+    parser.add_argument("--filter-changes", type=int, default=5, help="Cambios del filtro de fechas por usuario")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout por rerun (s)")
+    args = parser.parse_args(argv)
+
+    result = run_load_test(args.users, args.weeks, args.specs, args.schedules, args.filter_changes, args.timeout)
+    print_report(result)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Perfil de arranque en frío de la aplicación.
+
+Cada medición corre en un proceso Python nuevo (imports sin caché):
+- time-to-login-screen: primer rerun de main.py sin autenticar;
+- first-rerun: primer rerun ya autenticado (vista de carga) y el de Métricas;
+- módulos pesados (pandas, numpy, openpyxl, dateutil) importados en cada punto;
+- top de imports por tiempo acumulado según `python -X importtime`.
+
+Uso:
+    python -m tools.profile_startup [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "dateutil")
+
+_PROBE = r"""
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, ROOT)
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+heavy = lambda: [m for m in HEAVY if m in sys.modules]
+result = {"import_streamlit_s": time.perf_counter() - t0}
+
+at = AppTest.from_file(ROOT + "/main.py", default_timeout=120)
+at.secrets["auth"] = {"username": "u", "password": "p"}
+t = time.perf_counter(); at.run()
+result["login_screen_s"] = time.perf_counter() - t
+result["login_screen_modules"] = heavy()
+
+at.text_input[0].input("u"); at.text_input[1].input("p"); at.button[0].click()
+t = time.perf_counter(); at.run()
+result["first_rerun_s"] = time.perf_counter() - t
+result["first_rerun_modules"] = heavy()
+
+t = time.perf_counter(); at.sidebar.radio[0].set_value(at.sidebar.radio[0].options[-1]).run()
+result["metrics_rerun_s"] = time.perf_counter() - t
+result["metrics_modules"] = heavy()
+print("RESULT " + json.dumps(result))
+"""
+
+
+def _probe_once() -> dict:
+    code = f"ROOT = {ROOT!r}\nHEAVY = {HEAVY_MODULES!r}\n" + _PROBE
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, check=True)
+    line = next(l for l in out.stdout.splitlines() if l.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def import_profile(top: int = 15) -> list[tuple[int, str]]:
+    """Top de módulos de la app por tiempo acumulado de import (µs), en frío."""
+    code = (
+        f"import sys; sys.path.insert(0, {ROOT!r})\n"
+        "import streamlit, pandas, openpyxl\n"
+        "import parsers.csv_parser, parsers.schedule_parser, utils.schedule_matrix, utils.anomaly, utils.session_store\n"
+    )
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=ROOT)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Los imports anidados vienen indentados; solo se listan los de primer nivel
+        if not name[1:].startswith(" "):
+            rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Perfil de arranque en frío de main.py.")
+    parser.add_argument("--repeat", type=int, default=3, help="Procesos nuevos a medir")
+    args = parser.parse_args(argv)
+
+    runs = [_probe_once() for _ in range(args.repeat)]
+    print(f"{'Medición':<24}{'mediana s':>12}{'mín s':>10}")
+    for key in ("import_streamlit_s", "login_screen_s", "first_rerun_s", "metrics_rerun_s"):
+        values = [r[key] for r in runs]
+        print(f"{key:<24}{statistics.median(values):>12.3f}{min(values):>10.3f}")
+
+    print("\nMódulos pesados importados:")
+    for key in ("login_screen_modules", "first_rerun_modules", "metrics_modules"):
+        print(f"  {key:<24}{', '.join(runs[-1][key]) or '-'}")
+
+    print("\nImports de primer nivel por tiempo acumulado:")
+    for cumulative_us, name in import_profile():
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
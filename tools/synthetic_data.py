@@ -0,0 +1,119 @@
+"""Generación de reportes sintéticos de Data Protector y Schedules para pruebas de carga.
+
+Uso:
+    python -m tools.synthetic_data --out /tmp/synthetic --weeks 4 --specs 200
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.schedule_parser import SHEET_MAPPING
+
+SESSION_HEADERS = [
+    "Session Type", "Specification", "Status", "Mode", "Start Time", "Start Time_t",
+    "End Time", "End Time_t", "Queuing", "Duration", "GB Written", "Media", "Errors",
+    "Warnings", "Pending DA", "Running DA", "Failed DA", "Completed DA", "Object",
+    "Files", "Success", "Session Owner", "Session ID",
+]
+
+SCHEDULE_HEADERS = ["JOB", "FECHA", "HORA", "STATUS", "JOB ID RELANZADO", "CASO"]
+
+
+def write_session_report(path: str, cell_manager: str, start: datetime, days: int = 7,
+                         specs: int = 100, seed: int = 0) -> int:
+    """Escribe un reporte semanal TSV con el formato de Data Protector.
+
+    Genera una sesión por especificación y día. Retorna la cantidad de filas.
+    """
+    rnd = random.Random(seed)
+    lines = [
+        "# Data Protector Report", "# Title: List of Sessions", "#",
+        f"# Cell Manager: {cell_manager}", f"# Created on: {start:%m/%d/%Y}", "#", "#",
+        "# " + "\t".join(SESSION_HEADERS),
+    ]
+    for day in range(days):
+        for spec in range(specs):
+            st = start + timedelta(days=day, hours=rnd.randint(0, 23), minutes=rnd.randint(0, 59))
+            minutes = rnd.randint(5, 300)
+            et = st + timedelta(minutes=minutes)
+            ok = rnd.random() > 0.05
+            lines.append("\t".join([
+                "Backup", f"{cell_manager}_SPEC_{spec:04d}", "Completed" if ok else "Failed", "full",
+                f"{st:%m/%d/%Y %I:%M:%S %p}", str(int(st.timestamp())),
+                f"{et:%m/%d/%Y %I:%M:%S %p}", str(int(et.timestamp())),
+                "0:00", f"{minutes // 60}:{minutes % 60:02d}", f"{rnd.uniform(1, 500):.2f}", "1",
+                str(0 if ok else rnd.randint(1, 5)), str(rnd.randint(0, 3)), "0", "0",
+                str(0 if ok else 1), str(rnd.randint(1, 10)), str(rnd.randint(1, 10)),
+                str(rnd.randint(10, 10000)), "100%" if ok else "0%", "root.sys@cm",
+                f"{st:%Y/%m/%d}-{spec + 1}",
+            ]))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines) - 8
+
+
+def write_schedule(path: str, rows_per_sheet: int = 300, seed: int = 0) -> None:
+    """Escribe un Schedule mensual .xlsx con una hoja por plataforma de SHEET_MAPPING."""
+    import openpyxl
+
+    rnd = random.Random(seed)
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for sheet_name in SHEET_MAPPING:
+        ws = wb.create_sheet(sheet_name)
+        ws.append(SCHEDULE_HEADERS)
+        for i in range(rows_per_sheet):
+            status = rnd.choices(
+                ["Completed", "Failed", "Aborted", "Relaunched", "Completed/Warnings"], [80, 5, 2, 5, 8]
+            )[0]
+            relaunch = str(rnd.randint(1000, 9999)) if status == "Relaunched" or (status == "Failed" and rnd.random() < 0.3) else None
+            ticket = f"INC{rnd.randint(10000, 99999)}" if status in ("Failed", "Aborted") and rnd.random() < 0.6 else None
+            ws.append([f"JOB_{sheet_name}_{i}", "", "", status, relaunch, ticket])
+    wb.save(path)
+
+
+def generate(out_dir: str, cell_managers: list[str], weeks: int = 4, specs: int = 100,
+             schedules: int = 1, start: datetime = datetime(2026, 1, 5)) -> dict:
+    """Genera reportes de todos los Cell Managers y Schedules en out_dir.
+
+    Retorna {"csv": {cm: [rutas]}, "schedules": [rutas]}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    result = {"csv": {}, "schedules": []}
+    for c, cm in enumerate(cell_managers):
+        paths = []
+        for w in range(weeks):
+            path = os.path.join(out_dir, f"{cm}_week{w + 1:02d}.csv")
+            write_session_report(path, cm, start + timedelta(weeks=w), specs=specs, seed=c * 1000 + w)
+            paths.append(path)
+        result["csv"][cm] = paths
+    for m in range(schedules):
+        year, month = start.year + (start.month - 1 + m) // 12, (start.month - 1 + m) % 12 + 1
+        path = os.path.join(out_dir, f"Schedule_{year}-{month:02d}.xlsx")
+        write_schedule(path, seed=m)
+        result["schedules"].append(path)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Genera reportes sintéticos de Data Protector.")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--cell-managers", nargs="+", default=["COMHP81", "COMHP83", "LNXCELLMNGVEN", "LNXCELLMNGPTA", "LNXCELLMNGTRI"])
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--specs", type=int, default=100)
+    parser.add_argument("--schedules", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    result = generate(args.out, args.cell_managers, args.weeks, args.specs, args.schedules)
+    total = sum(len(p) for p in result["csv"].values())
+    print(f"{total} CSVs y {len(result['schedules'])} Schedules en {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Agregados parciales combinables por (Cell Manager, día) y (Cell Manager, semana).
+
+Un PartialAggregate resume un bloque de sesiones: jobs, exitosos, GB escritos
+y el conjunto de especificaciones como hashes de 64 bits ordenados. merge es
+asociativa y conmutativa, así que cualquier combinación de Cell Managers y
+periodos se totaliza uniendo sus parciales, sin recorrer sesiones. Las
+especificaciones se cuentan una sola vez aunque aparezcan en varios periodos.
+
+Los parciales se derivan del SpecIndex del reporte (ya deduplicado entre
+archivos), no de cada archivo: los reportes semanales se solapan y sumar
+parciales por archivo contaría dos veces las sesiones repetidas.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import reduce
+
+import numpy as np
+
+from utils.spec_index import AGG_FIELDS
+
+_FAILURES, _GB, _JOBS = (AGG_FIELDS.index(f) for f in ("failures", "gb_written", "jobs"))
+
+# Ordinal de día de las sesiones sin fecha (igual que en utils.spec_index)
+NO_DAY = 0
+
+
+def spec_hashes(cell_manager: str, specs: list[str]) -> np.ndarray:
+    """Hashes estables (entre procesos) de (Cell Manager, especificación).
+
+    El Cell Manager forma parte de la clave: una política con el mismo nombre
+    en dos Cell Managers son dos políticas, como en "Cant. Políticas".
+    """
+    prefix = cell_manager.encode("utf-8") + b"\x1f"
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(prefix + s.encode("utf-8"), digest_size=8).digest(), "little")
+         for s in specs),
+        dtype=np.uint64, count=len(specs),
+    )
+
+
+def _empty_specs() -> np.ndarray:
+    return np.empty(0, dtype=np.uint64)
+
+
+@dataclass
+class PartialAggregate:
+    """Totales combinables de un bloque de sesiones."""
+    jobs: int = 0
+    successes: int = 0
+    gb_written: float = 0.0
+    specs: np.ndarray = field(default_factory=_empty_specs)  # hashes únicos y ordenados
+
+    def merge(self, other: "PartialAggregate") -> "PartialAggregate":
+        return PartialAggregate(
+            jobs=self.jobs + other.jobs,
+            successes=self.successes + other.successes,
+            gb_written=self.gb_written + other.gb_written,
+            specs=np.union1d(self.specs, other.specs),
+        )
+
+    @property
+    def policies(self) -> int:
+        return int(self.specs.size)
+
+    @property
+    def size_tb(self) -> float:
+        return round(self.gb_written / 1024, 2)
+
+    @property
+    def compliance_pct(self) -> float:
+        return round(self.successes / self.jobs * 100, 2) if self.jobs else 0.0
+
+
+def merge_all(parts) -> PartialAggregate:
+    """Combina cualquier cantidad de parciales (vacío si no hay ninguno).
+
+    Equivale a encadenar merge, pero une todos los conjuntos de una vez.
+    """
+    parts = list(parts)
+    if len(parts) <= 2:
+        return reduce(PartialAggregate.merge, parts, PartialAggregate())
+    return PartialAggregate(
+        jobs=sum(p.jobs for p in parts),
+        successes=sum(p.successes for p in parts),
+        gb_written=sum(p.gb_written for p in parts),
+        specs=np.unique(np.concatenate([p.specs for p in parts])),
+    )
+
+
+def daily_partials(cell_manager: str, index) -> dict[int, PartialAggregate]:
+    """{ordinal del día: PartialAggregate} a partir de un SpecIndex."""
+    if index is None or not len(index.specs):
+        return {}
+    arrays = index.to_arrays()
+    days, codes, values = arrays["days"], arrays["codes"], arrays["values"]
+    hashes = spec_hashes(cell_manager, index.specs)
+    # Las filas del índice están ordenadas por día: cada día es un tramo contiguo
+    bounds = np.flatnonzero(np.diff(days)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(days)]))
+    jobs = np.add.reduceat(values[:, _JOBS], starts)
+    failures = np.add.reduceat(values[:, _FAILURES], starts)
+    gb = np.add.reduceat(values[:, _GB], starts)
+    return {
+        int(days[lo]): PartialAggregate(
+            jobs=int(jobs[i]),
+            successes=int(jobs[i] - failures[i]),
+            gb_written=float(gb[i]),
+            specs=np.unique(hashes[codes[lo:hi]]),
+        )
+        for i, (lo, hi) in enumerate(zip(starts.tolist(), ends.tolist()))
+    }
+
+
+def week_start(day: int) -> int:
+    """Ordinal del lunes de la semana ISO del día (NO_DAY se mantiene)."""
+    if day == NO_DAY:
+        return NO_DAY
+    return day - date.fromordinal(day).weekday()
+
+
+def weekly_partials(daily: dict[int, PartialAggregate]) -> dict[int, PartialAggregate]:
+    """{ordinal del lunes: PartialAggregate} combinando los parciales diarios."""
+    weeks = {}
+    for day in sorted(daily):
+        weeks.setdefault(week_start(day), []).append(daily[day])
+    return {week: merge_all(parts) for week, parts in weeks.items()}
+
+
+def day_in_range(day: int, start: date | None = None, end: date | None = None) -> bool:
+    """Si el día está en [start, end]; sin rango entran todos (incluidas sesiones sin fecha)."""
+    if start is None and end is None:
+        return True
+    return (day != NO_DAY
+            and (start is None or day >= start.toordinal())
+            and (end is None or day <= end.toordinal()))
+
+
+def select(partials: dict[int, PartialAggregate], start: date | None = None,
+           end: date | None = None) -> list[PartialAggregate]:
+    """Parciales de los días en [start, end] (ver day_in_range)."""
+    return [p for day, p in partials.items() if day_in_range(day, start, end)]
+
+
+def week_label(week: int) -> str:
+    if week == NO_DAY:
+        return "Sin fecha"
+    monday = date.fromordinal(week)
+    return f"{monday:%d/%m} – {monday + timedelta(days=6):%d/%m/%Y}"
@@ -0,0 +1,161 @@
+"""Detección incremental de anomalías por especificación (GB escritos y duración).
+
+Mantiene media y varianza móviles con el algoritmo de Welford para cada
+(Cell Manager, especificación). Cada sesión nueva se compara contra la
+historia previa y luego se incorpora en O(1), sin recorrer sesiones antiguas.
+"""
+
+import math
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from utils.calculations import parse_duration_hours
+
+
+@dataclass
+class RunningStats:
+    """Media y varianza acumuladas (Welford)."""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Desviación estándar muestral (0 con menos de 2 muestras)."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+@dataclass
+class AnomalyFlag:
+    """Sesión marcada como atípica respecto a la historia de su especificación."""
+    cell_manager: str = ""
+    specification: str = ""
+    session_id: str = ""
+    start_datetime: object = None
+    metric: str = ""  # "gb_written" | "duration_h"
+    value: float = 0.0
+    mean: float = 0.0
+    std: float = 0.0
+    z: float = 0.0
+
+
+@dataclass
+class SpecHistory:
+    """Estadísticas acumuladas de una especificación."""
+    gb_written: RunningStats = field(default_factory=RunningStats)
+    duration_h: RunningStats = field(default_factory=RunningStats)
+
+
+class AnomalyDetector:
+    """Motor de estadísticas en línea que marca sesiones atípicas al ingerirlas.
+
+    Solo se consideran sesiones exitosas (Success distinto de "0%"): los fallos
+    ya se reflejan en el cumplimiento y sus 0 GB distorsionarían la media.
+    Se marca una sesión si escribe mucho menos que lo habitual (z <= -umbral)
+    o si dura mucho más (z >= umbral), una vez que la especificación tiene
+    min_samples sesiones previas.
+    """
+
+    def __init__(self, min_samples: int = 5, z_threshold: float = 3.0):
+        self.min_samples = min_samples
+        self.z_threshold = z_threshold
+        self.flags: list[AnomalyFlag] = []
+        self._history: dict[tuple, SpecHistory] = {}
+        self._seen: set = set()
+
+    def _score(self, stats: RunningStats, value: float) -> float | None:
+        """z-score de value contra la historia previa, o None si no hay suficiente."""
+        if stats.n < self.min_samples:
+            return None
+        # Piso de desviación: evita z infinitos en especificaciones muy estables
+        std = max(stats.std, abs(stats.mean) * 0.01, 1e-6)
+        return (value - stats.mean) / std
+
+    @staticmethod
+    def _session_key(cell_manager: str, session) -> tuple:
+        return (cell_manager, session.session_id or (session.specification, session.start_time))
+
+    def observe(self, cell_manager: str, session) -> list[AnomalyFlag]:
+        """Incorpora una sesión y retorna las anomalías que generó (puede ser [])."""
+        key = self._session_key(cell_manager, session)
+        if key in self._seen:
+            return []
+        self._seen.add(key)
+
+        if not session.success or session.success.strip() == "0%":
+            return []
+
+        history = self._history.get((cell_manager, session.specification))
+        if history is None:
+            history = self._history[(cell_manager, session.specification)] = SpecHistory()
+
+        new_flags = []
+        samples = (
+            ("gb_written", session.gb_written, -1),
+            ("duration_h", parse_duration_hours(session.duration), 1),
+        )
+        for metric, value, direction in samples:
+            if value is None:
+                continue
+            stats = getattr(history, metric)
+            z = self._score(stats, value)
+            if z is not None and z * direction >= self.z_threshold:
+                new_flags.append(AnomalyFlag(
+                    cell_manager=cell_manager,
+                    specification=session.specification,
+                    session_id=session.session_id,
+                    start_datetime=session.start_datetime,
+                    metric=metric,
+                    value=round(value, 2),
+                    mean=round(stats.mean, 2),
+                    std=round(stats.std, 2),
+                    z=round(z, 2),
+                ))
+            stats.update(value)
+
+        self.flags.extend(new_flags)
+        return new_flags
+
+    def ingest(self, cell_manager: str, sessions) -> list[AnomalyFlag]:
+        """Incorpora un lote de sesiones en orden cronológico.
+
+        Las sesiones ya vistas (mismo Session ID) se ignoran, así que re-ingerir
+        un reporte que incluye semanas anteriores solo procesa las nuevas.
+        """
+        fresh = [s for s in sessions if self._session_key(cell_manager, s) not in self._seen]
+        ordered = sorted(
+            fresh,
+            key=lambda s: (s.start_datetime is None, s.start_datetime.timestamp() if s.start_datetime else 0),
+        )
+        new_flags = []
+        for s in ordered:
+            new_flags.extend(self.observe(cell_manager, s))
+        return new_flags
+
+    def export_state(self) -> dict:
+        """Historia y anomalías en forma serializable a JSON (sin el conjunto de vistas)."""
+        return {
+            "history": [
+                [cm, spec, *asdict(h.gb_written).values(), *asdict(h.duration_h).values()]
+                for (cm, spec), h in self._history.items()
+            ],
+            "flags": [
+                {**asdict(f), "start_datetime": f.start_datetime.isoformat() if f.start_datetime else None}
+                for f in self.flags
+            ],
+        }
+
+    def restore_state(self, state: dict, seen_keys) -> None:
+        """Restaura lo exportado por export_state; seen_keys son las claves de las sesiones ya ingeridas."""
+        for cm, spec, gn, gmean, gm2, dn, dmean, dm2 in state["history"]:
+            self._history[(cm, spec)] = SpecHistory(RunningStats(gn, gmean, gm2), RunningStats(dn, dmean, dm2))
+        for f in state["flags"]:
+            start = f["start_datetime"]
+            self.flags.append(AnomalyFlag(**{**f, "start_datetime": datetime.fromisoformat(start) if start else None}))
+        self._seen.update(seen_keys)
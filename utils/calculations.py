@@ -33,3 +33,19 @@ def get_kpi_color(pct: float) -> str:
         return "#ff6d00"
     else:
         return "#ff1744"
+
+
+def parse_duration_hours(text: str) -> float | None:
+    """Convierte la columna Duration de Data Protector ("H:MM" o "H:MM:SS") a horas.
+
+    Retorna None si el texto está vacío o no tiene ese formato.
+    """
+    if not text:
+        return None
+    parts = text.strip().split(":")
+    if len(parts) not in (2, 3) or not all(p.isdigit() for p in parts):
+        return None
+    hours = int(parts[0]) + int(parts[1]) / 60
+    if len(parts) == 3:
+        hours += int(parts[2]) / 3600
+    return hours
@@ -0,0 +1,52 @@
+"""Configuración de Cell Managers y plataformas del Schedule.
+
+Se lee de config/cell_managers.json (o del archivo indicado en
+BACKUP_DASHBOARD_CONFIG) una vez por proceso:
+
+    cell_managers     Cell Managers con tarjeta de carga, en orden de aparición
+    schedule_sheets   {hoja del Excel: plataforma} (hojas ausentes se ignoran)
+    upload_page_size  tarjetas de carga por página
+"""
+
+import json
+import os
+from dataclasses import dataclass
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.environ.get("BACKUP_DASHBOARD_CONFIG", os.path.join(_ROOT, "config", "cell_managers.json"))
+
+
+@dataclass
+class AppConfig:
+    cell_managers: list[str]
+    schedule_sheets: dict[str, str]
+    upload_page_size: int = 12
+
+
+def load_config(path: str = CONFIG_PATH) -> AppConfig:
+    """Lee y valida el archivo de configuración; ValueError si es inválido."""
+    with open(path, encoding="utf-8") as f:
+        try:
+            raw = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: JSON inválido ({e})") from e
+
+    cell_managers = raw.get("cell_managers")
+    if not isinstance(cell_managers, list) or not all(isinstance(cm, str) and cm for cm in cell_managers):
+        raise ValueError(f"{path}: 'cell_managers' debe ser una lista de nombres")
+    duplicated = sorted({cm for cm in cell_managers if cell_managers.count(cm) > 1})
+    if duplicated:
+        raise ValueError(f"{path}: Cell Managers repetidos: {', '.join(duplicated)}")
+
+    sheets = raw.get("schedule_sheets", {})
+    if not isinstance(sheets, dict) or not all(isinstance(v, str) and v for v in sheets.values()):
+        raise ValueError(f"{path}: 'schedule_sheets' debe ser un objeto {{hoja: plataforma}}")
+
+    page_size = raw.get("upload_page_size", 12)
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError(f"{path}: 'upload_page_size' debe ser un entero positivo")
+
+    return AppConfig(cell_managers, sheets, page_size)
+
+
+CONFIG = load_config()
@@ -0,0 +1,243 @@
+"""Limpieza del directorio temporal de cargas (streamlit_backup_uploads).
+
+Cada sesión guarda sus archivos subidos en <base>/<session_id>. Un hilo en
+segundo plano aplica tres reglas en cada pasada:
+
+1. Sesiones inactivas: se borra el directorio completo de las sesiones sin
+   acceso durante más de idle_hours (el acceso lo marca touch_session en
+   cada rerun).
+2. Cuota por sesión: si una sesión supera su cuota se borran sus archivos
+   subidos más antiguos. Los datos ya están parseados en memoria, así que
+   las copias subidas solo se necesitan al momento del parseo.
+3. Cuota global: si el total sigue por encima, se borran archivos subidos de
+   todas las sesiones (los más antiguos primero) y, como último recurso, las
+   sesiones completas menos usadas recientemente que no estén activas.
+
+Los volcados de memoria (spill/, ver utils.session_store) de una sesión
+activa nunca se tocan: están mapeados por los reportes de esa sesión.
+"""
+
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+
+SESSION_QUOTA_MB = int(os.environ.get("BACKUP_DASHBOARD_TEMP_SESSION_QUOTA_MB", "512"))
+GLOBAL_QUOTA_MB = int(os.environ.get("BACKUP_DASHBOARD_TEMP_GLOBAL_QUOTA_MB", "4096"))
+IDLE_HOURS = float(os.environ.get("BACKUP_DASHBOARD_TEMP_IDLE_H", "12"))
+JANITOR_INTERVAL_S = 300
+
+ACCESS_MARKER = ".last_access"
+SPILL_DIRNAME = "spill"
+# Una sesión con acceso más reciente que esto se considera en uso
+_ACTIVE_SECONDS = 15 * 60
+# Un archivo subido hace menos de esto puede estar parseándose todavía
+_UPLOAD_GRACE_SECONDS = 120
+
+
+def touch_session(session_dir: str) -> None:
+    """Marca el último acceso de una sesión (se llama en cada rerun)."""
+    marker = os.path.join(session_dir, ACCESS_MARKER)
+    try:
+        os.utime(marker)
+    except FileNotFoundError:
+        open(marker, "a").close()
+    except OSError:
+        pass
+
+
+@dataclass
+class SessionUsage:
+    """Uso de disco de un directorio de sesión."""
+    session_id: str
+    path: str
+    upload_bytes: int = 0
+    spill_bytes: int = 0
+    files: int = 0
+    last_access: float = 0.0
+    uploads: list = field(default_factory=list)  # [(mtime, bytes, ruta)] de archivos subidos
+
+    @property
+    def total_bytes(self) -> int:
+        return self.upload_bytes + self.spill_bytes
+
+
+@dataclass
+class JanitorRun:
+    """Resultado de una pasada del janitor."""
+    finished_at: float = 0.0
+    sessions: int = 0
+    total_bytes: int = 0
+    expired_sessions: int = 0
+    evicted_sessions: int = 0
+    removed_files: int = 0
+    freed_bytes: int = 0
+
+
+def _dir_bytes(path: str) -> tuple[int, int]:
+    """(bytes, archivos) bajo path, recursivo."""
+    total = files = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0, 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                b, f = _dir_bytes(entry.path)
+                total += b
+                files += f
+            else:
+                total += entry.stat(follow_symlinks=False).st_size
+                files += 1
+        except OSError:
+            continue
+    return total, files
+
+
+def scan_session(path: str) -> SessionUsage:
+    usage = SessionUsage(session_id=os.path.basename(path), path=path)
+    try:
+        usage.last_access = os.stat(os.path.join(path, ACCESS_MARKER)).st_mtime
+    except OSError:
+        usage.last_access = os.stat(path).st_mtime
+    for entry in os.scandir(path):
+        if entry.name == ACCESS_MARKER:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            b, f = _dir_bytes(entry.path)
+            if entry.name == SPILL_DIRNAME:
+                usage.spill_bytes += b
+            else:
+                usage.upload_bytes += b
+            usage.files += f
+        else:
+            st = entry.stat(follow_symlinks=False)
+            usage.upload_bytes += st.st_size
+            usage.files += 1
+            usage.uploads.append((st.st_mtime, st.st_size, entry.path))
+    usage.uploads.sort()
+    return usage
+
+
+class TempJanitor:
+    """Aplica cuotas y expiración sobre <base_dir>/<session_id> en un hilo propio."""
+
+    def __init__(self, base_dir: str, session_quota_mb: int = SESSION_QUOTA_MB,
+                 global_quota_mb: int = GLOBAL_QUOTA_MB, idle_hours: float = IDLE_HOURS,
+                 interval: float = JANITOR_INTERVAL_S):
+        self.base_dir = base_dir
+        self.session_quota = session_quota_mb * 1024 * 1024
+        self.global_quota = global_quota_mb * 1024 * 1024
+        self.idle_seconds = idle_hours * 3600
+        self.interval = interval
+        self.last_run = None  # JanitorRun de la última pasada
+        self.last_error = ""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def usage(self) -> list[SessionUsage]:
+        """Uso actual por sesión."""
+        if not os.path.isdir(self.base_dir):
+            return []
+        sessions = []
+        for entry in os.scandir(self.base_dir):
+            if entry.is_dir(follow_symlinks=False):
+                try:
+                    sessions.append(scan_session(entry.path))
+                except OSError:
+                    # La sesión se borró durante el recorrido
+                    continue
+        return sessions
+
+    @staticmethod
+    def _remove_file(path: str, size: int, run: JanitorRun) -> bool:
+        try:
+            os.unlink(path)
+        except OSError:
+            return False
+        run.removed_files += 1
+        run.freed_bytes += size
+        return True
+
+    def run_once(self, now: float | None = None) -> JanitorRun:
+        """Una pasada completa. Seguro de llamar desde cualquier hilo."""
+        with self._lock:
+            now = time.time() if now is None else now
+            run = JanitorRun()
+            sessions = []
+
+            # 1. Sesiones inactivas
+            for s in self.usage():
+                if now - s.last_access > self.idle_seconds:
+                    shutil.rmtree(s.path, ignore_errors=True)
+                    run.expired_sessions += 1
+                    run.freed_bytes += s.total_bytes
+                else:
+                    sessions.append(s)
+
+            # Solo son candidatos los archivos que ya tuvieron tiempo de parsearse
+            for s in sessions:
+                s.uploads = [u for u in s.uploads if now - u[0] >= _UPLOAD_GRACE_SECONDS]
+
+            # 2. Cuota por sesión: archivos subidos más antiguos primero
+            for s in sessions:
+                while s.total_bytes > self.session_quota and s.uploads:
+                    _, size, path = s.uploads.pop(0)
+                    if self._remove_file(path, size, run):
+                        s.upload_bytes -= size
+
+            # 3. Cuota global: archivos subidos de todas las sesiones, luego sesiones sin uso
+            total = sum(s.total_bytes for s in sessions)
+            if total > self.global_quota:
+                owner = {}
+                for s in sessions:
+                    for upload in s.uploads:
+                        owner[upload[2]] = s
+                for _, size, path in sorted(u for s in sessions for u in s.uploads):
+                    if total <= self.global_quota:
+                        break
+                    if self._remove_file(path, size, run):
+                        owner[path].upload_bytes -= size
+                        total -= size
+                for s in sorted(sessions, key=lambda s: s.last_access):
+                    if total <= self.global_quota:
+                        break
+                    if now - s.last_access < _ACTIVE_SECONDS:
+                        continue
+                    shutil.rmtree(s.path, ignore_errors=True)
+                    run.evicted_sessions += 1
+                    run.freed_bytes += s.total_bytes
+                    total -= s.total_bytes
+                    s.upload_bytes = s.spill_bytes = 0
+
+            run.sessions = len(sessions) - run.evicted_sessions
+            run.total_bytes = max(total, 0)
+            run.finished_at = time.time()
+            self.last_run = run
+            return run
+
+    # ── Hilo en segundo plano ──
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.last_error = ""
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+            self._stop.wait(self.interval)
+
+    def start(self) -> "TempJanitor":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="backup-temp-janitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,38 @@
+"""Ejecución en paralelo de tareas de parseo (CPU-bound) en procesos hijos."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def available_cpus() -> int:
+    """CPUs utilizables por este proceso (respeta la afinidad/cgroups en Linux)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def parallel_map(fn, items: list, max_workers: int | None = None) -> list:
+    """Aplica fn a cada item en un pool de procesos y retorna resultados en orden.
+
+    fn debe ser una función de módulo (importable por el proceso hijo) y sus
+    argumentos/resultados serializables con pickle. Se usa el contexto "spawn"
+    porque el servidor de Streamlit es multihilo y fork no es seguro ahí.
+
+    Con un solo item, o si el pool no puede crearse (entornos sin soporte de
+    multiprocessing), se ejecuta en serie en el proceso actual.
+    """
+    items = list(items)
+    if max_workers is None:
+        max_workers = min(len(items), available_cpus())
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(item) for item in items]
+
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            return list(pool.map(fn, items))
+    except (OSError, RuntimeError, NotImplementedError) as e:
+        # BrokenProcessPool hereda de RuntimeError
+        print(f"Pool de procesos no disponible, procesando en serie: {e}")
+        return [fn(item) for item in items]
@@ -0,0 +1,85 @@
+"""Tabla compacta de jobs relevantes del Schedule (fallidos, relanzados o con caso ITSM).
+
+Cada columna se guarda con codificación categórica: la lista de valores
+distintos y un arreglo de códigos enteros por fila. Plataformas, estados y
+nombres de job se repiten mucho entre filas, así que la tabla ocupa poco y
+los filtros por plataforma o estado son comparaciones sobre enteros.
+"""
+
+import numpy as np
+
+# Columnas de la tabla, en orden
+DETAIL_FIELDS = ("platform", "job", "status", "relaunch_id", "ticket")
+
+
+class Categorical:
+    """Columna de textos como (categorías, códigos)."""
+
+    def __init__(self, categories: list[str], codes: np.ndarray):
+        self.categories = categories
+        self.codes = codes
+
+    @classmethod
+    def encode(cls, values) -> "Categorical":
+        lookup = {}
+        codes = np.fromiter(
+            (lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int32,
+        )
+        return cls(list(lookup), codes)
+
+    def isin(self, values) -> np.ndarray:
+        """Máscara de filas cuyo valor está en values."""
+        wanted = [i for i, c in enumerate(self.categories) if c in set(values)]
+        return np.isin(self.codes, wanted)
+
+    def take(self, rows: np.ndarray) -> list[str]:
+        return [self.categories[c] for c in self.codes[rows].tolist()]
+
+
+class ScheduleDetail:
+    """Filas relevantes de un Schedule en columnas categóricas (DETAIL_FIELDS)."""
+
+    def __init__(self, columns: dict[str, Categorical]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["platform"].codes)
+
+    @classmethod
+    def from_sheets(cls, rows_by_platform: dict[str, list[tuple]]) -> "ScheduleDetail":
+        """rows_by_platform: {plataforma: [(job, status, relaunch_id, ticket), ...]}."""
+        platform = []
+        rest = []
+        for name, rows in rows_by_platform.items():
+            platform.extend([name] * len(rows))
+            rest.extend(rows)
+        columns = {"platform": Categorical.encode(platform)}
+        for i, field in enumerate(DETAIL_FIELDS[1:]):
+            columns[field] = Categorical.encode(r[i] for r in rest)
+        return cls(columns)
+
+    def values(self, field: str) -> list[str]:
+        """Valores distintos de una columna (para los filtros de la vista)."""
+        return list(self.columns[field].categories)
+
+    def select(self, platforms=None, statuses=None) -> list[dict]:
+        """Filas filtradas por plataforma y estado (None = sin filtro)."""
+        mask = np.ones(len(self), dtype=bool)
+        if platforms is not None:
+            mask &= self.columns["platform"].isin(platforms)
+        if statuses is not None:
+            mask &= self.columns["status"].isin(statuses)
+        rows = np.flatnonzero(mask)
+        decoded = {name: col.take(rows) for name, col in self.columns.items()}
+        return [dict(zip(decoded, values)) for values in zip(*decoded.values())]
+
+    def to_dict(self) -> dict:
+        """Forma serializable a JSON (inversa: from_dict)."""
+        return {name: [col.categories, col.codes.tolist()] for name, col in self.columns.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScheduleDetail":
+        return cls({
+            name: Categorical(categories, np.asarray(codes, dtype=np.int32))
+            for name, (categories, codes) in data.items()
+        })
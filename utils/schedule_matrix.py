@@ -0,0 +1,139 @@
+"""Cálculo vectorizado de KPIs del Schedule sobre una matriz plataforma × periodo."""
+
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Orden de los conteos en el último eje de la matriz
+COUNT_FIELDS = ("programados", "ejecutados", "fallidos", "relanzados", "gestionados", "q")
+_IDX = {name: i for i, name in enumerate(COUNT_FIELDS)}
+_LABELS = {
+    "programados": "Programados", "ejecutados": "Ejecutados", "fallidos": "Fallidos",
+    "relanzados": "Relanzados", "gestionados": "Gestionados", "q": "Casos ITSM",
+}
+
+_MONTHS = {
+    "ene": 1, "feb": 2, "mar": 3, "abr": 4, "may": 5, "jun": 6,
+    "jul": 7, "ago": 8, "sep": 9, "set": 9, "oct": 10, "nov": 11, "dic": 12,
+    "jan": 1, "apr": 4, "aug": 8, "dec": 12,
+}
+_YEAR_MONTH = re.compile(r"(20\d{2})[-_. ]?(0[1-9]|1[0-2])(?!\d)")
+_MONTH_YEAR = re.compile(r"(?<!\d)(0[1-9]|1[0-2])[-_. ](20\d{2})")
+_MONTH_NAME_YEAR = re.compile(r"([a-záéíóú]{3})[a-záéíóú]*[-_. ]*(20\d{2})", re.IGNORECASE)
+
+
+def _safe_pct(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den * 100 redondeado a 2 decimales; 0 donde den <= 0."""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    out = np.zeros(np.broadcast(num, den).shape, dtype=np.float64)
+    np.divide(num * 100, den, out=out, where=den > 0)
+    return np.round(out, 2)
+
+
+def compute_kpis(counts: np.ndarray) -> dict[str, np.ndarray]:
+    """Calcula los KPIs del Schedule para un arreglo de conteos de cualquier forma (..., F).
+
+    - kpi_operacion:     (Programados − Fallidos) / Programados × 100
+    - pct_relanzamiento: Relanzados / (Programados − Fallidos) × 100
+    - gestion_fallidos:  Gestionados / (Fallidos + Relanzados) × 100
+    """
+    counts = np.asarray(counts)
+    prog = counts[..., _IDX["programados"]]
+    fal = counts[..., _IDX["fallidos"]]
+    rel = counts[..., _IDX["relanzados"]]
+    gest = counts[..., _IDX["gestionados"]]
+    return {
+        "kpi_operacion": _safe_pct(prog - fal, prog),
+        "pct_relanzamiento": _safe_pct(rel, prog - fal),
+        "gestion_fallidos": _safe_pct(gest, fal + rel),
+    }
+
+
+def period_sort_key(period_name: str) -> tuple:
+    """Clave de orden cronológico a partir del nombre del periodo.
+
+    Reconoce "2026-01", "01-2026" y "Enero 2026"; los nombres sin fecha
+    reconocible quedan al final, en orden alfabético.
+    """
+    m = _YEAR_MONTH.search(period_name)
+    if m:
+        return (0, int(m.group(1)), int(m.group(2)), period_name)
+    m = _MONTH_YEAR.search(period_name)
+    if m:
+        return (0, int(m.group(2)), int(m.group(1)), period_name)
+    for m in _MONTH_NAME_YEAR.finditer(period_name):
+        month = _MONTHS.get(m.group(1).lower())
+        if month:
+            return (0, int(m.group(2)), month, period_name)
+    return (1, 0, 0, period_name)
+
+
+@dataclass
+class ScheduleMatrix:
+    """Conteos de varios Schedules: counts[plataforma, periodo, campo]."""
+    platforms: list = field(default_factory=list)
+    periods: list = field(default_factory=list)
+    counts: np.ndarray = field(default_factory=lambda: np.zeros((0, 0, len(COUNT_FIELDS)), dtype=np.int64))
+
+    @classmethod
+    def from_reports(cls, reports: list) -> "ScheduleMatrix":
+        """Construye la matriz desde ScheduleReports, ordenados cronológicamente."""
+        reports = sorted(reports, key=lambda r: period_sort_key(r.period_name))
+        platforms = []
+        for r in reports:
+            for row in r.rows:
+                if row.platform not in platforms:
+                    platforms.append(row.platform)
+        p_idx = {p: i for i, p in enumerate(platforms)}
+
+        counts = np.zeros((len(platforms), len(reports), len(COUNT_FIELDS)), dtype=np.int64)
+        for t, r in enumerate(reports):
+            for row in r.rows:
+                counts[p_idx[row.platform], t] = [getattr(row, f) for f in COUNT_FIELDS]
+
+        return cls(platforms=platforms, periods=[r.period_name for r in reports], counts=counts)
+
+    def count(self, name: str) -> np.ndarray:
+        """Conteo de un campo como matriz (plataforma, periodo)."""
+        return self.counts[..., _IDX[name]]
+
+    def platform_kpis(self) -> dict[str, np.ndarray]:
+        """KPIs por plataforma y periodo, cada uno de forma (P, T).
+
+        Las celdas de plataformas sin jobs programados en un periodo quedan en NaN.
+        """
+        kpis = compute_kpis(self.counts)
+        missing = self.count("programados") == 0
+        for values in kpis.values():
+            values[missing] = np.nan
+        return kpis
+
+    def period_totals(self) -> np.ndarray:
+        """Conteos totales por periodo (suma sobre plataformas), forma (T, F)."""
+        return self.counts.sum(axis=0)
+
+    def period_kpis(self) -> dict[str, np.ndarray]:
+        """KPIs generales por periodo, cada uno de forma (T,)."""
+        return compute_kpis(self.period_totals())
+
+    def trend_rows(self) -> list[dict]:
+        """Tabla de tendencia mes a mes: totales, KPIs generales y su variación (pp)."""
+        totals = self.period_totals()
+        kpis = self.period_kpis()
+        deltas = {k: np.round(np.diff(v, prepend=np.nan), 2) for k, v in kpis.items()}
+
+        rows = []
+        for t, period in enumerate(self.periods):
+            row = {"Periodo": period}
+            for i, name in enumerate(COUNT_FIELDS):
+                row[_LABELS[name]] = int(totals[t, i])
+            row["Ind. Efect. Op."] = float(kpis["kpi_operacion"][t])
+            row["Δ Efect. Op."] = float(deltas["kpi_operacion"][t])
+            row["Relanzamiento"] = float(kpis["pct_relanzamiento"][t])
+            row["Δ Relanzamiento"] = float(deltas["pct_relanzamiento"][t])
+            row["Gest. Fallidos"] = float(kpis["gestion_fallidos"][t])
+            row["Δ Gest. Fallidos"] = float(deltas["gestion_fallidos"][t])
+            rows.append(row)
+        return rows
@@ -0,0 +1,168 @@
+"""Explorador paginado de sesiones individuales, resuelto del lado del servidor.
+
+Sobre las columnas de las sesiones (ver utils.session_store) se arman una vez:
+
+- códigos enteros por fila para especificación y status (rango del valor
+  entre los valores distintos, ordenados);
+- un índice de prefijos de especificación: los nombres distintos en
+  minúsculas ordenados, donde un prefijo es un tramo contiguo
+  (np.searchsorted) que se traduce a un conjunto de códigos;
+- una permutación de orden por cada campo ordenable (np.argsort), creada la
+  primera vez que se ordena por ese campo.
+
+El explorador no guarda textos por fila: los índices son arreglos de enteros
+y la búsqueda por Session ID recorre los bytes codificados de la columna,
+así que sobre sesiones volcadas a disco lee el archivo mapeado en lugar de
+traer la columna a memoria. Filtrar combina máscaras booleanas; ordenar es
+recorrer la permutación del campo. El resultado (filas que cumplen el
+filtro, en orden) se memoriza para la última consulta, así que cambiar de
+página es un slice y solo se reconstruyen los registros de la página visible.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from utils.session_store import _EPOCH, _NO_DATE, ColumnarSessions, encode_columns
+
+# Campos ordenables: {columna: etiqueta}
+SORT_FIELDS = {
+    "start_datetime": "Inicio",
+    "specification": "Especificación",
+    "status": "Status",
+    "gb_written": "GB escritos",
+    "errors": "Errores",
+    "failed_da": "Failed DA",
+    "session_id": "Session ID",
+}
+
+
+def _micros(d: date, end: bool = False) -> int:
+    """Microsegundos desde _EPOCH del inicio (o fin) del día."""
+    dt = datetime.combine(d, datetime.max.time() if end else datetime.min.time())
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _ranks(values: list[str]) -> tuple[list[str], np.ndarray]:
+    """(valores distintos ordenados, rango de cada fila entre ellos)."""
+    uniques, inverse = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return uniques.tolist(), inverse.reshape(-1).astype(np.int32)
+
+
+class SessionBrowser:
+    """Consultas paginadas sobre las sesiones de un Cell Manager."""
+
+    def __init__(self, sessions):
+        if not isinstance(sessions, ColumnarSessions):
+            sessions = ColumnarSessions(encode_columns(sessions))
+        self.sessions = sessions
+        self._starts = np.asarray(sessions.column("start_datetime"))
+
+        # Los textos por fila solo se decodifican aquí, para calcular los códigos
+        specs, self._spec_codes = _ranks(sessions.text_column("specification"))
+        self.statuses, self._status_codes = _ranks(sessions.text_column("status"))
+
+        # Índice de prefijos: especificaciones distintas ordenadas en minúsculas
+        lowered = np.array([s.lower() for s in specs], dtype=object)
+        self._lower_order = np.argsort(lowered, kind="stable")  # códigos de especificación
+        self._lower_sorted = lowered[self._lower_order]
+
+        self._perms = {}
+        self._last = None  # (clave de la consulta, filas resultantes en orden)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria de los índices (las columnas de las sesiones no se cuentan)."""
+        arrays = [self._spec_codes, self._status_codes, self._lower_order, *self._perms.values()]
+        if self._last is not None:
+            arrays.append(self._last[1])
+        return sum(int(a.nbytes) for a in arrays)
+
+    def _permutation(self, field: str) -> np.ndarray:
+        perm = self._perms.get(field)
+        if perm is None:
+            if field == "specification":
+                # Orden sin distinguir mayúsculas, como el índice de prefijos: las
+                # especificaciones que solo difieren en mayúsculas comparten rango
+                rank = np.empty(len(self._lower_order), dtype=np.int64)
+                rank[self._lower_order] = np.searchsorted(self._lower_sorted, self._lower_sorted, side="left")
+                keys = rank[self._spec_codes]
+            elif field == "status":
+                keys = self._status_codes
+            elif field == "session_id":
+                keys = _ranks(self.sessions.text_column("session_id"))[1]
+            else:
+                keys = np.asarray(self.sessions.column(field))
+            perm = self._perms[field] = np.argsort(keys, kind="stable")
+        return perm
+
+    def _session_id_rows(self, needle: str) -> np.ndarray:
+        """Filas cuyo Session ID contiene needle, buscando sobre los bytes UTF-8 de la columna."""
+        offsets = np.asarray(self.sessions.column("session_id.offsets"))
+        data = memoryview(np.ascontiguousarray(self.sessions.column("session_id.data")))
+        pattern = re.compile(re.escape(needle.encode("utf-8")))
+        rows = []
+        pos = 0
+        while (match := pattern.search(data, pos)) is not None:
+            row = int(np.searchsorted(offsets, match.start(), side="right")) - 1
+            end = int(offsets[row + 1])
+            if match.end() <= end:
+                rows.append(row)
+                pos = end  # una coincidencia por fila basta
+            else:
+                pos = match.start() + 1  # la coincidencia cruza al Session ID siguiente
+        return np.array(rows, dtype=np.int64)
+
+    def _mask(self, spec_prefix: str, statuses, session_id: str,
+              start: date | None, end: date | None) -> np.ndarray | None:
+        """Máscara de filas que cumplen los filtros, o None si no hay filtros."""
+        mask = None
+
+        def narrow(m):
+            nonlocal mask
+            mask = m if mask is None else mask & m
+
+        if spec_prefix:
+            prefix = spec_prefix.lower()
+            lo = np.searchsorted(self._lower_sorted, prefix, side="left")
+            hi = np.searchsorted(self._lower_sorted, prefix + "\uffff", side="right")
+            narrow(np.isin(self._spec_codes, self._lower_order[lo:hi]))
+        if statuses:
+            wanted = [i for i, s in enumerate(self.statuses) if s in set(statuses)]
+            narrow(np.isin(self._status_codes, wanted))
+        if session_id:
+            m = np.zeros(len(self), dtype=bool)
+            m[self._session_id_rows(session_id)] = True
+            narrow(m)
+        if start is not None or end is not None:
+            m = self._starts != _NO_DATE
+            if start is not None:
+                m &= self._starts >= _micros(start)
+            if end is not None:
+                m &= self._starts <= _micros(end, end=True)
+            narrow(m)
+        return mask
+
+    def query(self, sort: str = "start_datetime", descending: bool = False, spec_prefix: str = "",
+              statuses=None, session_id: str = "", start: date | None = None,
+              end: date | None = None) -> np.ndarray:
+        """Índices de las filas que cumplen los filtros, en el orden pedido."""
+        key = (sort, descending, spec_prefix, tuple(statuses or ()), session_id, start, end)
+        if self._last is not None and self._last[0] == key:
+            return self._last[1]
+        perm = self._permutation(sort)
+        if descending:
+            perm = perm[::-1]
+        mask = self._mask(spec_prefix.strip(), statuses, session_id.strip(), start, end)
+        rows = perm if mask is None else perm[mask[perm]]
+        self._last = (key, rows)
+        return rows
+
+    def page(self, rows: np.ndarray, page: int, page_size: int) -> list:
+        """SessionRecord de la página (desde 1) de un resultado de query."""
+        lo = (page - 1) * page_size
+        return [self.sessions[int(i)] for i in rows[lo:lo + page_size]]
@@ -0,0 +1,241 @@
+"""Presupuesto de memoria por sesión con volcado de sesiones a disco.
+
+Cuando las sesiones parseadas de un usuario superan el presupuesto, la lista
+de SessionRecord de los Cell Managers más grandes se vuelca a archivos
+columnares (.npy) dentro del directorio temporal de la sesión, y se reemplaza
+por un SpilledSessions que los abre con memory-mapping y reconstruye los
+registros solo al accederlos. Los agregados del CellManagerReport (jobs, TB,
+cumplimiento) quedan siempre en memoria.
+"""
+
+import os
+import shutil
+import sys
+import uuid
+from collections.abc import Sequence
+from dataclasses import fields
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from models.report_data import SessionRecord
+
+DEFAULT_BUDGET_MB = int(os.environ.get("BACKUP_DASHBOARD_SESSION_BUDGET_MB", "256"))
+
+_EPOCH = datetime(1970, 1, 1)
+_NO_DATE = np.iinfo(np.int64).min
+_BLOCK = 4096
+
+STRING_FIELDS = tuple(f.name for f in fields(SessionRecord) if f.type in (str, "str"))
+INT_FIELDS = tuple(f.name for f in fields(SessionRecord) if f.type in (int, "int"))
+FLOAT_FIELDS = tuple(f.name for f in fields(SessionRecord) if f.type in (float, "float"))
+
+
+# ── Codificación columnar ──
+
+def _encode_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Codifica textos como (offsets int64 de n+1, bytes UTF-8 concatenados)."""
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _encode_datetime(dt) -> int:
+    if dt is None:
+        return _NO_DATE
+    if dt.tzinfo is not None:
+        # Se conserva la hora local del reporte, sin zona
+        dt = dt.replace(tzinfo=None)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def encode_columns(sessions: list) -> dict[str, np.ndarray]:
+    """Convierte una lista de SessionRecord en arreglos columnares."""
+    columns = {}
+    for name in STRING_FIELDS:
+        offsets, data = _encode_strings([getattr(s, name) or "" for s in sessions])
+        columns[f"{name}.offsets"] = offsets
+        columns[f"{name}.data"] = data
+    for name in INT_FIELDS:
+        columns[name] = np.fromiter((getattr(s, name) for s in sessions), dtype=np.int64, count=len(sessions))
+    for name in FLOAT_FIELDS:
+        columns[name] = np.fromiter((getattr(s, name) for s in sessions), dtype=np.float64, count=len(sessions))
+    columns["start_datetime"] = np.fromiter(
+        (_encode_datetime(s.start_datetime) for s in sessions), dtype=np.int64, count=len(sessions)
+    )
+    return columns
+
+
+class ColumnarSessions(Sequence):
+    """Secuencia de SessionRecord respaldada por columnas (en memoria o mapeadas).
+
+    Los registros se reconstruyen al accederlos; iterar decodifica por bloques.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        self._columns = columns
+        self._length = len(columns["start_datetime"])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, name: str) -> np.ndarray:
+        """Columna numérica cruda (p. ej. "gb_written" o "start_datetime" en µs)."""
+        return self._columns[name]
+
+    def text_column(self, name: str) -> list[str]:
+        """Columna de texto completa decodificada (p. ej. "session_id")."""
+        return self._strings(name, 0, self._length)
+
+    def _strings(self, name: str, start: int, stop: int) -> list[str]:
+        offsets = np.asarray(self._columns[f"{name}.offsets"][start:stop + 1])
+        base = int(offsets[0])
+        blob = bytes(self._columns[f"{name}.data"][base:int(offsets[-1])])
+        rel = (offsets - base).tolist()
+        return [blob[rel[i]:rel[i + 1]].decode("utf-8") for i in range(stop - start)]
+
+    def _block(self, start: int, stop: int) -> list:
+        values = {name: self._strings(name, start, stop) for name in STRING_FIELDS}
+        for name in INT_FIELDS + FLOAT_FIELDS:
+            values[name] = self._columns[name][start:stop].tolist()
+        micros = self._columns["start_datetime"][start:stop].tolist()
+        values["start_datetime"] = [
+            None if us == _NO_DATE else _EPOCH + timedelta(microseconds=us) for us in micros
+        ]
+        names = list(values)
+        return [
+            SessionRecord(**{n: values[n][i] for n in names})
+            for i in range(stop - start)
+        ]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._block(index, index + 1)[0]
+
+    def __iter__(self):
+        for start in range(0, self._length, _BLOCK):
+            yield from self._block(start, min(start + _BLOCK, self._length))
+
+    def datetime_range(self):
+        """(min, max) de start_datetime sin reconstruir registros, o (None, None)."""
+        col = np.asarray(self._columns["start_datetime"])
+        valid = col[col != _NO_DATE]
+        if valid.size == 0:
+            return None, None
+        return (_EPOCH + timedelta(microseconds=int(valid.min())),
+                _EPOCH + timedelta(microseconds=int(valid.max())))
+
+
+class SpilledSessions(ColumnarSessions):
+    """Sesiones volcadas a disco, abiertas con np.load(mmap_mode="r") al primer acceso."""
+
+    def __init__(self, directory: str, length: int):
+        self.directory = directory
+        self._length = length
+        self._loaded = None
+
+    @property
+    def _columns(self) -> dict[str, np.ndarray]:
+        if self._loaded is None:
+            self._loaded = {
+                fn[:-4]: np.load(os.path.join(self.directory, fn), mmap_mode="r")
+                for fn in os.listdir(self.directory) if fn.endswith(".npy")
+            }
+        return self._loaded
+
+    def release(self) -> None:
+        """Cierra los mapeos (necesario en Windows antes de borrar el directorio)."""
+        self._loaded = None
+
+
+def session_columns(sessions) -> dict[str, np.ndarray]:
+    """Columnas de una secuencia de sesiones, sin re-codificar si ya es columnar."""
+    if isinstance(sessions, ColumnarSessions):
+        return sessions._columns
+    return encode_columns(sessions)
+
+
+def spill_sessions(sessions: list, directory: str) -> SpilledSessions:
+    """Escribe las sesiones como archivos columnares y retorna la vista mapeada."""
+    os.makedirs(directory, exist_ok=True)
+    for name, array in session_columns(sessions).items():
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+    return SpilledSessions(directory, len(sessions))
+
+
+# ── Presupuesto ──
+
+def estimate_sessions_bytes(sessions, sample_size: int = 64) -> int:
+    """Estima la memoria residente de una lista de SessionRecord por muestreo.
+
+    Las sesiones ya volcadas a disco cuentan como 0; las columnares en memoria
+    (p. ej. restauradas de un snapshot), el tamaño de sus arreglos.
+    """
+    if isinstance(sessions, SpilledSessions) or not sessions:
+        return 0
+    if isinstance(sessions, ColumnarSessions):
+        return sum(int(array.nbytes) for array in sessions._columns.values())
+    step = max(1, len(sessions) // sample_size)
+    sample = sessions[::step][:sample_size]
+    total = 0
+    for s in sample:
+        total += sys.getsizeof(s) + sys.getsizeof(s.__dict__)
+        total += sum(sys.getsizeof(v) for v in s.__dict__.values())
+    return int(total / len(sample) * len(sessions)) + sys.getsizeof(sessions)
+
+
+class SessionMemoryBudget:
+    """Aplica un límite de memoria a las sesiones de un usuario."""
+
+    def __init__(self, budget_mb: int = DEFAULT_BUDGET_MB):
+        self.budget_bytes = budget_mb * 1024 * 1024
+
+    def usage(self, cell_manager_data: dict) -> dict[str, int]:
+        """Bytes residentes estimados por Cell Manager."""
+        return {cm: estimate_sessions_bytes(rep.sessions) for cm, rep in cell_manager_data.items()}
+
+    def enforce(self, cell_manager_data: dict, spill_root: str) -> list[str]:
+        """Vuelca a disco los Cell Managers más grandes hasta cumplir el presupuesto.
+
+        Modifica report.sessions en sitio. Retorna los Cell Managers volcados.
+        """
+        usage = self.usage(cell_manager_data)
+        total = sum(usage.values())
+        spilled = []
+        for cm in sorted(usage, key=usage.get, reverse=True):
+            if total <= self.budget_bytes or usage[cm] == 0:
+                break
+            report = cell_manager_data[cm]
+            directory = os.path.join(spill_root, f"{cm}-{uuid.uuid4().hex[:8]}")
+            report.sessions = spill_sessions(report.sessions, directory)
+            total -= usage[cm]
+            spilled.append(cm)
+
+        self._remove_orphans(cell_manager_data, spill_root)
+        return spilled
+
+    @staticmethod
+    def _remove_orphans(cell_manager_data: dict, spill_root: str) -> None:
+        """Borra volcados de reportes que ya fueron reemplazados."""
+        if not os.path.isdir(spill_root):
+            return
+        in_use = {
+            os.path.basename(rep.sessions.directory)
+            for rep in cell_manager_data.values() if isinstance(rep.sessions, SpilledSessions)
+        }
+        for name in os.listdir(spill_root):
+            if name not in in_use:
+                shutil.rmtree(os.path.join(spill_root, name), ignore_errors=True)
+
+
+def release_spilled(cell_manager_data: dict) -> None:
+    """Cierra los mapeos de todas las sesiones volcadas."""
+    for rep in cell_manager_data.values():
+        if isinstance(rep.sessions, SpilledSessions):
+            rep.sessions.release()
@@ -0,0 +1,257 @@
+"""Snapshots por usuario para reabrir el dashboard sin volver a cargar archivos.
+
+Tras cada ingesta se guardan los datos cargados del usuario; al iniciar
+sesión (recarga del navegador, nuevo login o reinicio del servidor) se
+restauran en milisegundos en lugar de re-subir y re-parsear todo.
+
+El dueño de un snapshot (owner) no es solo el nombre de usuario: todos los
+analistas comparten la credencial de st.secrets["auth"], así que main.py lo
+combina con un token propio de cada navegador (ver snapshot_owner en
+main.py). Las operaciones sobre un mismo snapshot se serializan con un lock
+por directorio.
+
+Estructura en disco:
+    <raíz>/<hash del dueño>/manifest.json   versión, fecha, métricas y Schedules
+    <raíz>/<hash del dueño>/<cm>.npz        sesiones en columnas + índice por especificación
+
+Cada guardado reescribe todos los .npz: un .npz y la entrada del manifest
+que lo referencia siempre vienen del mismo estado, y los nombres de las
+especificaciones viajan en el propio .npz junto a los códigos del índice.
+
+Las sesiones usan la misma codificación columnar que el volcado a disco
+(utils.session_store) y se restauran como ColumnarSessions, que reconstruye
+los registros solo al accederlos. Un snapshot con otra versión de formato u
+otro esquema de SessionRecord, o más antiguo que el TTL, se descarta.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, fields, replace
+
+import numpy as np
+
+from models.report_data import CellManagerReport, ParseStats, ScheduleReport, ScheduleRow, SessionRecord
+from utils.aggregates import daily_partials
+from utils.anomaly import AnomalyDetector
+from utils.schedule_detail import ScheduleDetail
+from utils.session_store import ColumnarSessions, session_columns
+from utils.spec_index import SpecIndex
+from utils.throughput import ThroughputTracker
+
+SNAPSHOT_DIR = os.environ.get("BACKUP_DASHBOARD_SNAPSHOT_DIR", "")
+SNAPSHOT_TTL_H = float(os.environ.get("BACKUP_DASHBOARD_SNAPSHOT_TTL_H", "72"))
+
+# Subir al cambiar la estructura del manifest o de los .npz
+FORMAT_VERSION = 4
+# Un cambio en los campos de SessionRecord invalida los snapshots anteriores
+SCHEMA = [f.name for f in fields(SessionRecord)]
+
+_MANIFEST = "manifest.json"
+_INDEX_PREFIX = "spec_index."
+_SPECS = "spec_names"
+_REPORT_FIELDS = ("total_policies", "total_jobs", "size_tb", "compliance_pct", "duplicates_dropped")
+
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock(directory: str) -> threading.Lock:
+    """Lock del snapshot: dos sesiones del mismo dueño no lo escriben a la vez."""
+    with _locks_guard:
+        return _locks.setdefault(directory, threading.Lock())
+
+
+def user_dir(owner: str, root: str = SNAPSHOT_DIR) -> str:
+    """Directorio del snapshot de un dueño (el nombre no expone el usuario)."""
+    return os.path.join(root, hashlib.sha256(owner.encode("utf-8")).hexdigest()[:16])
+
+
+def _cm_file(cm_name: str) -> str:
+    return hashlib.sha256(cm_name.encode("utf-8")).hexdigest()[:12] + ".npz"
+
+
+def _atomic_write(path: str, write) -> None:
+    """Escribe con write(f) en un temporal del mismo directorio y lo renombra."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def save_snapshot(owner: str, cell_manager_data: dict, cell_manager_files: dict,
+                  schedule_reports: dict, detector: AnomalyDetector | None = None,
+                  throughput: ThroughputTracker | None = None, root: str = SNAPSHOT_DIR,
+                  cell_manager_sources: dict | None = None) -> str:
+    """Guarda el snapshot del dueño y retorna su directorio.
+
+    cell_manager_sources ({cm: "upload" o "watch"}) indica de dónde vino cada
+    Cell Manager; sin él, todos cuentan como carga manual.
+
+    Se reescriben todos los .npz y el manifest se publica al final, así un
+    lector nunca ve un manifest que apunte a archivos a medio escribir.
+    """
+    directory = user_dir(owner, root)
+    with _lock(directory):
+        return _save(directory, cell_manager_data, cell_manager_files, schedule_reports, detector, throughput,
+                     cell_manager_sources or {})
+
+
+def _save(directory: str, cell_manager_data: dict, cell_manager_files: dict, schedule_reports: dict,
+          detector: AnomalyDetector | None, throughput: ThroughputTracker | None,
+          cell_manager_sources: dict) -> str:
+    os.makedirs(directory, exist_ok=True)
+
+    cm_meta = {}
+    for cm, report in cell_manager_data.items():
+        file_name = _cm_file(cm)
+        arrays = dict(session_columns(report.sessions))
+        if report.spec_index is not None:
+            arrays[_SPECS] = np.array(report.spec_index.specs, dtype=np.str_)
+            arrays.update({_INDEX_PREFIX + k: v for k, v in report.spec_index.to_arrays().items()})
+        _atomic_write(os.path.join(directory, file_name), lambda f: np.savez(f, **arrays))
+        cm_meta[cm] = {
+            "file": file_name,
+            "files": [os.path.basename(p) for p in cell_manager_files.get(cm, [])],
+            "source": cell_manager_sources.get(cm, "upload"),
+            "parse_stats": [asdict(st) for st in report.parse_stats],
+            **{name: getattr(report, name) for name in _REPORT_FIELDS},
+        }
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "schema": SCHEMA,
+        "saved_at": time.time(),
+        "cell_managers": cm_meta,
+        "schedule_reports": [
+            {**asdict(replace(r, detail=None)), "detail": r.detail.to_dict() if r.detail is not None else None}
+            for r in schedule_reports.values()
+        ],
+        "anomalies": detector.export_state() if detector is not None else None,
+        "throughput": throughput.export_state() if throughput is not None else None,
+    }
+    _atomic_write(os.path.join(directory, _MANIFEST),
+                  lambda f: f.write(json.dumps(manifest, ensure_ascii=False).encode("utf-8")))
+
+    # Cell Managers que ya no están cargados
+    in_use = {m["file"] for m in cm_meta.values()} | {_MANIFEST}
+    for name in os.listdir(directory):
+        if name not in in_use:
+            os.unlink(os.path.join(directory, name))
+    return directory
+
+
+def load_snapshot(owner: str, ttl_hours: float = SNAPSHOT_TTL_H, root: str = SNAPSHOT_DIR) -> dict | None:
+    """Restaura el snapshot del dueño, o None si no existe, expiró o es incompatible.
+
+    Retorna {"cell_manager_data", "cell_manager_files", "cell_manager_sources",
+    "schedule_reports", "anomaly_detector", "throughput_tracker", "saved_at"}. Los snapshots inválidos se borran.
+    """
+    directory = user_dir(owner, root)
+    with _lock(directory):
+        snapshot = _load(directory, ttl_hours)
+    if snapshot is None:
+        return None
+    if snapshot is _INVALID:
+        delete_snapshot(owner, root)
+        return None
+    return snapshot
+
+
+# Marca de _load para un snapshot que existe pero no se puede usar
+_INVALID = object()
+
+
+def _load(directory: str, ttl_hours: float):
+    try:
+        with open(os.path.join(directory, _MANIFEST), "rb") as f:
+            manifest = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    if (manifest.get("format") != FORMAT_VERSION or manifest.get("schema") != SCHEMA
+            or time.time() - manifest.get("saved_at", 0) > ttl_hours * 3600):
+        return _INVALID
+
+    try:
+        data, files, sources, seen_keys = {}, {}, {}, []
+        for cm, meta in manifest["cell_managers"].items():
+            with np.load(os.path.join(directory, meta["file"])) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+            index_arrays = {
+                name[len(_INDEX_PREFIX):]: arrays.pop(name) for name in list(arrays) if name.startswith(_INDEX_PREFIX)
+            }
+            specs = arrays.pop(_SPECS, None)
+            sessions = ColumnarSessions(arrays)
+            spec_index = SpecIndex(specs.tolist(), **index_arrays) if index_arrays else None
+            data[cm] = CellManagerReport(
+                cell_manager=cm,
+                sessions=sessions,
+                spec_index=spec_index,
+                parse_stats=[ParseStats(**st) for st in meta["parse_stats"]],
+                # Los parciales se derivan del índice, no se guardan
+                partials=daily_partials(cm, spec_index),
+                **{name: meta[name] for name in _REPORT_FIELDS},
+            )
+            files[cm] = meta["files"]
+            sources[cm] = meta.get("source", "upload")
+            seen_keys.extend(_seen_keys(cm, sessions))
+
+        schedule_reports = {}
+        for r in manifest["schedule_reports"]:
+            report = ScheduleReport(**{
+                **r,
+                "rows": [ScheduleRow(**row) for row in r["rows"]],
+                "parse_stats": ParseStats(**r["parse_stats"]) if r.get("parse_stats") else None,
+                "detail": ScheduleDetail.from_dict(r["detail"]) if r.get("detail") else None,
+            })
+            schedule_reports[report.period_name] = report
+
+        detector = AnomalyDetector()
+        if manifest.get("anomalies"):
+            detector.restore_state(manifest["anomalies"], seen_keys)
+        tracker = ThroughputTracker()
+        if manifest.get("throughput") is not None:
+            tracker.restore_state(manifest["throughput"], seen_keys)
+        else:
+            # Snapshot anterior al throughput: se reconstruye una vez desde las sesiones
+            for cm, report in data.items():
+                tracker.ingest(cm, report.sessions)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return _INVALID
+
+    return {
+        "cell_manager_data": data,
+        "cell_manager_files": files,
+        "cell_manager_sources": sources,
+        "schedule_reports": schedule_reports,
+        "anomaly_detector": detector,
+        "throughput_tracker": tracker,
+        "saved_at": manifest["saved_at"],
+    }
+
+
+def _seen_keys(cm: str, sessions: ColumnarSessions) -> list[tuple]:
+    """Claves del detector de anomalías (ver AnomalyDetector._session_key) desde las columnas."""
+    ids = sessions.text_column("session_id")
+    if all(ids):
+        return [(cm, sid) for sid in ids]
+    specs = sessions.text_column("specification")
+    starts = sessions.text_column("start_time")
+    return [(cm, sid or (spec, start)) for sid, spec, start in zip(ids, specs, starts)]
+
+
+def delete_snapshot(owner: str, root: str = SNAPSHOT_DIR) -> None:
+    """Borra el snapshot del dueño (si existe)."""
+    directory = user_dir(owner, root)
+    with _lock(directory):
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,120 @@
+"""Índice de agregados por (día, especificación) para rankings Top-N.
+
+Se construye una vez al ingerir las sesiones de un Cell Manager y permite
+rankear especificaciones por fallos, GB escritos, errores o Failed DA dentro
+de cualquier rango de fechas sin volver a recorrer las sesiones.
+"""
+
+import heapq
+from datetime import date
+
+import numpy as np
+
+# Columnas de agregados por especificación
+AGG_FIELDS = ("failures", "gb_written", "errors", "failed_da", "jobs")
+_IDX = {name: i for i, name in enumerate(AGG_FIELDS)}
+
+# Ordinal de día para sesiones sin fecha (quedan fuera de cualquier rango)
+_NO_DAY = 0
+
+
+class SpecIndex:
+    """Agregados dispersos: una fila por cada (día, especificación) con sesiones.
+
+    Las filas se guardan ordenadas por día, así que un rango de fechas es un
+    slice (np.searchsorted) y la suma por especificación un bincount.
+    """
+
+    def __init__(self, specs: list[str], days: np.ndarray, codes: np.ndarray, values: np.ndarray):
+        self.specs = specs          # código -> nombre de especificación
+        self._days = days           # (R,) ordinal del día, ordenado
+        self._codes = codes         # (R,) código de especificación
+        self._values = values       # (R, F) agregados de la fila
+
+    @classmethod
+    def build(cls, sessions) -> "SpecIndex":
+        """Construye el índice en una pasada sobre las sesiones."""
+        spec_codes = {}
+        cells = {}
+        for s in sessions:
+            code = spec_codes.setdefault(s.specification, len(spec_codes))
+            day = s.start_datetime.toordinal() if s.start_datetime else _NO_DAY
+            acc = cells.get((day, code))
+            if acc is None:
+                acc = cells[(day, code)] = [0, 0.0, 0, 0, 0]
+            if not s.success or s.success.strip() == "0%":
+                acc[0] += 1
+            acc[1] += s.gb_written
+            acc[2] += s.errors
+            acc[3] += s.failed_da
+            acc[4] += 1
+
+        keys = sorted(cells)
+        days = np.fromiter((k[0] for k in keys), dtype=np.int64, count=len(keys))
+        codes = np.fromiter((k[1] for k in keys), dtype=np.int64, count=len(keys))
+        values = np.array([cells[k] for k in keys], dtype=np.float64).reshape(len(keys), len(AGG_FIELDS))
+        return cls(list(spec_codes), days, codes, values)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Arreglos del índice (inversa: SpecIndex(specs, **arrays))."""
+        return {"days": self._days, "codes": self._codes, "values": self._values}
+
+    def _row_range(self, start: date | None, end: date | None) -> slice:
+        if start is None and end is None:
+            return slice(0, len(self._days))
+        lo = np.searchsorted(self._days, start.toordinal() if start else _NO_DAY + 1, side="left")
+        hi = np.searchsorted(self._days, end.toordinal(), side="right") if end else len(self._days)
+        return slice(int(lo), int(hi))
+
+    def day_range(self) -> tuple[date | None, date | None]:
+        """Primer y último día con sesiones fechadas, o (None, None)."""
+        lo = int(np.searchsorted(self._days, _NO_DAY + 1, side="left"))
+        if lo == len(self._days):
+            return None, None
+        return date.fromordinal(int(self._days[lo])), date.fromordinal(int(self._days[-1]))
+
+    def summary(self, start: date | None = None, end: date | None = None) -> dict:
+        """Totales del rango sumando todas las especificaciones, más la cantidad de especificaciones con sesiones."""
+        rows = self._row_range(start, end)
+        sums = self._values[rows].sum(axis=0)
+        return {
+            "specs": int(np.unique(self._codes[rows]).size),
+            **{f: float(sums[i]) for i, f in enumerate(AGG_FIELDS)},
+        }
+
+    def totals(self, start: date | None = None, end: date | None = None) -> np.ndarray:
+        """Agregados por especificación en el rango, forma (S, F)."""
+        rows = self._row_range(start, end)
+        codes = self._codes[rows]
+        values = self._values[rows]
+        return np.stack(
+            [np.bincount(codes, weights=values[:, i], minlength=len(self.specs)) for i in range(len(AGG_FIELDS))],
+            axis=1,
+        ) if len(self.specs) else np.zeros((0, len(AGG_FIELDS)))
+
+    def top_n(self, metric: str, n: int = 10, start: date | None = None, end: date | None = None) -> list[dict]:
+        """Las n especificaciones con mayor valor de metric en el rango (valores > 0)."""
+        totals = self.totals(start, end)
+        column = totals[:, _IDX[metric]]
+        candidates = np.flatnonzero(column > 0)
+        best = heapq.nlargest(n, candidates.tolist(), key=column.__getitem__)
+        return [
+            {"specification": self.specs[i], **{f: float(totals[i, j]) for j, f in enumerate(AGG_FIELDS)}}
+            for i in best
+        ]
+
+
+def top_specs(indexes: dict, metric: str, n: int = 10,
+              start: date | None = None, end: date | None = None) -> list[dict]:
+    """Top-N global sobre varios Cell Managers ({cm: SpecIndex}).
+
+    El top global está contenido en la unión de los top-n de cada Cell Manager,
+    así que basta con combinar esos candidatos.
+    """
+    candidates = []
+    for cm, index in indexes.items():
+        if index is None:
+            continue
+        for row in index.top_n(metric, n, start, end):
+            candidates.append({"cell_manager": cm, **row})
+    return heapq.nlargest(n, candidates, key=lambda r: r[metric])
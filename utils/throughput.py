@@ -0,0 +1,162 @@
+"""Throughput (GB/h) por especificación y Cell Manager, y pronóstico de uso de la ventana de backup.
+
+Las sesiones exitosas se acumulan al ingerirlas en contenedores semanales
+por (Cell Manager, especificación, semana): GB escritos, horas y cantidad de
+sesiones. Como en utils.anomaly, cada sesión se incorpora una sola vez, así
+que cargar una semana nueva solo procesa sus sesiones.
+
+El pronóstico ajusta, para todas las especificaciones a la vez, una recta de
+mínimos cuadrados sobre la duración media semanal (sumas por especificación
+con np.bincount) y la proyecta unas semanas hacia adelante para compararla
+con la ventana de backup.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.aggregates import week_start
+from utils.calculations import parse_duration_hours
+
+BACKUP_WINDOW_H = float(os.environ.get("BACKUP_DASHBOARD_BACKUP_WINDOW_H", "8"))
+# Semanas con datos necesarias para ajustar una tendencia
+MIN_WEEKS = 3
+
+
+@dataclass
+class WindowForecast:
+    """Pronóstico de uso de la ventana de backup de una especificación."""
+    cell_manager: str = ""
+    specification: str = ""
+    weeks: int = 0                 # semanas con datos
+    last_hours: float = 0.0        # duración media de la última semana
+    slope_h_week: float = 0.0      # variación de la duración media por semana
+    forecast_hours: float = 0.0    # duración media proyectada al horizonte
+    window_pct: float = 0.0        # forecast_hours / ventana × 100
+    weeks_to_window: float | None = None  # semanas hasta alcanzar la ventana (None si no crece)
+    last_gb_h: float = 0.0         # throughput de la última semana
+
+
+class ThroughputTracker:
+    """Acumulador incremental de GB y horas por (Cell Manager, especificación, semana)."""
+
+    def __init__(self):
+        self._bins: dict[tuple, list] = {}  # {(cm, spec, lunes): [gb, horas, sesiones]}
+        self._seen: set = set()
+        self._arrays = None  # caché columnar de _bins, se invalida al ingerir
+
+    @staticmethod
+    def _session_key(cell_manager: str, session) -> tuple:
+        # Misma clave que AnomalyDetector._session_key
+        return (cell_manager, session.session_id or (session.specification, session.start_time))
+
+    def ingest(self, cell_manager: str, sessions) -> int:
+        """Incorpora las sesiones no vistas; retorna cuántas aportaron datos."""
+        added = 0
+        for s in sessions:
+            key = self._session_key(cell_manager, s)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            if not s.success or s.success.strip() == "0%" or s.start_datetime is None:
+                continue
+            hours = parse_duration_hours(s.duration)
+            if not hours:
+                continue
+            week = week_start(s.start_datetime.toordinal())
+            acc = self._bins.get((cell_manager, s.specification, week))
+            if acc is None:
+                acc = self._bins[(cell_manager, s.specification, week)] = [0.0, 0.0, 0]
+            acc[0] += s.gb_written
+            acc[1] += hours
+            acc[2] += 1
+            added += 1
+        if added:
+            self._arrays = None
+        return added
+
+    def _columns(self):
+        """(especificaciones [(cm, spec)], código por contenedor, semana, gb, horas, sesiones)."""
+        if self._arrays is None:
+            keys = sorted(self._bins)
+            specs = {}
+            codes = np.fromiter((specs.setdefault(k[:2], len(specs)) for k in keys), dtype=np.int64, count=len(keys))
+            weeks = np.fromiter((k[2] for k in keys), dtype=np.int64, count=len(keys))
+            values = np.array([self._bins[k] for k in keys], dtype=np.float64).reshape(len(keys), 3)
+            self._arrays = (list(specs), codes, weeks, values[:, 0], values[:, 1], values[:, 2])
+        return self._arrays
+
+    def cell_manager_weekly(self, cell_managers=None) -> dict[str, dict[int, float]]:
+        """{cm: {lunes: GB/h}} sumando todas las especificaciones del Cell Manager."""
+        specs, codes, weeks, gb, hours, _ = self._columns()
+        totals = {}
+        for cm_spec, week, g, h in zip((specs[c] for c in codes.tolist()), weeks.tolist(), gb.tolist(), hours.tolist()):
+            cm = cm_spec[0]
+            if cell_managers is not None and cm not in cell_managers:
+                continue
+            acc = totals.setdefault(cm, {}).setdefault(week, [0.0, 0.0])
+            acc[0] += g
+            acc[1] += h
+        return {cm: {w: g / h for w, (g, h) in sorted(by_week.items()) if h} for cm, by_week in totals.items()}
+
+    def forecast(self, horizon_weeks: int = 4, window_hours: float = BACKUP_WINDOW_H,
+                 cell_managers=None) -> list[WindowForecast]:
+        """Ajusta la tendencia de duración media semanal de cada especificación y la proyecta.
+
+        Solo especificaciones con al menos MIN_WEEKS semanas de datos.
+        """
+        specs, codes, weeks, gb, hours, count = self._columns()
+        if not specs:
+            return []
+        n_specs = len(specs)
+        x = (weeks - weeks.min()) / 7.0   # semanas
+        y = hours / count                 # duración media por sesión
+
+        def per_spec(values):
+            return np.bincount(codes, weights=values, minlength=n_specs)
+
+        n = np.bincount(codes, minlength=n_specs).astype(np.float64)
+        sx, sy = per_spec(x), per_spec(y)
+        sxx, sxy = per_spec(x * x), per_spec(x * y)
+        denom = n * sxx - sx * sx
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(denom > 0, (n * sxy - sx * sy) / denom, 0.0)
+        intercept = (sy - slope * sx) / np.maximum(n, 1)
+
+        # Contenedores ordenados por (especificación, semana): el último de cada tramo es su semana más reciente
+        last = np.cumsum(n.astype(np.int64)) - 1
+        last_x = x[last]
+        forecast_h = np.maximum(intercept + slope * (last_x + horizon_weeks), 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            to_window = np.where(slope > 0, (window_hours - intercept) / slope - last_x, np.nan)
+            last_gb_h = np.where(hours[last] > 0, gb[last] / hours[last], 0.0)
+
+        result = []
+        for i in np.flatnonzero(n >= MIN_WEEKS).tolist():
+            cm, spec = specs[i]
+            if cell_managers is not None and cm not in cell_managers:
+                continue
+            result.append(WindowForecast(
+                cell_manager=cm,
+                specification=spec,
+                weeks=int(n[i]),
+                last_hours=round(float(y[last[i]]), 2),
+                slope_h_week=round(float(slope[i]), 3),
+                forecast_hours=round(float(forecast_h[i]), 2),
+                window_pct=round(float(forecast_h[i]) / window_hours * 100, 1) if window_hours else 0.0,
+                weeks_to_window=None if np.isnan(to_window[i]) else round(max(float(to_window[i]), 0.0), 1),
+                last_gb_h=round(float(last_gb_h[i]), 2),
+            ))
+        return result
+
+    def export_state(self) -> list:
+        """Contenedores en forma serializable a JSON (sin el conjunto de vistas)."""
+        return [[cm, spec, week, *acc] for (cm, spec, week), acc in self._bins.items()]
+
+    def restore_state(self, state: list, seen_keys) -> None:
+        """Restaura lo exportado por export_state; seen_keys son las claves de las sesiones ya ingeridas."""
+        for cm, spec, week, gb, hours, sessions in state:
+            self._bins[(cm, spec, week)] = [gb, hours, sessions]
+        self._seen.update(seen_keys)
+        self._arrays = None
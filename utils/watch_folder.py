@@ -0,0 +1,165 @@
+"""Ingesta automática de reportes desde carpetas vigiladas.
+
+Los Cell Managers depositan sus reportes semanales en un directorio
+compartido con la misma estructura que usa el exportador Prometheus:
+
+    <raíz>/<CELL_MANAGER>/*.csv|*.gz|*.zip
+
+Un hilo en segundo plano recorre las carpetas cada cierto intervalo y
+mantiene un índice (tamaño, mtime, hash) de los archivos ya vistos. Solo se
+parsean los archivos nuevos o cuyo contenido cambió; los demás reutilizan
+las sesiones ya parseadas y el reporte del Cell Manager se recompone con
+merge_sessions únicamente si alguno de sus archivos cambió.
+"""
+
+import glob
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from models.report_data import ParseStats
+from parsers.compressed import REPORT_EXTENSIONS, is_bundle
+from parsers.csv_parser import build_cell_manager_report, merge_sessions, parse_bundle, parse_csv_file
+from parsers.parse_cache import file_digest
+
+WATCH_DIR = os.environ.get("BACKUP_DASHBOARD_WATCH_DIR", "")
+WATCH_INTERVAL_S = float(os.environ.get("BACKUP_DASHBOARD_WATCH_INTERVAL_S", "60"))
+
+# Un archivo modificado hace menos de esto puede estar copiándose todavía
+_SETTLE_SECONDS = 2.0
+
+
+@dataclass
+class WatchedFile:
+    """Entrada del índice de archivos vistos."""
+    size: int
+    mtime_ns: int
+    digest: str
+    parts: list  # [(nombre, sesiones, ParseStats)]: uno por reporte, varios si es un .zip
+
+
+class FolderWatcher:
+    """Vigila <root>/<cm>/ (.csv, .gz, .zip) y mantiene un CellManagerReport actualizado por Cell Manager.
+
+    Los reportes publicados son compartidos por todas las sesiones del proceso
+    y no deben modificarse en sitio (ver adopt en main.py).
+    """
+
+    def __init__(self, root: str, cell_managers: list[str], interval: float = WATCH_INTERVAL_S):
+        self.root = root
+        self.cell_managers = cell_managers
+        self.interval = interval
+        self.version = 0           # se incrementa cada vez que cambia algún reporte
+        self.last_scan = None      # time.time() del último recorrido completo
+        self.last_error = ""
+        self._index = {}           # {ruta: WatchedFile}
+        self._digests = {}         # {cm: ((ruta, hash), ...)} del último reporte
+        self._reports = {}         # {cm: CellManagerReport}
+        self._files = {}           # {cm: [rutas]}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ── Recorrido ──
+
+    def _entry(self, path: str) -> WatchedFile | None:
+        """Entrada actualizada del índice; parsea solo si el contenido cambió."""
+        st = os.stat(path)
+        entry = self._index.get(path)
+        if entry and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns:
+            return entry
+        if time.time() - st.st_mtime < _SETTLE_SECONDS:
+            # Se reintenta en el próximo recorrido; mientras tanto vale la versión anterior
+            return entry
+
+        digest = file_digest(path)
+        if entry and entry.digest == digest:
+            # Mismo contenido (p. ej. copiado de nuevo): solo se actualiza la firma
+            entry.size, entry.mtime_ns = st.st_size, st.st_mtime_ns
+            return entry
+
+        if is_bundle(path):
+            parts = parse_bundle(path)
+        else:
+            stats = ParseStats()
+            parts = [(os.path.basename(path), parse_csv_file(path, stats), stats)]
+        entry = WatchedFile(st.st_size, st.st_mtime_ns, digest, parts)
+        self._index[path] = entry
+        return entry
+
+    def scan_once(self) -> list[str]:
+        """Recorre las carpetas una vez. Retorna los Cell Managers cuyo reporte cambió."""
+        changed = []
+        seen = set()
+        for cm in self.cell_managers:
+            cm_dir = os.path.join(self.root, cm)
+            paths = sorted(p for ext in REPORT_EXTENSIONS for p in glob.glob(os.path.join(cm_dir, f"*.{ext}")))
+            per_file = []
+            for path in paths:
+                try:
+                    entry = self._entry(path)
+                except OSError:
+                    # Borrado o inaccesible entre el listado y la lectura
+                    continue
+                if entry is None:
+                    continue
+                seen.add(path)
+                per_file.append((path, entry))
+
+            digests = tuple((path, entry.digest) for path, entry in per_file)
+            if digests == self._digests.get(cm, ()):
+                continue
+            self._digests[cm] = digests
+
+            if per_file:
+                parts = [part for _, entry in per_file for part in entry.parts]
+                sessions, dropped = merge_sessions([(name, sessions) for name, sessions, _ in parts])
+                report = build_cell_manager_report(cm, sessions, dropped, [stats for _, _, stats in parts])
+            else:
+                report = None
+            with self._lock:
+                if report is None:
+                    self._reports.pop(cm, None)
+                    self._files.pop(cm, None)
+                else:
+                    self._reports[cm] = report
+                    self._files[cm] = [path for path, _ in per_file]
+            changed.append(cm)
+
+        for path in set(self._index) - seen:
+            del self._index[path]
+
+        with self._lock:
+            if changed:
+                self.version += 1
+            self.last_scan = time.time()
+        return changed
+
+    # ── Hilo en segundo plano ──
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.scan_once()
+                self.last_error = ""
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+            self._stop.wait(self.interval)
+
+    def start(self) -> "FolderWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="backup-watch-folder", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def snapshot(self) -> tuple[int, dict, dict]:
+        """(versión, {cm: CellManagerReport}, {cm: [rutas]}) consistentes entre sí."""
+        with self._lock:
+            return self.version, dict(self._reports), {cm: list(p) for cm, p in self._files.items()}
@@ -0,0 +1,17 @@
+"""Recursos estáticos de la interfaz, construidos una vez por proceso."""
+
+import functools
+import os
+
+_ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+
+@functools.lru_cache(maxsize=None)
+def app_css() -> str:
+    """Bloque <style> de la aplicación (assets/styles.css).
+
+    Streamlit re-ejecuta main.py en cada interacción; al vivir en un módulo
+    importado, el archivo se lee y se arma una sola vez por proceso.
+    """
+    with open(os.path.join(_ASSETS_DIR, "styles.css"), encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>\n"